@@ -1,20 +1,177 @@
-import utils.astree_log_utils.log_monitor as LogMonitor
-from utils.log import Logger
+import time
+# Start of the CLI, the --import-time report is relative to it
+START_TIME = time.perf_counter()
+import sys
+from contextlib import contextmanager
 import click
-import logging
+# (subsystem, seconds) of the imports, the subsystems are only imported by the commands using them
+IMPORT_TIMES = [("click", time.perf_counter() - START_TIME)]
 
-@click.command()
-@click.option('--output_path', prompt='Output folder path', help='Output folder path')
-def main(output_path):
-    logger = Logger()
-    if not output_path:
-        logging.error("main", "Output path is required")
+@contextmanager
+def timed_import(subsystem: str):
+    """
+    Times the imports of a subsystem for the --import-time report. The imports stay plain import
+    statements, so the PyInstaller analysis still finds them.
+    """
+    tic = time.perf_counter()
+    yield
+    IMPORT_TIMES.append((subsystem, time.perf_counter() - tic))
+
+def report_ready(ctx) -> None:
+    """
+    Prints the import times and the time to the start of the actual work, if --import-time is set.
+    """
+    if ctx.find_root().params.get("import_time"):
+        imports = ", ".join(f"{subsystem} {seconds * 1000:.1f} ms" for subsystem, seconds in IMPORT_TIMES)
+        click.echo(f"Imports: {imports}", err=True)
+        click.echo(f"Ready after {(time.perf_counter() - START_TIME) * 1000:.1f} ms", err=True)
+
+def is_interactive(ctx) -> bool:
+    """
+    Checks if the missing values may be prompted: not with --non_interactive, nor without a terminal (CI).
+    """
+    return not ctx.find_root().params.get("non_interactive") and sys.stdin.isatty()
+
+@click.group(invoke_without_command=True)
+@click.option('--output_path', default=None, help='Output folder path')
+@click.option('--sqlite', is_flag=True, default=False, help='Also write variable_access.db (SQLite)')
+@click.option('--temp_root', default=None, help='Folder of the Astree a3c-* run folders (default: user temp folder)')
+@click.option('--all_runs', is_flag=True, default=False, help='Monitor every active Astree run, one output subfolder per run')
+@click.option('--cache_folder', default=None, help='Result cache folder, a log already finished when it is found is not parsed again')
+@click.option('--non_interactive', is_flag=True, default=False, help='Never prompt for a missing value (implied without a terminal)')
+@click.option('--import-time', 'import_time', is_flag=True, default=False, help='Print the import times and the start-up time to stderr')
+@click.pass_context
+def main(ctx, output_path, sqlite, temp_root, all_runs, cache_folder, non_interactive, import_time):
+    """Monitor the running Astree analysis (default), or run one of the commands."""
+    if ctx.invoked_subcommand is not None:
         return
-    astree_log_monitor = LogMonitor.LogMonitor(output_path)
-    astree_log_monitor.monitor()
+    if not output_path:
+        if not is_interactive(ctx):
+            raise click.UsageError("Missing option '--output_path'")
+        output_path = click.prompt('Output folder path')
+    with timed_import("log_monitor"):
+        from utils.astree_log_utils.log_monitor import LogMonitor
+        from utils.result_cache import ResultCache
+        from utils.log import Logger
+    report_ready(ctx)
+    logger = Logger()
+    result_cache = ResultCache(cache_folder) if cache_folder else None
+    astree_log_monitor = LogMonitor(output_path, save_sqlite=sqlite, temp_root=temp_root, result_cache=result_cache)
+    if all_runs:
+        astree_log_monitor.monitor_all()
+    else:
+        astree_log_monitor.monitor()
+
+@main.command()
+@click.argument('inputs', nargs=-1, required=True)
+@click.option('--output_path', required=True, help='Output folder path')
+@click.option('--workers', type=int, default=None, help='Number of worker processes (default: number of CPUs)')
+@click.option('--sqlite', is_flag=True, default=False, help='Also write variable_access.db (SQLite)')
+@click.option('--cache_folder', default=None, help='Result cache folder, unchanged logs are not parsed again')
+@click.pass_context
+def batch(ctx, inputs, output_path, workers, sqlite, cache_folder):
+    """Extract the variable access data of archived logs (files, folders or glob patterns)."""
+    with timed_import("log_batch"):
+        from utils.astree_log_utils.log_batch import LogBatchProcessor
+        from utils.log import Logger
+    report_ready(ctx)
+    logger = Logger()
+    batch_processor = LogBatchProcessor(output_path, workers=workers, save_sqlite=sqlite, cache_folder=cache_folder)
+    batch_processor.process(list(inputs))
+
+@main.command()
+@click.option('--output_path', required=True, help='Output folder path')
+@click.option('--source_c_path', required=True, help='Generated C source of the analysed model')
+@click.option('--sqlite', is_flag=True, default=False, help='Also write variable_access.db (SQLite)')
+@click.option('--temp_root', default=None, help='Folder of the Astree a3c-* run folders (default: user temp folder)')
+@click.option('--queue_size', type=int, default=None, help='Maximum number of record batches waiting to be linked (default: 16)')
+@click.pass_context
+def pipeline(ctx, output_path, source_c_path, sqlite, temp_root, queue_size):
+    """Monitor the running Astree analysis and link its variables to the Simulink paths of the C source."""
+    with timed_import("link_pipeline"):
+        from utils.variable_2_simulink.link_pipeline import MonitorLinkPipeline, DEFAULT_QUEUE_SIZE
+        from utils.log import Logger
+    report_ready(ctx)
+    logger = Logger()
+    if queue_size is None:
+        queue_size = DEFAULT_QUEUE_SIZE
+    link_pipeline = MonitorLinkPipeline(output_path, source_c_path, save_sqlite=sqlite, temp_root=temp_root, queue_size=queue_size)
+    link_pipeline.run()
+
+@main.command()
+@click.argument('variable_access_path')
+@click.option('--prefix', default=None, help='Name prefix, e.g. Rte_USSDB_')
+@click.option('--glob', default=None, help='Name glob pattern, e.g. "ADC_AXF_*"')
+@click.option('--regex', default=None, help='Name regex, matched from the start of the name')
+@click.option('--contains', type=float, default=None, help='Value the range must contain')
+@click.option('--min_lower', type=float, default=None, help='Minimum lower bound of the range')
+@click.option('--max_lower', type=float, default=None, help='Maximum lower bound of the range')
+@click.option('--min_upper', type=float, default=None, help='Minimum upper bound of the range')
+@click.option('--max_upper', type=float, default=None, help='Maximum upper bound of the range')
+@click.pass_context
+def query(ctx, variable_access_path, prefix, glob, regex, contains, min_lower, max_lower, min_upper, max_upper):
+    """Print the variables of a variable access file (CSV or SQLite) matching the filters, as CSV."""
+    with timed_import("variable_query"):
+        from utils.astree_log_utils.variable_query import VariableQuery
+        from utils.astree_log_utils.variable_access import CSV_HEADER, format_csv_row
+    report_ready(ctx)
+    variable_query = VariableQuery.from_file(variable_access_path)
+    click.echo(CSV_HEADER, nl=False)
+    for variable_name in variable_query.query(prefix=prefix, glob=glob, regex=regex, contains=contains,
+                                              min_lower=min_lower, max_lower=max_lower,
+                                              min_upper=min_upper, max_upper=max_upper):
+        variable_data = variable_query.get(variable_name)
+        click.echo(format_csv_row((variable_name, variable_data["type"], variable_data["range"])), nl=False)
+
+@main.command()
+@click.argument('inputs', nargs=-1, required=True)
+@click.option('--output_path', required=True, help='Output folder path')
+@click.option('--mode', type=click.Choice(['union', 'intersection']), default='union', help='Merge of the ranges across the inputs')
+@click.option('--collapse_contexts', is_flag=True, default=False, help='Merge the name@"<file>" variables into name')
+@click.option('--sqlite', is_flag=True, default=False, help='Also write variable_access.db (SQLite)')
+@click.pass_context
+def merge(ctx, inputs, output_path, mode, collapse_contexts, sqlite):
+    """Merge variable access files (CSV or SQLite) of several runs or variants into one."""
+    with timed_import("variable_merge"):
+        from utils.astree_log_utils.variable_merge import VariableMerger
+        from utils.log import Logger
+    report_ready(ctx)
+    logger = Logger()
+    variable_merger = VariableMerger(mode, collapse_contexts=collapse_contexts)
+    variable_merger.merge_files(list(inputs), output_path, save_sqlite=sqlite)
+
+@main.command()
+@click.argument('old_path')
+@click.argument('new_path')
+@click.option('--output_path', required=True, help='Output folder path')
+@click.option('--changes', default=None, help='Comma separated changes to report (default: all but unchanged), '
+                                               'among added, removed, type_changed, widened, narrowed, shifted, unchanged')
+@click.option('--temp_folder', default=None, help='Folder of the temporary files of the CSV inputs (default: system temp folder)')
+@click.pass_context
+def diff(ctx, old_path, new_path, output_path, changes, temp_folder):
+    """Report the variable ranges changed between two runs (variable access files, CSV or SQLite)."""
+    with timed_import("variable_diff"):
+        from utils.astree_log_utils.variable_diff import VariableDiff, CHANGES
+        from utils.log import Logger
+    if changes is not None:
+        changes = tuple(change.strip() for change in changes.split(','))
+        unknown_changes = [change for change in changes if change not in CHANGES]
+        if unknown_changes:
+            raise click.BadParameter(f"Unknown change(s): {', '.join(unknown_changes)}", param_hint='--changes')
+    report_ready(ctx)
+    logger = Logger()
+    counts = VariableDiff(temp_folder).diff(old_path, new_path, output_path, changes)
+    for change, count in counts.items():
+        click.echo(f"{change}: {count}")
 
 if __name__ == "__main__":
+    # Required by the batch worker processes in the PyInstaller build, only imported there
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
     try:
         main()
     except Exception as e:
+        import logging
+        from utils.log import Logger
         logging.error("main", str(e))
@@ -0,0 +1,9 @@
+"""
+Benchmarks and equivalence checks of the extraction and linking steps.
+
+Run them from the repository root as modules, e.g. python -m benchmarks.run_benchmarks
+"""
+import os
+
+# Repository root, the default inputs of the benchmarks are its bundled files
+ROOT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
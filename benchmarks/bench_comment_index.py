@@ -0,0 +1,72 @@
+"""
+Benchmark of the comment block lookup used by LinkVar2Sim.link.
+
+Compares the former per-variable scan (split the whole source, search the assignment,
+walk backwards to '/*') against the CSourceIndex comment map on the bundled USSDB.c,
+and checks that both return the same comment for every assigned variable.
+
+Usage:
+    python -m benchmarks.bench_comment_index [--source_c_path USSDB.c]
+"""
+import os
+import time
+import argparse
+from utils.variable_2_simulink.c_source_index import CSourceIndex, read_source_file
+from benchmarks import ROOT_FOLDER
+
+
+def legacy_get_comment_block_in_c_code(source_c: str, variable: str) -> str:
+    '''Former LinkVar2Sim.get_comment_block_in_c_code, kept as the reference'''
+    comment_block = ''
+    source_c_lines = source_c.split('\n')
+    for i, line in enumerate(source_c_lines):
+        if f' {variable} = ' in line and line.strip().startswith(variable):
+            for j in range(i-1, -1, -1):
+                if '/*' in source_c_lines[j]:
+                    first_comment_block = source_c_lines[j].strip()
+                    for k in range(j, len(source_c_lines), 1):
+                        if '#' in source_c_lines[k] or "*/" in source_c_lines[k]:
+                            if comment_block == '':
+                                return first_comment_block
+                            return comment_block
+                        else:
+                            comment_block += source_c_lines[k].strip()
+    return comment_block
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--source_c_path', default=os.path.join(ROOT_FOLDER, 'USSDB.c'))
+    parser.add_argument('--max_variables', type=int, default=200,
+                        help='Number of variables timed on the legacy path (it is quadratic)')
+    args = parser.parse_args()
+
+    source_c = read_source_file(args.source_c_path)
+
+    tic = time.perf_counter()
+    source_index = CSourceIndex(source_c)
+    build_time = time.perf_counter() - tic
+    variables = sorted(source_index.m_assignments)[:args.max_variables]
+
+    tic = time.perf_counter()
+    new_results = [source_index.get_comment_block(var) for var in variables]
+    lookup_time = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    old_results = [legacy_get_comment_block_in_c_code(source_c, var) for var in variables]
+    legacy_time = time.perf_counter() - tic
+
+    mismatches = [var for var, old, new in zip(variables, old_results, new_results) if old != new]
+    print(f"Source: {args.source_c_path} ({len(source_c)} chars, {len(source_index.m_lines)} lines)")
+    print(f"Comment blocks: {len(source_index.m_comment_blocks)}, assigned variables timed: {len(variables)}")
+    print(f"Legacy scan           : {legacy_time:.4f} s")
+    print(f"Index build           : {build_time:.4f} s")
+    print(f"Index lookups         : {lookup_time:.6f} s")
+    print(f"Speedup (incl. build) : {legacy_time / (build_time + lookup_time):.1f}x")
+    print(f"Mismatches            : {len(mismatches)}")
+    for var in mismatches[:10]:
+        print(f"  {var}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark of the incremental source index used by LinkVar2Sim.link(incremental=True).
+
+Indexes the source once to save the chunk state, edits a few Simulink blocks (changed comment,
+inserted assignment), then compares the incremental update against a full CSourceIndex of
+the edited source and checks that both indexes are identical.
+
+Usage:
+    python -m benchmarks.bench_incremental_index [--source_c_path USSDB.c] [--edits 5]
+"""
+import os
+import time
+import shutil
+import argparse
+import tempfile
+from utils.variable_2_simulink.c_source_index import CSourceIndex, read_source_file
+from utils.variable_2_simulink.incremental_index import IncrementalSourceIndex, INDEX_STATE_FILE_NAME
+from benchmarks import ROOT_FOLDER
+
+
+def edit_source(source_c: str, edits: int) -> str:
+    '''Change the comment of some Simulink blocks and add an assignment below them'''
+    lines = source_c.split('\n')
+    comment_lines = [line_no for line_no, line in enumerate(lines) if line.strip().startswith('/* ')]
+    step = max(1, len(comment_lines) // edits)
+    for edit_no, line_no in enumerate(reversed(comment_lines[::step][:edits])):
+        lines[line_no] = lines[line_no].replace('/* ', '/* Edited: ', 1)
+        lines.insert(line_no + 1, f'    BENCH_EDIT_{edit_no} = 0;')
+    return '\n'.join(lines)
+
+
+def is_same_index(index: CSourceIndex, other: CSourceIndex) -> bool:
+    return (index.m_assignments == other.m_assignments and index.m_comment_blocks == other.m_comment_blocks
+            and index.m_comment_texts == other.m_comment_texts and index.m_preceding_comment == other.m_preceding_comment)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--source_c_path', default=os.path.join(ROOT_FOLDER, 'USSDB.c'))
+    parser.add_argument('--edits', type=int, default=5, help='Number of edited Simulink blocks')
+    args = parser.parse_args()
+
+    source_c = read_source_file(args.source_c_path)
+    edited_source_c = edit_source(source_c, args.edits)
+    state_folder = tempfile.mkdtemp(prefix='bench_incremental_')
+    state_file = os.path.join(state_folder, INDEX_STATE_FILE_NAME)
+    try:
+        incremental_index = IncrementalSourceIndex(state_file)
+        incremental_index.update(source_c)
+        incremental_index.save_state()
+
+        tic = time.perf_counter()
+        full_index = CSourceIndex(edited_source_c)
+        full_time = time.perf_counter() - tic
+
+        tic = time.perf_counter()
+        incremental_index = IncrementalSourceIndex(state_file)
+        load_time = time.perf_counter() - tic
+        tic = time.perf_counter()
+        merged_index = incremental_index.update(edited_source_c)
+        update_time = time.perf_counter() - tic
+
+        print(f"Source: {args.source_c_path} ({len(source_c)} chars), {args.edits} edited block(s)")
+        print(f"Chunks re-indexed     : {incremental_index.m_indexed_chunks} of "
+              f"{incremental_index.m_indexed_chunks + incremental_index.m_reused_chunks}")
+        print(f"Full index            : {full_time:.4f} s")
+        print(f"Incremental state load: {load_time:.4f} s")
+        print(f"Incremental update    : {update_time:.4f} s")
+        print(f"Identical indexes     : {is_same_index(full_index, merged_index)}")
+    finally:
+        shutil.rmtree(state_folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Reuse check of one long-lived LinkVar2Sim instance over many link() calls.
+
+Runs --calls link jobs on the same instance, alternating between two variable access files
+(the bundled CSV and every other row of it), checks that every job writes the same
+linked_variables.csv and the same run_report.json counts as a fresh instance with only variables
+of its own file, and reports the resident
+set size (RSS) of the process after the warm-up and at the end: unlike a traced Python heap, it
+also sees the memory of the file maps and of the C extensions. The memory is flat if it grows by
+less than --max_growth_kb.
+
+Usage:
+    python -m benchmarks.bench_link_reuse [--calls 1000] [--max_growth_kb 1024]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import json
+from utils.variable_2_simulink.link import LinkVar2Sim
+from utils.variable_2_simulink.variable_store import iter_variable_access
+from utils.run_report import RUN_REPORT_FILE_NAME
+from benchmarks import ROOT_FOLDER
+
+WARM_UP_CALLS = 10
+# Counters of run_report.json that only depend on the job, not on the source index cache
+JOB_COUNTERS = ("variables", "variables_matched", "variables_skipped")
+
+
+def get_rss() -> int:
+    '''Return the resident set size of the process in bytes, its peak where /proc is not available'''
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def read_file(file_path: str) -> str:
+    with open(file_path, 'r') as f:
+        return f.read()
+
+
+def get_job_counts(output_folder: str) -> tuple:
+    '''Return the job counters and the number of match_variables calls of run_report.json'''
+    with open(os.path.join(output_folder, RUN_REPORT_FILE_NAME), 'r') as f:
+        run_report = json.load(f)
+    return tuple(run_report["counters"].get(name) for name in JOB_COUNTERS) + (run_report["phases"]["match_variables"]["calls"],)
+
+
+def is_job_output(output: str, variable_names: set) -> bool:
+    '''Check that every linked variable comes from the variable access file of the job'''
+    return all(line.split(',')[0] in variable_names for line in output.splitlines())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--source_c_path', default=os.path.join(ROOT_FOLDER, 'USSDB.c'))
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--calls', type=int, default=1000)
+    parser.add_argument('--max_growth_kb', type=int, default=1024, help='Accepted RSS growth after the warm-up')
+    args = parser.parse_args()
+
+    scratch_folder = tempfile.mkdtemp(prefix='bench_link_reuse_')
+    try:
+        # Second variable access file: the header and every other row of the CSV
+        csv_lines = read_file(args.variable_access_csv_path).splitlines(keepends=True)
+        half_csv_path = os.path.join(scratch_folder, 'variable_access_half.csv')
+        with open(half_csv_path, 'w') as f:
+            f.writelines(csv_lines[:1] + csv_lines[1::2])
+        jobs = []
+        for job_no, variable_csv_path in enumerate((args.variable_access_csv_path, half_csv_path)):
+            output_folder = os.path.join(scratch_folder, f'reference{job_no}')
+            LinkVar2Sim().link(args.source_c_path, variable_csv_path, output_folder)
+            variable_names = {variable_name.split('@')[0] for variable_name, _, _ in iter_variable_access(variable_csv_path)}
+            jobs.append((variable_csv_path, read_file(os.path.join(output_folder, 'linked_variables.csv')), variable_names,
+                         get_job_counts(output_folder)))
+
+        link_var2sim = LinkVar2Sim()
+        output_folder = os.path.join(scratch_folder, 'output')
+        mismatches = 0
+        report_mismatches = 0
+        warm_rss = 0
+        tic = time.perf_counter()
+        for call_no in range(args.calls):
+            variable_csv_path, expected_output, variable_names, expected_counts = jobs[call_no % len(jobs)]
+            link_var2sim.link(args.source_c_path, variable_csv_path, output_folder)
+            output = read_file(os.path.join(output_folder, 'linked_variables.csv'))
+            mismatches += output != expected_output or not is_job_output(output, variable_names)
+            report_mismatches += get_job_counts(output_folder) != expected_counts
+            if call_no + 1 == WARM_UP_CALLS:
+                warm_rss = get_rss()
+        wall_time = time.perf_counter() - tic
+        final_rss = get_rss()
+
+        growth_kb = (final_rss - warm_rss) / 1024
+        print(f"Calls: {args.calls}, {wall_time / args.calls * 1000:.2f} ms per call")
+        print(f"RSS after {WARM_UP_CALLS} calls: {warm_rss / 2**20:.2f} MB, after {args.calls} calls: "
+              f"{final_rss / 2**20:.2f} MB (growth {growth_kb:.1f} KB)")
+        print(f"Outputs different from a fresh instance: {mismatches}")
+        print(f"Run reports with other counts than a fresh instance: {report_mismatches}")
+        passed = mismatches == 0 and report_mismatches == 0 and growth_kb <= args.max_growth_kb
+        print("PASS" if passed else "FAIL")
+        return 0 if passed else 1
+    finally:
+        shutil.rmtree(scratch_folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Latency check of the local link service.
+
+Starts a LinkServer on a free local port, then queries it over one persistent connection:
+--lookups single variable lookups, one batch lookup of every variable, and one "range
+contains 0" search. Reports the mean and 99th percentile latency of the single lookups,
+and checks them against --max_mean_ms. The "contains" search must return the variables found
+by a scan of every range, and the service must not keep the text of the source.
+
+Usage:
+    python -m benchmarks.bench_link_service [--lookups 10000] [--max_mean_ms 1]
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+from utils.variable_2_simulink.link_service import LinkService, LinkServer, LinkServiceClient
+from utils.variable_2_simulink.variable_store import iter_variable_access
+from utils.astree_log_utils.variable_merge import add_variable
+from benchmarks import ROOT_FOLDER
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--source_c_path', default=os.path.join(ROOT_FOLDER, 'USSDB.c'))
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--lookups', type=int, default=10000)
+    parser.add_argument('--max_mean_ms', type=float, default=1.0, help='Accepted mean latency of a single lookup')
+    args = parser.parse_args()
+
+    tic = time.perf_counter()
+    link_service = LinkService(args.source_c_path, args.variable_access_csv_path)
+    load_time = time.perf_counter() - tic
+    link_server = LinkServer(link_service, port=0)
+    server_thread = threading.Thread(target=link_server.serve_forever, daemon=True)
+    server_thread.start()
+    client = LinkServiceClient(port=link_server.server_port)
+    try:
+        variable_names = sorted(link_service.m_records)
+        latencies = []
+        for lookup_no in range(args.lookups):
+            tic = time.perf_counter()
+            client.get_variable(variable_names[lookup_no % len(variable_names)])
+            latencies.append(time.perf_counter() - tic)
+        tic = time.perf_counter()
+        batch_records = client.get_variables(variable_names)
+        batch_time = time.perf_counter() - tic
+        tic = time.perf_counter()
+        zero_records = client.find_variables(0)
+        search_time = time.perf_counter() - tic
+
+        # Reference of the search: a scan of the merged ranges of every variable
+        var_data = {}
+        for variable_name, variable_type, variable_range in iter_variable_access(args.variable_access_csv_path):
+            add_variable(var_data, variable_name, variable_type, variable_range)
+        same_search = [record["name"] for record in zero_records] == \
+            sorted(variable_name for variable_name, (_, variable_range) in var_data.items() if variable_range.contains(0))
+        source_kept = len(link_service.m_link_var2sim.m_source_c)
+
+        latencies.sort()
+        mean_ms = sum(latencies) / len(latencies) * 1000
+        print(f"Variables: {len(variable_names)}, service load: {load_time:.3f} s")
+        print(f"Single lookups : {args.lookups}, mean {mean_ms:.3f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.3f} ms")
+        print(f"Batch lookup   : {len(batch_records)} variables in {batch_time * 1000:.2f} ms")
+        print(f"Contains 0     : {len(zero_records)} variables in {search_time * 1000:.2f} ms, same as a scan: {same_search}")
+        print(f"Source characters kept: {source_kept}")
+        passed = mean_ms <= args.max_mean_ms and same_search and source_kept == 0
+        print("PASS" if passed else "FAIL")
+        return 0 if passed else 1
+    finally:
+        client.close()
+        link_server.shutdown()
+        link_server.server_close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
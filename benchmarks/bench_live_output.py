@@ -0,0 +1,144 @@
+"""
+Latency check of the live variable access output of LogMonitor.
+
+Simulates an Astree run whose data dictionary is written at once and whose analysis then
+goes on for --analysis_time seconds before the result summary. Reports when all the records
+are readable in 'variable_access.csv.part' and when 'variable_access.csv' appears, relative
+to the end of the data dictionary, and checks that the live outputs (CSV and SQLite) are
+identical to the ones extracted after the end of the analysis (live=False), for a log with
+'\n' and a log with '\r\n' line endings. The live run must report the whole log in its
+"log_bytes_read" counter.
+
+Usage:
+    python -m benchmarks.bench_live_output [--scale 20] [--analysis_time 5]
+"""
+import os
+import sys
+import time
+import shutil
+import json
+import sqlite3
+import argparse
+import tempfile
+import threading
+from utils.astree_log_utils.log_monitor import LogMonitor
+from utils.astree_log_utils.variable_access import get_csv_row_count
+from utils.run_report import RUN_REPORT_FILE_NAME
+from benchmarks import ROOT_FOLDER
+from benchmarks.synthetic_log import make_log_lines
+
+LINES_PER_FLUSH = 500
+FLUSH_DELAY = 0.01
+
+
+def write_log(log_file: str, lines: list, analysis_time: float, times: dict) -> None:
+    '''Write the log up to the end of the data dictionary, wait for the analysis, then write the rest'''
+    dictionary_end = next(line_no for line_no, line in enumerate(lines) if '#shared memory usage:' in line)
+    os.makedirs(os.path.dirname(log_file))
+    # The line endings are written as they are in the lines
+    with open(log_file, 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, dictionary_end + 1, LINES_PER_FLUSH):
+            f.writelines(lines[start:min(start + LINES_PER_FLUSH, dictionary_end + 1)])
+            f.flush()
+            time.sleep(FLUSH_DELAY)
+        times["dictionary_end"] = time.time()
+        time.sleep(analysis_time)
+        f.writelines(lines[dictionary_end + 1:])
+    times["analysis_end"] = time.time()
+
+
+def watch_outputs(output_folder: str, variable_count: int, times: dict, stop: threading.Event) -> None:
+    '''Record when the .part CSV holds all the records and when the final CSV appears'''
+    part_file = os.path.join(output_folder, 'variable_access.csv.part')
+    csv_file = os.path.join(output_folder, 'variable_access.csv')
+    while not stop.is_set():
+        if "part_complete" not in times and os.path.exists(part_file) and get_csv_row_count(part_file) >= variable_count:
+            times["part_complete"] = time.time()
+        if os.path.exists(csv_file):
+            times["csv_ready"] = time.time()
+            return
+        time.sleep(0.02)
+
+
+def read_bytes(file_path: str) -> bytes:
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+def read_counters(output_folder: str) -> dict:
+    with open(os.path.join(output_folder, RUN_REPORT_FILE_NAME), 'r') as f:
+        return json.load(f)["counters"]
+
+
+def read_db_rows(db_file: str) -> list:
+    connection = sqlite3.connect(db_file)
+    try:
+        return connection.execute("SELECT * FROM variable_access ORDER BY name").fetchall()
+    finally:
+        connection.close()
+
+
+def run_monitor(scratch_folder: str, name: str, lines: list, analysis_time: float, live: bool, variable_count: int) -> tuple:
+    '''Return (times, output folder) of one monitored run'''
+    temp_root = os.path.join(scratch_folder, f'temp_{name}')
+    output_folder = os.path.join(scratch_folder, f'output_{name}')
+    os.makedirs(temp_root)
+    times = {}
+    stop = threading.Event()
+    writer = threading.Thread(target=write_log, args=(os.path.join(temp_root, 'a3c-bench', 'persistent', 'log.txt'),
+                                                      lines, analysis_time, times))
+    watcher = threading.Thread(target=watch_outputs, args=(output_folder, variable_count, times, stop))
+    writer.start()
+    watcher.start()
+    LogMonitor(output_folder, save_sqlite=True, temp_root=temp_root, live=live).monitor()
+    # The CSV is renamed just before monitor() returns, the watcher may not have seen it yet
+    times.setdefault("csv_ready", time.time())
+    writer.join()
+    stop.set()
+    watcher.join()
+    return times, output_folder
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--scale', type=int, default=20, help='Number of copies of the CSV variables in the log')
+    parser.add_argument('--analysis_time', type=float, default=5.0, help='Time between the data dictionary and the result summary')
+    args = parser.parse_args()
+
+    scratch_folder = tempfile.mkdtemp(prefix='bench_live_output_')
+    try:
+        lf_lines = make_log_lines(args.variable_access_csv_path, args.scale)
+        variable_count = sum(1 for line in lf_lines if ' of type ' in line)
+        passed = True
+        for line_ending, lines in (("LF", lf_lines), ("CRLF", [line.replace('\n', '\r\n') for line in lf_lines])):
+            outputs = {}
+            for name, live in (("live", True), ("after_end", False)):
+                times, output_folder = run_monitor(scratch_folder, f'{line_ending}_{name}', lines, args.analysis_time, live, variable_count)
+                outputs[name] = output_folder
+                dictionary_end = times["dictionary_end"]
+                part_delay = times["part_complete"] - dictionary_end if "part_complete" in times else None
+                print(f"{line_ending:<4} {name:<10}: all records in the .part CSV "
+                      f"{'-' if part_delay is None else f'{part_delay:.2f} s'} after the dictionary end, "
+                      f"variable_access.csv {times['csv_ready'] - dictionary_end:.2f} s after "
+                      f"(analysis end: {times['analysis_end'] - dictionary_end:.2f} s)")
+            # Compared byte for byte, a '\r' left in a line would be hidden by a text mode read
+            same_csv, same_txt = (read_bytes(os.path.join(outputs["live"], file_name))
+                                  == read_bytes(os.path.join(outputs["after_end"], file_name))
+                                  for file_name in ('variable_access.csv', 'variable_access.txt'))
+            same_db = read_db_rows(os.path.join(outputs["live"], 'variable_access.db')) == \
+                read_db_rows(os.path.join(outputs["after_end"], 'variable_access.db'))
+            log_size = sum(len(line.encode('utf-8')) for line in lines)
+            bytes_read = read_counters(outputs["live"]).get("log_bytes_read")
+            left_parts = [file_name for file_name in os.listdir(outputs["live"]) if file_name.endswith('.part')]
+            print(f"{line_ending:<4} identical outputs: CSV {same_csv}, TXT {same_txt}, SQLite {same_db}, "
+                  f".part files left: {len(left_parts)}, live log_bytes_read {bytes_read} of {log_size}")
+            passed = passed and same_csv and same_txt and same_db and not left_parts and bytes_read == log_size
+        print("PASS" if passed else "FAIL")
+        return 0 if passed else 1
+    finally:
+        shutil.rmtree(scratch_folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Logging overhead of the link hot loops, with debug logging off and on.
+
+Runs --calls link() calls on one LinkVar2Sim instance (the source index is reused, so the
+time is the per-variable loops and the CSV output) with the log level at INFO, at DEBUG, and
+at DEBUG with the records written by a background thread (Logger(use_queue=True)). Also
+times --messages disabled debug calls through the patched logging.debug with an f-string
+message and through TagLogger with a lazy argument.
+
+Usage:
+    python -m benchmarks.bench_logging [--calls 50] [--messages 1000000]
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from utils.log import Logger, TagLogger
+from utils.variable_2_simulink.link import LinkVar2Sim
+from benchmarks import ROOT_FOLDER
+
+
+def time_link_calls(args, scratch_folder: str, level: int, use_queue: bool) -> float:
+    '''Return the mean time of a link() call, in ms, with the given logging setup'''
+    logger = Logger(os.path.join(scratch_folder, 'log'), level=level, use_queue=use_queue)
+    link_var2sim = LinkVar2Sim()
+    output_folder = os.path.join(scratch_folder, 'output')
+    link_var2sim.link(args.source_c_path, args.variable_access_csv_path, output_folder)
+    tic = time.perf_counter()
+    for _ in range(args.calls):
+        link_var2sim.link(args.source_c_path, args.variable_access_csv_path, output_folder)
+    wall_time = time.perf_counter() - tic
+    logger.stop()
+    return wall_time / args.calls * 1000
+
+
+def time_disabled_messages(messages: int) -> tuple:
+    '''Return the time of a disabled debug call, in ns, for the patched function and TagLogger'''
+    log = TagLogger("Bench")
+    comment_block = "/* '<S1>/Unit Delay' */\n" * 10
+    tic = time.perf_counter()
+    for _ in range(messages):
+        logging.debug("Bench", f"Comment block: {comment_block}")
+    patched_time = time.perf_counter() - tic
+    tic = time.perf_counter()
+    for _ in range(messages):
+        log.debug("Comment block: %s", comment_block)
+    tag_logger_time = time.perf_counter() - tic
+    return patched_time / messages * 1e9, tag_logger_time / messages * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--source_c_path', default=os.path.join(ROOT_FOLDER, 'USSDB.c'))
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--calls', type=int, default=50)
+    parser.add_argument('--messages', type=int, default=1000000)
+    args = parser.parse_args()
+
+    scratch_folder = tempfile.mkdtemp(prefix='bench_logging_')
+    # The console handler of Logger writes to stderr, keep the report readable
+    stderr = sys.stderr
+    sys.stderr = open(os.devnull, 'w')
+    try:
+        results = [(name, time_link_calls(args, scratch_folder, level, use_queue))
+                   for name, level, use_queue in (("INFO", logging.INFO, False), ("DEBUG", logging.DEBUG, False),
+                                                  ("DEBUG, queue", logging.DEBUG, True))]
+        logging.getLogger().setLevel(logging.INFO)
+        patched_time, tag_logger_time = time_disabled_messages(args.messages)
+    finally:
+        sys.stderr.close()
+        sys.stderr = stderr
+        logging.getLogger().handlers = []
+        shutil.rmtree(scratch_folder, ignore_errors=True)
+    for name, call_time in results:
+        print(f"link() with {name:<12}: {call_time:.2f} ms per call")
+    print(f"Disabled debug call: patched logging.debug {patched_time:.0f} ns, TagLogger {tag_logger_time:.0f} ns")
+
+
+if __name__ == '__main__':
+    main()
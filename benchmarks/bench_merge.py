@@ -0,0 +1,113 @@
+"""
+Throughput and correctness check of VariableMerger on calibration variants.
+
+Writes --variants variable access CSV files of the bundled variables repeated --scale times:
+every variant moves the bounds of the variables by a random amount and leaves some of them
+out. Merges them in union and intersection mode (contexts collapsed), reports the rows per
+second for half and all the variants (the time per row must not grow with the number of
+tables), and checks the merged CSV against a reference computed from every range of every
+variable kept in memory. Iterating the merged variables again must give the same variables
+and leave the counters of the run report unchanged.
+
+Usage:
+    python -m benchmarks.bench_merge [--scale 120] [--variants 10]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from collections import defaultdict
+from utils.astree_log_utils.variable_merge import VariableMerger, MERGE_UNION, MERGE_INTERSECTION, get_base_name
+from utils.astree_log_utils.variable_access import CSV_HEADER, format_csv_row
+from utils.variable_2_simulink.variable_store import iter_variable_access
+from benchmarks import ROOT_FOLDER
+from benchmarks.synthetic_log import read_variable_rows
+
+# Share of the variables left out of a variant
+DROP_RATE = 0.02
+
+
+def write_variant_csv(rows: list, scale: int, output_file: str, rng: random.Random, drop_rate: float = DROP_RATE) -> None:
+    '''Write the rows repeated scale times, with bounds moved by up to 2 and drop_rate of the rows left out'''
+    with open(output_file, 'w') as f:
+        f.write(CSV_HEADER)
+        for copy_no in range(scale):
+            suffix = f'_{copy_no}' if copy_no else ''
+            for name, variable_type, variable_range in rows:
+                if rng.random() < drop_rate:
+                    continue
+                lower, upper = (float(bound) for bound in variable_range.split('..'))
+                lower += rng.randint(-2, 2)
+                upper += rng.randint(-2, 2)
+                base_name, _, context = name.partition('@')
+                variable_name = f'{base_name}{suffix}@{context}' if context else f'{base_name}{suffix}'
+                f.write(format_csv_row((variable_name, variable_type, f'{lower}..{max(lower, upper)}')))
+
+
+def merge_reference(csv_files: list, mode: str) -> dict:
+    '''Return name -> (lower, upper) of the merge, from all the ranges of every variable'''
+    ranges = defaultdict(lambda: defaultdict(list))
+    for table, csv_file in enumerate(csv_files):
+        for name, _, variable_range in iter_variable_access(csv_file):
+            ranges[get_base_name(name)][table].append((variable_range.lower, variable_range.upper))
+    merged = {}
+    for name, tables in ranges.items():
+        hulls = [(min(lower for lower, _ in bounds), max(upper for _, upper in bounds)) for bounds in tables.values()]
+        if mode == MERGE_UNION:
+            merged[name] = (min(lower for lower, _ in hulls), max(upper for _, upper in hulls))
+        elif len(hulls) == len(csv_files):
+            lower, upper = max(lower for lower, _ in hulls), min(upper for _, upper in hulls)
+            if lower <= upper:
+                merged[name] = (lower, upper)
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--scale', type=int, default=120, help='Number of copies of the CSV variables in a variant')
+    parser.add_argument('--variants', type=int, default=10, help='Number of variant CSV files')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    scratch_folder = tempfile.mkdtemp(prefix='bench_merge_')
+    try:
+        rng = random.Random(args.seed)
+        rows = read_variable_rows(args.variable_access_csv_path)
+        csv_files = []
+        for variant in range(args.variants):
+            csv_file = os.path.join(scratch_folder, f'variant_{variant}.csv')
+            write_variant_csv(rows, args.scale, csv_file, rng)
+            csv_files.append(csv_file)
+        passed = True
+        for mode in (MERGE_UNION, MERGE_INTERSECTION):
+            for variant_count in (max(args.variants // 2, 1), args.variants):
+                output_folder = os.path.join(scratch_folder, f'{mode}_{variant_count}')
+                variable_merger = VariableMerger(mode, collapse_contexts=True)
+                tic = time.perf_counter()
+                variable_merger.merge_files(csv_files[:variant_count], output_folder)
+                merge_time = time.perf_counter() - tic
+                row_count = variable_merger.m_run_report.get_counter("rows_read")
+                merged = {name: (variable_range.lower, variable_range.upper)
+                          for name, _, variable_range in iter_variable_access(os.path.join(output_folder, 'variable_access.csv'))}
+                same_output = merged == merge_reference(csv_files[:variant_count], mode)
+                # iter_merged does not change the merge state nor the counters
+                counters = dict(variable_merger.m_run_report.m_counters)
+                same_again = all({name: (variable_range.lower, variable_range.upper)
+                                  for name, _, variable_range in variable_merger.iter_merged()} == merged for _ in range(2)) \
+                    and variable_merger.m_run_report.m_counters == counters
+                passed = passed and same_output and same_again
+                print(f"{mode:<12} {variant_count:>3} variant(s): {row_count:>9} rows in {merge_time:6.2f} s "
+                      f"({row_count / merge_time:10,.0f} rows/s), {len(merged):>7} variables, "
+                      f"same as reference: {same_output}, same when iterated again: {same_again}")
+        print("PASS" if passed else "FAIL")
+        return 0 if passed else 1
+    finally:
+        shutil.rmtree(scratch_folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Memory check of the memory-mapped CSourceIndex backend on a large generated source.
+
+Writes a scratch source made of --scale copies of the C source, then indexes it with the
+in-memory backend (read_source_file, CSourceIndex(source_c)) and with CSourceIndex.from_file,
+and reports for both the time, the peak Python heap (tracemalloc) and the size of the
+resulting index, and whether the two indexes are identical.
+
+Usage:
+    python -m benchmarks.bench_mmap_index [--source_c_path USSDB.c] [--scale 20]
+"""
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from utils.variable_2_simulink.c_source_index import CSourceIndex, read_source_file
+from benchmarks import ROOT_FOLDER
+
+
+def index_in_memory(source_c_path: str) -> CSourceIndex:
+    '''Index of the loaded source, decoded like the mapped one (SOURCE_ENCODING)'''
+    return CSourceIndex(read_source_file(source_c_path))
+
+
+def is_same_index(index: CSourceIndex, other: CSourceIndex) -> bool:
+    return (index.m_assignments == other.m_assignments and index.m_comment_blocks == other.m_comment_blocks
+            and index.m_comment_texts == other.m_comment_texts and index.m_preceding_comment == other.m_preceding_comment)
+
+
+def measure(build, source_c_path: str) -> tuple:
+    '''Return (index, seconds, peak heap MB, index heap MB) of one backend'''
+    tracemalloc.start()
+    tic = time.perf_counter()
+    index = build(source_c_path)
+    wall_time = time.perf_counter() - tic
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return index, wall_time, peak / 2**20, current / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--source_c_path', default=os.path.join(ROOT_FOLDER, 'USSDB.c'))
+    parser.add_argument('--scale', type=int, default=20, help='Number of copies of the C source')
+    args = parser.parse_args()
+
+    scratch_folder = tempfile.mkdtemp(prefix='bench_mmap_index_')
+    large_source_path = os.path.join(scratch_folder, 'large.c')
+    try:
+        with open(args.source_c_path, 'rb') as f:
+            source_c = f.read()
+        with open(large_source_path, 'wb') as f:
+            for _ in range(args.scale):
+                f.write(source_c)
+        print(f"Source: {args.scale} x {args.source_c_path} ({os.path.getsize(large_source_path) / 2**20:.1f} MB)")
+        memory_index, memory_time, memory_peak, memory_size = measure(index_in_memory, large_source_path)
+        print(f"In memory : {memory_time:.2f} s, peak heap {memory_peak:.1f} MB, index {memory_size:.1f} MB")
+        # Release the source lines kept by the in-memory index before measuring the next backend
+        memory_index.m_lines = []
+        mapped_index, mapped_time, mapped_peak, mapped_size = measure(CSourceIndex.from_file, large_source_path)
+        print(f"Mapped    : {mapped_time:.2f} s, peak heap {mapped_peak:.1f} MB, index {mapped_size:.1f} MB")
+        print(f"Identical indexes: {is_same_index(memory_index, mapped_index)}")
+    finally:
+        shutil.rmtree(scratch_folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Throughput check of LogMonitor.monitor_all with several Astree runs growing at the same time.
+
+Simulates N 'a3c-*/persistent/log.txt' files written concurrently in a scratch temp folder,
+monitors them all, and reports for each run the delay between the end of its log and its
+variable_access.csv. A run is starved if its delay exceeds --max_latency or if its CSV
+does not hold all the variables.
+
+Usage:
+    python -m benchmarks.bench_multi_run [--runs 8] [--scale 5] [--max_latency 5]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from utils.astree_log_utils.log_monitor import LogMonitor
+from benchmarks import ROOT_FOLDER
+from benchmarks.synthetic_log import make_log_lines, read_variable_rows
+
+
+def write_log(log_file: str, lines: list, lines_per_flush: int, flush_delay: float, finish_times: dict, run_id: str) -> None:
+    '''Append the lines to the log file in chunks, like a running analysis'''
+    os.makedirs(os.path.dirname(log_file))
+    with open(log_file, 'w', encoding='utf-8') as f:
+        for start in range(0, len(lines), lines_per_flush):
+            f.writelines(lines[start:start + lines_per_flush])
+            f.flush()
+            time.sleep(flush_delay)
+    finish_times[run_id] = time.time()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--runs', type=int, default=8, help='Number of concurrent runs')
+    parser.add_argument('--scale', type=int, default=5, help='Number of copies of the CSV variables per log')
+    parser.add_argument('--lines_per_flush', type=int, default=200)
+    parser.add_argument('--flush_delay', type=float, default=0.02)
+    parser.add_argument('--max_latency', type=float, default=5.0, help='Maximum accepted delay per run, in seconds')
+    args = parser.parse_args()
+
+    scratch_folder = tempfile.mkdtemp(prefix='bench_multi_run_')
+    temp_root = os.path.join(scratch_folder, 'temp')
+    output_folder = os.path.join(scratch_folder, 'output')
+    os.makedirs(temp_root)
+    lines = make_log_lines(args.variable_access_csv_path, args.scale)
+    expected_variables = len({row[0] for row in read_variable_rows(args.variable_access_csv_path)}) * args.scale
+    finish_times = {}
+    try:
+        monitor = LogMonitor(output_folder, temp_root=temp_root)
+        writers = []
+        for run_no in range(args.runs):
+            run_id = f'a3c-bench{run_no}'
+            log_file = os.path.join(temp_root, run_id, 'persistent', 'log.txt')
+            writers.append(threading.Thread(target=write_log, args=(
+                log_file, lines, args.lines_per_flush, args.flush_delay, finish_times, run_id)))
+        tic = time.time()
+        for writer in writers:
+            writer.start()
+        results = monitor.monitor_all(idle_timeout=2)
+        wall_time = time.time() - tic
+        for writer in writers:
+            writer.join()
+
+        starved = 0
+        print(f"Runs: {args.runs}, lines per log: {len(lines)}, wall time: {wall_time:.2f} s")
+        for run_no in range(args.runs):
+            run_id = f'a3c-bench{run_no}'
+            csv_file = os.path.join(output_folder, run_id, 'variable_access.csv')
+            latency = os.path.getmtime(csv_file) - finish_times[run_id] if os.path.exists(csv_file) else float('inf')
+            variable_count = results.get(run_id)
+            is_starved = latency > args.max_latency or variable_count != expected_variables
+            starved += is_starved
+            print(f"  {run_id}: {variable_count} variables, delay after log end {latency:.3f} s{'  STARVED' if is_starved else ''}")
+        print(f"Total throughput: {args.runs * len(lines) / wall_time:.0f} log lines/s")
+        print("PASS" if starved == 0 else f"FAIL: {starved} run(s) starved")
+        return 0 if starved == 0 else 1
+    finally:
+        shutil.rmtree(scratch_folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+End-to-end time of the monitor-to-link pipeline against the monitor followed by the linker.
+
+Simulates an Astree run whose data dictionary is written first and whose analysis then goes
+on for --analysis_time seconds, on a C source made of --source_scale copies of USSDB.c.
+Runs LogMonitor.monitor() then LinkVar2Sim.link() on the CSV it wrote (sequential), and
+MonitorLinkPipeline.run() (pipelined), reports both times against the analysis time and the
+index time, and checks that both write the same linked_variables.csv. Then runs the pipeline
+with a queue of one batch and a consumer failing on the first batch, and checks that run()
+raises the error before the analysis is finished, with the monitor thread stopped.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--source_scale 30] [--analysis_time 3]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from utils.astree_log_utils.log_monitor import LogMonitor
+from utils.variable_2_simulink.link import LinkVar2Sim
+from utils.variable_2_simulink.link_pipeline import MonitorLinkPipeline
+from benchmarks import ROOT_FOLDER
+from benchmarks.synthetic_log import make_log_lines
+from benchmarks.bench_live_output import write_log
+
+
+def write_source(source_c_path: str, scale: int, output_file: str) -> None:
+    '''Write scale copies of the C source, byte for byte'''
+    with open(source_c_path, 'rb') as f:
+        source_c = f.read()
+    with open(output_file, 'wb') as f:
+        for _ in range(scale):
+            f.write(source_c)
+
+
+def run(scratch_folder: str, name: str, lines: list, analysis_time: float, process) -> tuple:
+    '''Return (wall time, output folder) of one simulated run processed by process(output folder, temp root)'''
+    temp_root = os.path.join(scratch_folder, f'temp_{name}')
+    output_folder = os.path.join(scratch_folder, f'output_{name}')
+    os.makedirs(temp_root)
+    times = {}
+    writer = threading.Thread(target=write_log, args=(os.path.join(temp_root, 'a3c-bench', 'persistent', 'log.txt'),
+                                                      lines, analysis_time, times))
+    tic = time.perf_counter()
+    writer.start()
+    process(output_folder, temp_root)
+    wall_time = time.perf_counter() - tic
+    writer.join()
+    return wall_time, output_folder
+
+
+class ConsumerError(Exception):
+    pass
+
+
+def fail_on_records(records) -> None:
+    raise ConsumerError("Consumer failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--source_c_path', default=os.path.join(ROOT_FOLDER, 'USSDB.c'))
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--source_scale', type=int, default=30, help='Number of copies of the C source')
+    parser.add_argument('--scale', type=int, default=5, help='Number of copies of the CSV variables in the log')
+    parser.add_argument('--analysis_time', type=float, default=3.0, help='Time between the data dictionary and the result summary')
+    args = parser.parse_args()
+
+    scratch_folder = tempfile.mkdtemp(prefix='bench_pipeline_')
+    try:
+        source_c_path = os.path.join(scratch_folder, 'source.c')
+        write_source(args.source_c_path, args.source_scale, source_c_path)
+        tic = time.perf_counter()
+        LinkVar2Sim().get_source_index(source_c_path)
+        index_time = time.perf_counter() - tic
+        lines = make_log_lines(args.variable_access_csv_path, args.scale)
+
+        def sequential(output_folder, temp_root):
+            LogMonitor(output_folder, temp_root=temp_root).monitor()
+            LinkVar2Sim().link(source_c_path, os.path.join(output_folder, 'variable_access.csv'), output_folder)
+
+        def pipelined(output_folder, temp_root):
+            MonitorLinkPipeline(output_folder, source_c_path, temp_root=temp_root).run()
+
+        sequential_time, sequential_folder = run(scratch_folder, 'sequential', lines, args.analysis_time, sequential)
+        pipelined_time, pipelined_folder = run(scratch_folder, 'pipelined', lines, args.analysis_time, pipelined)
+        print(f"Source: {os.path.getsize(source_c_path) / 2**20:.1f} MB, index time {index_time:.2f} s, "
+              f"analysis time after the dictionary {args.analysis_time:.2f} s")
+        print(f"Sequential (monitor, then link): {sequential_time:.2f} s")
+        print(f"Pipelined                      : {pipelined_time:.2f} s")
+        with open(os.path.join(sequential_folder, 'linked_variables.csv')) as f:
+            expected_output = f.read()
+        with open(os.path.join(pipelined_folder, 'linked_variables.csv')) as f:
+            same_output = f.read() == expected_output
+        print(f"Identical linked_variables.csv ({len(expected_output.splitlines())} rows): {same_output}")
+
+        def failing(output_folder, temp_root):
+            pipeline = MonitorLinkPipeline(output_folder, source_c_path, temp_root=temp_root, queue_size=1)
+            pipeline.m_link_var2sim.add_variables = fail_on_records
+            try:
+                pipeline.run()
+            except ConsumerError:
+                return
+            raise AssertionError("The consumer error was not raised")
+
+        failing_time, _ = run(scratch_folder, 'failing', lines, args.analysis_time, failing)
+        monitor_stopped = not any(thread.name == "PipelineMonitor" for thread in threading.enumerate())
+        print(f"Failing consumer: error raised after {failing_time:.2f} s, monitor thread stopped: {monitor_stopped}")
+        passed = same_output and pipelined_time < sequential_time and monitor_stopped
+        print("PASS" if passed else "FAIL")
+        return 0 if passed else 1
+    finally:
+        shutil.rmtree(scratch_folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Scaling check of ProjectLinker with the number of worker processes.
+
+Builds a scratch source tree with --files copies of the C source, links it with the bundled
+variable access CSV for every worker count of --workers, and reports the wall time, the
+speedup against one worker, and whether every run wrote the same linked output.
+
+Usage:
+    python -m benchmarks.bench_project_link [--files 32] [--workers 1 2 4 8]
+"""
+import os
+import time
+import shutil
+import argparse
+import tempfile
+from utils.variable_2_simulink.project_link import ProjectLinker, PROJECT_LINK_FILE_NAME
+from benchmarks import ROOT_FOLDER
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--source_c_path', default=os.path.join(ROOT_FOLDER, 'USSDB.c'))
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--files', type=int, default=32, help='Number of C files in the source tree')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    scratch_folder = tempfile.mkdtemp(prefix='bench_project_link_')
+    source_folder = os.path.join(scratch_folder, 'src')
+    try:
+        for file_no in range(args.files):
+            file_folder = os.path.join(source_folder, f'swc{file_no // 8}')
+            os.makedirs(file_folder, exist_ok=True)
+            shutil.copyfile(args.source_c_path, os.path.join(file_folder, f'swc_{file_no}.c'))
+        print(f"Files: {args.files}, CPUs: {os.cpu_count()}")
+        reference_output = None
+        base_time = None
+        for workers in args.workers:
+            output_folder = os.path.join(scratch_folder, f'out{workers}')
+            tic = time.perf_counter()
+            ProjectLinker(output_folder, workers=workers).link([source_folder], args.variable_access_csv_path)
+            wall_time = time.perf_counter() - tic
+            with open(os.path.join(output_folder, PROJECT_LINK_FILE_NAME), 'r') as f:
+                output = f.read()
+            reference_output = output if reference_output is None else reference_output
+            base_time = wall_time if base_time is None else base_time
+            print(f"  {workers:3d} worker(s): {wall_time:.2f} s, speedup {base_time / wall_time:.2f}x, "
+                  f"same output: {output == reference_output}")
+    finally:
+        shutil.rmtree(scratch_folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Time, memory and correctness check of VariableDiff on two runs of 100k+ variables.
+
+Writes two variable access CSV files of the bundled variables repeated --scale times, with
+bounds moved by a random amount and some variables left out of each (see bench_merge.py),
+and diffs them at --scale and twice --scale, from the CSV files and from SQLite files. The
+time per variable must not grow with the size, and the peak memory traced in a second run
+must stay about the same: the join only keeps the current row of each table. The report is
+checked against a diff computed with both tables in dicts.
+
+Usage:
+    python -m benchmarks.bench_range_diff [--scale 120]
+"""
+import os
+import sys
+import csv
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from utils.astree_log_utils.variable_diff import VariableDiff, RANGE_DIFF_FILE_NAME, get_change
+from utils.astree_log_utils.variable_merge import VariableMerger
+from utils.variable_2_simulink.variable_store import iter_variable_access
+from benchmarks import ROOT_FOLDER
+from benchmarks.synthetic_log import read_variable_rows
+from benchmarks.bench_merge import write_variant_csv
+
+
+def diff_reference(old_csv: str, new_csv: str) -> dict:
+    '''Return name -> change of the variables of both files, from two dicts'''
+    old_variables, new_variables = ({name: (variable_type, variable_range.lower, variable_range.upper)
+                                     for name, variable_type, variable_range in reversed(list(iter_variable_access(csv_file)))}
+                                    for csv_file in (old_csv, new_csv))
+    return {name: get_change(old_variables.get(name), new_variables.get(name))
+            for name in old_variables.keys() | new_variables.keys()}
+
+
+def read_report(output_folder: str) -> dict:
+    with open(os.path.join(output_folder, RANGE_DIFF_FILE_NAME), 'r', newline='') as f:
+        return {row[1]: row[0] for row in list(csv.reader(f))[1:]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--scale', type=int, default=120, help='Number of copies of the CSV variables in a run')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    scratch_folder = tempfile.mkdtemp(prefix='bench_range_diff_')
+    try:
+        rows = read_variable_rows(args.variable_access_csv_path)
+        passed = True
+        for scale in (args.scale, 2 * args.scale):
+            run_files = {}
+            for run_no in range(2):
+                csv_file = os.path.join(scratch_folder, f'run_{scale}_{run_no}.csv')
+                write_variant_csv(rows, scale, csv_file, random.Random(args.seed + run_no), drop_rate=0.05)
+                # SQLite file of the run, through a merge of the run alone
+                db_folder = os.path.join(scratch_folder, f'run_{scale}_{run_no}')
+                VariableMerger().merge_files([csv_file], db_folder, save_sqlite=True)
+                run_files[run_no] = (csv_file, os.path.join(db_folder, 'variable_access.db'))
+            expected_changes = diff_reference(run_files[0][0], run_files[1][0])
+            expected_report = {name: change for name, change in expected_changes.items() if change != "unchanged"}
+            for input_format, file_index in (("CSV", 0), ("SQLite", 1)):
+                output_folder = os.path.join(scratch_folder, f'diff_{scale}_{input_format}')
+                tic = time.perf_counter()
+                counts = VariableDiff().diff(run_files[0][file_index], run_files[1][file_index], output_folder)
+                diff_time = time.perf_counter() - tic
+                # Memory is traced in a separate run, tracemalloc slows down the allocations
+                tracemalloc.start()
+                VariableDiff().diff(run_files[0][file_index], run_files[1][file_index], output_folder)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                variable_count = sum(counts.values())
+                same_report = read_report(output_folder) == expected_report
+                passed = passed and same_report
+                print(f"x{scale:<4} {input_format:<6}: {variable_count:>7} variables in {diff_time:6.2f} s "
+                      f"({variable_count / diff_time:9,.0f} variables/s), traced peak {peak / 2**20:6.2f} MB, "
+                      f"same as reference: {same_report}")
+            print("  " + ", ".join(f"{change}: {count}" for change, count in counts.items()))
+        print("PASS" if passed else "FAIL")
+        return 0 if passed else 1
+    finally:
+        shutil.rmtree(scratch_folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
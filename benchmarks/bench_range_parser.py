@@ -0,0 +1,154 @@
+"""
+Micro-benchmark of the data dictionary range parser (VariableAcces.get_range_values and
+VariableAcces.get_variable_access_obj).
+
+Compares the former split-chain range parser against VariableRange.parse and get_range_text
+on the records generated from the bundled variable_access.csv, reports the best time of both,
+and checks that the plain "[a, b]" and "{v}" fast path parses every range of a corpus (unions,
+constraints, half-open intervals and invalid ranges included) like the general parser.
+
+Usage:
+    python -m benchmarks.bench_range_parser [--variable_access_csv_path variable_access.csv] [--scale 10]
+"""
+import os
+import sys
+import time
+import argparse
+from utils.astree_log_utils.variable_access import VariableAcces
+from utils.astree_log_utils.variable_range import VariableRange, CONSTRAINT_SEPARATOR, NOT_EQUAL_PATTERN, parse_intervals, parse_number, get_range_text
+from benchmarks import ROOT_FOLDER
+from benchmarks.bench_record_parser import LegacyVariableAcces
+from benchmarks.synthetic_log import make_record_lines
+
+# Ranges parsed by both paths of VariableRange.parse and get_range_text
+RANGE_CORPUS = ("[0, 1]", "[-2147483648, 2147483647]", "[0., 1.5]", "[ 1e+38 , -inf ]", "[0x1p3, 16]", "{40}", "{ -0.5 }",
+                "{40} /\\ != 0", "[0, 3] /\\ != 1 /\\ x > 2", "]0., 1.5]", "[0, 1[", "(0, 1)", "[0, 3] \\/ [8, 12]",
+                "{1} \\/ {2}", "{0, 1, 5}", "[0, 3] \\/ {8}", "[nan, 1]", "[, 1]", "[0, ]1]", "{}", "{ }", "{{1}", "[0, 1, 2]",
+                "[0 1]", "[0, 1] x]", "[a, b]", "[0, 1] /\\ != nan", "{40} /\\ != 0 1",
+                "{40} /\\ !=", "[-oo, +oo]", "{0x1p3}", "[1_0, 20]", "[ 0 , 1e400 ]", "{40} /\\ != x", "  ")
+
+
+class LegacyRangeParser(LegacyVariableAcces):
+    '''Former VariableAcces split-chain range parser, kept as the reference'''
+
+    def is_float(self, value: str) -> bool:
+        try:
+            if not value:
+                return False
+            value = value.lower()
+            if "nan" in value or "inf" in value:
+                return False
+            float(value)
+            return True
+        except ValueError:
+            return False
+
+    def get_range_values(self, variable_range: str) -> str:
+        try:
+            if not variable_range:
+                return None
+            if "[" in variable_range and "]" in variable_range:
+                upper_range = variable_range.split(",")[1].replace("]", "").strip()
+                lower_range = variable_range.split(",")[0].replace("[", "").strip()
+                if self.is_float(upper_range) and self.is_float(lower_range):
+                    return f'{float(lower_range)}..{float(upper_range)}'
+                return None
+            elif "{" in variable_range and "}" in variable_range:
+                range_value = variable_range.split("{")[1].split("}")[0].strip()
+                if self.is_float(range_value):
+                    return f'{float(range_value)}..{float(range_value)}'
+                return None
+            return None
+        except Exception:
+            return None
+
+    def get_variable_access_obj(self, log_data_list: list) -> dict:
+        variable_access_obj = {}
+        for log_data in log_data_list:
+            variable_data = self.get_variable_data(log_data)
+            if variable_data:
+                variable_name, variable_type, variable_range = variable_data
+                if variable_name in variable_access_obj:
+                    continue
+                variable_range = self.get_range_values(variable_range)
+                if not variable_range:
+                    continue
+                variable_access_obj[variable_name] = {"type": variable_type, "range": variable_range}
+        return variable_access_obj
+
+
+def parse_general(variable_range: str) -> VariableRange:
+    '''Return the range parsed without the fast path'''
+    if not variable_range:
+        return None
+    parts = variable_range.strip().split(CONSTRAINT_SEPARATOR)
+    try:
+        intervals = parse_intervals(parts[0])
+        if intervals is None:
+            return None
+        excluded = []
+        constraints = []
+        for constraint in parts[1:]:
+            constraint = constraint.strip()
+            match = NOT_EQUAL_PATTERN.fullmatch(constraint)
+            if match:
+                excluded.append(parse_number(match.group(1)))
+            else:
+                constraints.append(constraint)
+    except ValueError:
+        return None
+    return VariableRange(intervals, excluded, constraints)
+
+
+def best_time(function, argument, repeat: int) -> float:
+    '''Return the best wall time of repeat calls of function(argument)'''
+    times = []
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        function(argument)
+        times.append(time.perf_counter() - tic)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--scale', type=int, default=10, help='Number of copies of the CSV records')
+    parser.add_argument('--repeat', type=int, default=30, help='Number of timed runs, the best one is reported')
+    args = parser.parse_args()
+
+    lines = make_record_lines(args.variable_access_csv_path, args.scale)
+    variable_access = VariableAcces()
+    legacy_parser = LegacyRangeParser()
+    ranges = [variable_access.get_variable_data(line)[2] for line in lines]
+
+    def get_all_range_values(range_parser):
+        return lambda variable_ranges: [range_parser.get_range_values(variable_range) for variable_range in variable_ranges]
+
+    print(f"Ranges: {len(ranges)}")
+    passed = True
+    for name, new_function, legacy_function, argument in (
+            ("get_range_values", get_all_range_values(variable_access), get_all_range_values(legacy_parser), ranges),
+            ("get_variable_access_obj", variable_access.get_variable_access_obj, legacy_parser.get_variable_access_obj, lines)):
+        legacy_time = best_time(legacy_function, argument, args.repeat)
+        new_time = best_time(new_function, argument, args.repeat)
+        print(f"{name:<24}: split-chain {legacy_time:.3f} s, VariableRange {new_time:.3f} s ({legacy_time / new_time:.2f}x)")
+
+    # The fixture ranges give the same "lo..hi" text as the split-chain parser
+    same_values = [variable_access.get_range_values(variable_range) for variable_range in ranges] == \
+        [legacy_parser.get_range_values(variable_range) for variable_range in ranges]
+    print(f"Same range values as the split-chain parser: {same_values}")
+    mismatches = []
+    for variable_range in RANGE_CORPUS:
+        expected_range = parse_general(variable_range)
+        expected_text = expected_range.get_bounded_text() if expected_range is not None else None
+        if VariableRange.parse(variable_range) != expected_range or get_range_text(variable_range) != expected_text:
+            mismatches.append(variable_range)
+    print(f"Corpus ranges parsed differently by the fast path: {mismatches if mismatches else 0}")
+    passed = same_values and not mismatches
+    print("PASS" if passed else "FAIL")
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Micro-benchmark of the data dictionary record parser (VariableAcces.get_variable_data).
+
+Compares the former split-chain parser and the former record regex against the partition
+parser on records generated from the bundled variable_access.csv, reports the lines parsed
+per second (best of --repeat runs), and checks that the regex and the partition parser agree.
+
+Usage:
+    python -m benchmarks.bench_record_parser [--variable_access_csv_path variable_access.csv] [--scale 100]
+"""
+import os
+import time
+import re
+import argparse
+from utils.astree_log_utils.variable_access import VariableAcces
+from benchmarks import ROOT_FOLDER
+from benchmarks.synthetic_log import make_record_lines
+
+
+class LegacyVariableAcces:
+    '''Former VariableAcces split-chain parser, kept as the reference'''
+
+    def validate_variable_data(self, log_data: str) -> bool:
+        log_data = log_data.strip()
+        if "of type" in log_data and "in" in log_data and "#" in log_data:
+            return True
+        return False
+
+    def get_variable_name(self, log_data: str) -> str:
+        variable_name = log_data.split("of type")[0].strip()
+        variable_name = variable_name.split("#")[1].strip()
+        return variable_name
+
+    def get_variable_range(self, log_data: str) -> str:
+        variable_range = log_data.split("in")[1].strip()
+        return variable_range
+
+    def get_variable_type(self, log_data: str) -> str:
+        variable_type = log_data.split("of type")[1].split("in")[0].strip()
+        return variable_type
+
+    def get_variable_data(self, log_data: str) -> list:
+        if not self.validate_variable_data(log_data):
+            return None
+        variable_name = self.get_variable_name(log_data)
+        variable_type = self.get_variable_type(log_data)
+        variable_range = self.get_variable_range(log_data)
+        return [variable_name, variable_type, variable_range]
+
+
+# Former record grammar, kept as the reference
+VARIABLE_RECORD_PATTERN = re.compile(r'#\s*(?P<name>[^\s#]+)\s+of type\s+(?P<type>.+?)\s+in\s+(?P<range>.*\S)')
+
+
+def get_variable_data_regex(log_data: str) -> list:
+    match = VARIABLE_RECORD_PATTERN.search(log_data)
+    if match is None:
+        return None
+    return list(match.group("name", "type", "range"))
+
+
+def time_parser(parser, lines: list, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        for line in lines:
+            parser(line)
+        times.append(time.perf_counter() - tic)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--scale', type=int, default=100, help='Number of copies of the CSV records')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs, the best one is reported')
+    args = parser.parse_args()
+
+    lines = make_record_lines(args.variable_access_csv_path, args.scale)
+    variable_access = VariableAcces()
+    legacy_variable_access = LegacyVariableAcces()
+    legacy_time = time_parser(legacy_variable_access.get_variable_data, lines, args.repeat)
+    regex_time = time_parser(get_variable_data_regex, lines, args.repeat)
+    new_time = time_parser(variable_access.get_variable_data, lines, args.repeat)
+
+    # Records whose name or type contains "in" are cut at the wrong place by the split-chain
+    differences = 0
+    for line in lines[:len(lines) // args.scale]:
+        if legacy_variable_access.get_variable_data(line) != variable_access.get_variable_data(line):
+            differences += 1
+    regex_differences = sum(1 for line in lines[:len(lines) // args.scale]
+                            if get_variable_data_regex(line) != variable_access.get_variable_data(line))
+    print(f"Records: {len(lines)}")
+    print(f"Split-chain parser : {len(lines) / legacy_time:12.0f} lines/s")
+    print(f"Record regex       : {len(lines) / regex_time:12.0f} lines/s")
+    print(f"Partition parser   : {len(lines) / new_time:12.0f} lines/s")
+    print(f"Speedup            : {legacy_time / new_time:.2f}x against the split-chain, {regex_time / new_time:.2f}x against the regex")
+    print(f"Records parsed differently from the split-chain: {differences}, from the regex: {regex_differences}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Lookup benchmark of the VariableQuery index against a linear scan of the variables.
+
+Repeats the variables of the bundled variable access CSV with unique names up to --variables
+entries, builds the index, then runs a set of prefix, glob, regex and range queries and
+reports for each one the number of matches, the query time, the linear scan time and
+whether both return the same names.
+
+Usage:
+    python -m benchmarks.bench_variable_query [--variables 100000]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+from fnmatch import fnmatchcase
+from utils.astree_log_utils.variable_query import VariableQuery
+from utils.variable_2_simulink.variable_store import iter_variable_access
+from benchmarks import ROOT_FOLDER
+
+QUERIES = (
+    dict(prefix='Rte_USSDB_'),
+    dict(prefix='USS_INIT_s_Flg'),
+    dict(glob='ADC_AXF_*_1?'),
+    dict(regex=r'^IF_SUSS\w*_42$'),
+    dict(prefix='USS_INIT_', contains=1),
+    dict(min_lower=1000),
+    dict(max_upper=-1),
+    dict(min_lower=0, max_lower=0, min_upper=1, max_upper=1),
+)
+
+
+def make_variables(variable_csv_path: str, count: int) -> dict:
+    '''Return count variables, the rows of the CSV repeated with a numbered suffix'''
+    rows = list(iter_variable_access(variable_csv_path))
+    variables = {}
+    for variable_no in range(count):
+        name, variable_type, variable_range = rows[variable_no % len(rows)]
+        variables[f'{name.split("@")[0]}_{variable_no // len(rows)}'] = {"type": variable_type, "range": variable_range}
+    return variables
+
+
+def scan(variables: dict, prefix=None, glob=None, regex=None, contains=None,
+         min_lower=None, max_lower=None, min_upper=None, max_upper=None) -> list:
+    '''Return the sorted names matching the filters, checking every variable'''
+    names = []
+    for name, data in variables.items():
+        variable_range = data["range"]
+        if ((prefix is None or name.startswith(prefix)) and (glob is None or fnmatchcase(name, glob))
+                and (regex is None or re.match(regex, name))
+                and (contains is None or variable_range.contains(contains))
+                and (min_lower is None or variable_range.lower >= min_lower)
+                and (max_lower is None or variable_range.lower <= max_lower)
+                and (min_upper is None or variable_range.upper >= min_upper)
+                and (max_upper is None or variable_range.upper <= max_upper)):
+            names.append(name)
+    return sorted(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--variables', type=int, default=100000, help='Number of variables of the dictionary')
+    args = parser.parse_args()
+
+    variables = make_variables(args.variable_access_csv_path, args.variables)
+    tic = time.perf_counter()
+    variable_query = VariableQuery(variables)
+    print(f"Index of {len(variable_query)} variables built in {time.perf_counter() - tic:.2f} s")
+    all_same = True
+    for filters in QUERIES:
+        tic = time.perf_counter()
+        names = variable_query.query(**filters)
+        query_time = time.perf_counter() - tic
+        tic = time.perf_counter()
+        expected_names = scan(variables, **filters)
+        scan_time = time.perf_counter() - tic
+        all_same &= names == expected_names
+        print(f"{filters}: {len(names)} match(es), query {query_time * 1e6:.0f} us, "
+              f"scan {scan_time * 1e3:.1f} ms, same: {names == expected_names}")
+    print("PASS" if all_same else "FAIL")
+    return 0 if all_same else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
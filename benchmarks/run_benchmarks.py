@@ -0,0 +1,172 @@
+"""
+Benchmark suite of the extraction and linking steps, on logs generated from the bundled files.
+
+For every scale, a synthetic Astree log is generated from the variables of the bundled
+variable_access.csv repeated scale times (see synthetic_log.py), and a variable access CSV
+with the same variables. Each step is timed (best of --repeat runs) and then run once more
+under tracemalloc for its peak memory:
+
+    get_data_from_log            the whole log                      items: log lines
+    get_variable_access_obj      the data dictionary block          items: records
+    get_range_values             the range of every record          items: ranges
+    get_used_variables           the CSV variables, indexed source  items: variables
+    get_comment_block_in_c_code  every CSV variable                 items: variables
+    link                         end to end, fresh LinkVar2Sim      items: variables
+
+The results are written to '<output_folder>/<commit>.json' (the output folder is in the user's
+temp folder by default) with the commit, the machine and one entry per (benchmark, scale). Pass the file of another commit with --compare to print
+the time ratio of every entry.
+
+Usage:
+    python -m benchmarks.run_benchmarks [--scales 1,10,100,1000] [--repeat 3] [--output_folder results] [--compare results/<commit>.json]
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime
+from utils.astree_log_utils.variable_access import VariableAcces, CSV_HEADER, format_csv_row, parse_variable_record
+from utils.variable_2_simulink.link import LinkVar2Sim
+from utils.variable_2_simulink.c_source_index import CSourceIndex, read_source_file
+from benchmarks import ROOT_FOLDER
+from benchmarks.synthetic_log import read_variable_rows, make_log_lines
+
+# Version of the result file layout, increase it when a field changes meaning
+RESULTS_VERSION = 1
+# Default folder of the result files, outside of the repository so they are never committed
+RESULTS_FOLDER = os.path.join(tempfile.gettempdir(), 'astree_benchmark_results')
+
+
+def get_commit() -> str:
+    '''Return the short hash of the checked out commit, with "-dirty" if the tree has changes'''
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_FOLDER, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        changes = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT_FOLDER,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if changes else commit
+
+
+def write_variable_csv(rows: list, scale: int, output_file: str) -> None:
+    '''Write the variable access CSV of the rows repeated scale times, named like make_log_lines'''
+    with open(output_file, 'w') as f:
+        f.write(CSV_HEADER)
+        for copy_no in range(scale):
+            suffix = f'_{copy_no}' if copy_no else ''
+            for name, variable_type, variable_range in rows:
+                f.write(format_csv_row((f'{name}{suffix}', variable_type, variable_range)))
+
+
+def measure(run, repeat: int) -> tuple:
+    '''Return (best time in seconds, peak traced memory in MB) of a benchmark step'''
+    best_time = float('inf')
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        run()
+        best_time = min(best_time, time.perf_counter() - tic)
+    # Memory is traced in a separate run, tracemalloc slows down the allocations
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best_time, peak / 2**20
+
+
+def get_benchmarks(scale: int, variable_access_csv_path: str, source_c_path: str, scratch_folder: str) -> list:
+    '''Return the (name, items, run) benchmark steps of one scale'''
+    variable_access = VariableAcces()
+    log_lines = make_log_lines(variable_access_csv_path, scale)
+    dictionary_lines = list(variable_access.iter_data_dictionary(log_lines))
+    ranges = [parse_variable_record(line)[2] for line in dictionary_lines]
+    variable_csv_path = os.path.join(scratch_folder, f'variable_access_{scale}.csv')
+    write_variable_csv(read_variable_rows(variable_access_csv_path), scale, variable_csv_path)
+    output_folder = os.path.join(scratch_folder, 'output')
+
+    # LinkVar2Sim with the variables loaded and the source indexed, for the lookup steps
+    link_var2sim = LinkVar2Sim()
+    link_var2sim.m_source_index = CSourceIndex(read_source_file(source_c_path))
+    link_var2sim.m_var_data = {variable_name: (variable_type, variable_range) for variable_name, variable_type, variable_range
+                               in variable_access.iter_variable_access(dictionary_lines)}
+    variable_names = list(link_var2sim.m_var_data)
+
+    def get_used_variables():
+        link_var2sim.m_used_variables = []
+        link_var2sim.get_used_variables()
+
+    def get_comment_blocks():
+        for variable_name in variable_names:
+            link_var2sim.get_comment_block_in_c_code(variable_name)
+
+    return [
+        ("get_data_from_log", len(log_lines), lambda: variable_access.get_data_from_log(log_lines)),
+        ("get_variable_access_obj", len(dictionary_lines), lambda: variable_access.get_variable_access_obj(dictionary_lines)),
+        ("get_range_values", len(ranges), lambda: [variable_access.get_range_values(text) for text in ranges]),
+        ("get_used_variables", len(variable_names), get_used_variables),
+        ("get_comment_block_in_c_code", len(variable_names), get_comment_blocks),
+        ("link", len(variable_names), lambda: LinkVar2Sim().link(source_c_path, variable_csv_path, output_folder)),
+    ]
+
+
+def print_comparison(results: dict, baseline_file: str) -> None:
+    '''Print the time ratio of every entry present in both result files'''
+    with open(baseline_file, 'r') as f:
+        baseline = json.load(f)
+    baseline_times = {(entry["benchmark"], entry["scale"]): entry["seconds"] for entry in baseline["results"]}
+    print(f"Compared with {baseline['commit']} (ratio < 1: faster):")
+    for entry in results["results"]:
+        baseline_time = baseline_times.get((entry["benchmark"], entry["scale"]))
+        if baseline_time:
+            print(f"  {entry['benchmark']:<28} x{entry['scale']:<5} {entry['seconds'] / baseline_time:6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--source_c_path', default=os.path.join(ROOT_FOLDER, 'USSDB.c'))
+    parser.add_argument('--variable_access_csv_path', default=os.path.join(ROOT_FOLDER, 'variable_access.csv'))
+    parser.add_argument('--scales', default='1,10,100,1000', help='Comma separated numbers of copies of the CSV variables')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs of every step, the best one is kept')
+    parser.add_argument('--output_folder', default=RESULTS_FOLDER, help=f'Folder of the result files (default: {RESULTS_FOLDER})')
+    parser.add_argument('--compare', default=None, help='Result file of another commit')
+    args = parser.parse_args()
+
+    results = {
+        "version": RESULTS_VERSION,
+        "commit": get_commit(),
+        "date": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": [],
+    }
+    scratch_folder = tempfile.mkdtemp(prefix='run_benchmarks_')
+    try:
+        source_c_path = args.source_c_path
+        for scale in (int(scale) for scale in args.scales.split(',')):
+            for name, items, run in get_benchmarks(scale, args.variable_access_csv_path, source_c_path, scratch_folder):
+                seconds, peak_mb = measure(run, args.repeat)
+                results["results"].append({"benchmark": name, "scale": scale, "items": items, "seconds": round(seconds, 6),
+                                           "items_per_second": round(items / seconds) if seconds else None,
+                                           "peak_mb": round(peak_mb, 3)})
+                print(f"{name:<28} x{scale:<5} {items:>9} items  {seconds * 1000:10.2f} ms  "
+                      f"{items / seconds if seconds else 0:14,.0f} items/s  peak {peak_mb:8.2f} MB")
+    finally:
+        shutil.rmtree(scratch_folder, ignore_errors=True)
+
+    os.makedirs(args.output_folder, exist_ok=True)
+    results_file = os.path.join(args.output_folder, f"{results['commit']}.json")
+    with open(results_file, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results: {results_file}")
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Builds synthetic Astree log lines from a variable access CSV, for the benchmarks.
+"""
+import csv
+
+
+def read_variable_rows(csv_path: str) -> list:
+    '''Return the (name, type, range) rows of a variable access CSV file, without the header'''
+    with open(csv_path, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+    return [row for row in rows[1:] if len(row) == 3]
+
+
+def make_record_line(name: str, variable_type: str, variable_range: str) -> str:
+    '''Return a data dictionary record line for a "lo..hi" range'''
+    lower, upper = variable_range.split('..')
+    if lower == upper:
+        astree_range = f'{{{lower}}} /\\ != 0'
+    else:
+        astree_range = f'[{lower}, {upper}]'
+    return f'[23:44:04] #  {name} of type {variable_type} in {astree_range}\n'
+
+
+def make_record_lines(csv_path: str, scale: int = 1) -> list:
+    '''Return the record lines of the CSV repeated scale times, with unique names'''
+    rows = read_variable_rows(csv_path)
+    lines = []
+    for copy_no in range(scale):
+        suffix = f'_{copy_no}' if copy_no else ''
+        for name, variable_type, variable_range in rows:
+            lines.append(make_record_line(f'{name}{suffix}', variable_type, variable_range))
+    return lines
+
+
+def make_log_lines(csv_path: str, scale: int = 1) -> list:
+    '''Return the lines of a complete Astree log whose data dictionary holds the CSV variables'''
+    lines = ['Astree (Release 23.10)\n', '[23:44:00] Analysis started\n', '[23:44:04] #data-dictionary:\n']
+    lines += make_record_lines(csv_path, scale)
+    lines.append('[23:44:05] #shared memory usage:\n')
+    lines.append('[23:44:05] no shared variable\n')
+    lines.append('/* Result summary */\n')
+    lines.append('[23:44:06] Analysis finished\n')
+    return lines
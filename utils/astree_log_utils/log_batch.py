@@ -0,0 +1,149 @@
+import os
+import glob
+import time
+from utils.astree_log_utils.variable_access import VariableAcces, format_csv_row
+from utils.result_cache import ResultCache
+from utils.log import TagLogger
+
+# Names of the Astree log files searched in the archive folders
+LOG_FILE_NAMES = ('astree.log', 'log.txt')
+INDEX_CSV_HEADER = "Log File,Output Folder,Status,Variables,Seconds\n"
+
+log = TagLogger("LogBatchProcessor")
+
+def find_log_files(inputs: list) -> list:
+    """
+    Finds the Astree log files to process.
+
+    Args:
+        inputs (list): Log files, folders (searched recursively for astree.log and log.txt files)
+                       or glob patterns (e.g. "archive/**/log.txt").
+
+    Returns:
+        list: The sorted absolute paths of the log files, without duplicates.
+    """
+    log_files = set()
+    for input_path in inputs:
+        if os.path.isdir(input_path):
+            for folder, _, file_names in os.walk(input_path):
+                for file_name in file_names:
+                    if file_name in LOG_FILE_NAMES:
+                        log_files.add(os.path.abspath(os.path.join(folder, file_name)))
+        elif os.path.isfile(input_path):
+            log_files.add(os.path.abspath(input_path))
+        else:
+            for log_file in glob.glob(input_path, recursive=True):
+                if os.path.isfile(log_file):
+                    log_files.add(os.path.abspath(log_file))
+    return sorted(log_files)
+
+
+def get_log_output_folder(log_file: str, common_folder: str, output_folder: str) -> str:
+    """
+    Returns the output folder of a log file: its path relative to the common folder of all
+    the logs, without extension, inside the output folder. Two logs never share an output folder.
+    """
+    relative_path = os.path.relpath(log_file, common_folder)
+    return os.path.join(output_folder, os.path.splitext(relative_path)[0])
+
+
+def process_log_file(log_file: str, output_folder: str, save_sqlite: bool = False, cache_folder: str = None) -> dict:
+    """
+    Extracts the variable access data of one archived log file. Runs in a worker process.
+
+    Args:
+        log_file (str): The path to the log file.
+        output_folder (str): The folder of the variable access files of this log.
+        save_sqlite (bool): Also write variable_access.db.
+        cache_folder (str, optional): The folder of the result cache, not used if None.
+
+    Returns:
+        dict: The index entry of the log file.
+    """
+    tic = time.perf_counter()
+    result = {"log_file": log_file, "output_folder": output_folder, "status": "OK", "variables": 0}
+    try:
+        if not os.path.exists(output_folder):
+            os.makedirs(output_folder)
+        variable_access = VariableAcces()
+        result_cache = ResultCache(cache_folder) if cache_folder else None
+        result["variables"] = variable_access.save_variable_access_files(log_file, output_folder, save_sqlite, result_cache)
+        if result["variables"] == 0:
+            result["status"] = "EMPTY"
+    except Exception as ex:
+        result["status"] = f"ERROR: {ex}"
+    result["seconds"] = time.perf_counter() - tic
+    return result
+
+
+class LogBatchProcessor:
+    """
+    Re-extracts the variable access data of an archive of saved Astree logs, across a process pool.
+    """
+
+    def __init__(self, output_folder: str, workers: int = None, save_sqlite: bool = False, cache_folder: str = None) -> None:
+        log.info("Init")
+        self.output_folder = output_folder
+        self.workers = workers if workers else os.cpu_count()
+        self.save_sqlite = save_sqlite
+        # Folder of the result cache shared by the workers, not used if None
+        self.cache_folder = cache_folder
+        if not os.path.exists(output_folder):
+            os.makedirs(output_folder)
+        pass
+
+    def write_index(self, results: list) -> str:
+        """
+        Writes the merged index of the processed logs to '<output_folder>/index.csv'.
+
+        Args:
+            results (list): The index entries returned by process_log_file.
+
+        Returns:
+            str: The path to the index file.
+        """
+        index_file = os.path.join(self.output_folder, 'index.csv')
+        with open(index_file, 'w') as f:
+            f.write(INDEX_CSV_HEADER)
+            for result in sorted(results, key=lambda result: result["log_file"]):
+                f.write(format_csv_row((result["log_file"], result["output_folder"], result["status"],
+                                        result["variables"], f'{result["seconds"]:.3f}')))
+        return index_file
+
+    def process(self, inputs: list) -> list:
+        """
+        Processes all the log files found in the inputs and writes the merged index.
+
+        Args:
+            inputs (list): Log files, folders or glob patterns (see find_log_files).
+
+        Returns:
+            list: The index entries of the processed logs.
+        """
+        log_files = find_log_files(inputs)
+        if not log_files:
+            log.error("No log file found")
+            return []
+        log.info("Processing %d log file(s) with %d worker(s) ...", len(log_files), self.workers)
+        common_folder = os.path.commonpath([os.path.dirname(log_file) for log_file in log_files])
+        # Imported here, multiprocessing takes a large part of the start-up time of the CLI
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        tic = time.perf_counter()
+        results = []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(process_log_file, log_file,
+                                       get_log_output_folder(log_file, common_folder, self.output_folder),
+                                       self.save_sqlite, self.cache_folder)
+                       for log_file in log_files]
+            for future in as_completed(futures):
+                result = future.result()
+                if result["status"] != "OK":
+                    log.warning("%s: %s", result["log_file"], result["status"])
+                results.append(result)
+        wall_time = time.perf_counter() - tic
+        index_file = self.write_index(results)
+        failed = len([result for result in results if result["status"].startswith("ERROR")])
+        log.info("Processed %d log file(s), %d failed, in %.2f s (%.1f files/s)",
+                 len(results), failed, wall_time, len(results) / wall_time)
+        log.info("Index: %s", index_file)
+        return results
@@ -0,0 +1,176 @@
+import os
+from utils.astree_log_utils.variable_access import DATA_DICTIONARY_MARKER, SHARED_MEMORY_MARKER, ALARM_MARKER, RESULT_SUMMARY_MARKER
+from utils.log import TagLogger
+
+# Number of bytes at the start of the file used to detect that it was rewritten
+HEAD_FINGERPRINT_SIZE = 64
+# Maximum number of bytes read by one poll, the rest of a large log is read by the next polls
+READ_BLOCK_SIZE = 1024 * 1024
+
+log = TagLogger("LogFollower")
+
+class LogFollower:
+    """
+    Follows a growing log file and returns only the lines appended since the last poll.
+
+    The follower remembers the byte offset it has read up to, so every byte of the log is
+    read once, at most READ_BLOCK_SIZE bytes per poll so a large log does not have to fit in
+    memory. A partial last line is kept until its end of line is written. The line endings
+    ('\r\n' from Windows tools included) are returned as '\n', like a file read in text mode,
+    so the lines are the ones VariableAcces reads from the complete log. If the file is
+    truncated, rewritten (its first bytes changed) or replaced by a new file (rotation), the
+    follower starts again from the beginning of the new content and reports it to the caller.
+    """
+
+    def __init__(self, log_file: str, encoding: str = 'utf-8', block_size: int = READ_BLOCK_SIZE) -> None:
+        log.info("Following log file: %s", log_file)
+        self.m_log_file = log_file
+        self.m_encoding = encoding
+        self.m_block_size = block_size
+        self.m_offset = 0
+        # Size of the file at the last poll
+        self.m_size = 0
+        self.m_file_id = None
+        self.m_head = b''
+        self.m_pending = b''
+        pass
+
+    def reset(self) -> None:
+        """
+        Forgets the read position so the next poll starts from the beginning of the file.
+        """
+        self.m_offset = 0
+        self.m_size = 0
+        self.m_file_id = None
+        self.m_head = b''
+        self.m_pending = b''
+
+    def has_unread_data(self) -> bool:
+        """
+        Checks if the file was longer than what the last poll read, so the next poll has lines
+        to return without waiting for the file to grow.
+        """
+        return self.m_offset < self.m_size
+
+    def read_lines(self) -> tuple:
+        """
+        Reads the complete lines appended to the log file since the last poll, from at most
+        one block of bytes (see has_unread_data).
+
+        Returns:
+            tuple: (lines, restarted) where lines is a list of decoded lines ending with '\n',
+                   and restarted is True if the file was truncated or rotated
+                   and the lines start again from the beginning of the file.
+
+        Raises:
+            FileNotFoundError: If the log file does not exist.
+        """
+        if not os.path.exists(self.m_log_file):
+            raise FileNotFoundError(f"File not found: {self.m_log_file}")
+        stat = os.stat(self.m_log_file)
+        file_id = (stat.st_dev, stat.st_ino)
+        restarted = False
+        if self.m_file_id is not None and (file_id != self.m_file_id or stat.st_size < self.m_offset):
+            restarted = True
+        if not restarted and stat.st_size == self.m_offset:
+            return [], restarted
+        with open(self.m_log_file, 'rb') as f:
+            # A file truncated and written again between two polls keeps its id and may be
+            # longer than the offset, so compare its first bytes with the ones already read
+            if not restarted and self.m_head:
+                restarted = f.read(len(self.m_head)) != self.m_head
+            if restarted:
+                log.info("Log file: %s truncated or rotated, restart reading", self.m_log_file)
+                self.reset()
+            self.m_file_id = file_id
+            self.m_size = stat.st_size
+            f.seek(self.m_offset)
+            data = f.read(self.m_block_size)
+        if len(self.m_head) < HEAD_FINGERPRINT_SIZE:
+            self.m_head = (self.m_head + data)[:HEAD_FINGERPRINT_SIZE]
+        self.m_offset += len(data)
+        # Keep the last line until it is complete, a last '\r' may be the first half of '\r\n'
+        data = self.m_pending + data
+        lines = data.splitlines(keepends=True)
+        if lines and not lines[-1].endswith(b'\n'):
+            self.m_pending = lines.pop()
+        else:
+            self.m_pending = b''
+        return [self.decode_line(line) for line in lines], restarted
+
+    def decode_line(self, line: bytes) -> str:
+        """
+        Decodes a complete line, with its '\r\n' or '\r' line ending replaced by '\n'.
+        """
+        if line.endswith(b'\r\n'):
+            line = line[:-2] + b'\n'
+        elif line.endswith(b'\r'):
+            line = line[:-1] + b'\n'
+        return line.decode(self.m_encoding, errors='replace')
+
+
+class LogMarkerState:
+    """
+    State machine over the markers of an Astree log.
+
+    The data dictionary starts with '#data-dictionary:' and ends with '#shared memory usage:'
+    or '#ALARM'. The analysis is complete once the dictionary is closed and both the
+    '/* Result summary */' and '#shared memory usage:' markers have been written.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+        pass
+
+    def reset(self) -> None:
+        """
+        Returns the state machine to its initial state.
+        """
+        self.m_dictionary_found = False
+        self.m_in_dictionary = False
+        self.m_dictionary_closed = False
+        self.m_shared_memory_found = False
+        self.m_result_summary_found = False
+
+    def feed(self, line: str) -> None:
+        """
+        Advances the state machine with the next line of the log.
+
+        Args:
+            line (str): A line of the log file.
+        """
+        if self.m_in_dictionary:
+            if SHARED_MEMORY_MARKER in line or ALARM_MARKER in line:
+                self.m_in_dictionary = False
+                self.m_dictionary_closed = True
+        elif not self.m_dictionary_found and DATA_DICTIONARY_MARKER in line:
+            self.m_dictionary_found = True
+            self.m_in_dictionary = True
+            return
+        if not self.m_shared_memory_found and SHARED_MEMORY_MARKER in line:
+            self.m_shared_memory_found = True
+        if not self.m_result_summary_found and RESULT_SUMMARY_MARKER in line:
+            self.m_result_summary_found = True
+
+    def is_complete(self) -> bool:
+        """
+        Checks if the log contains the whole data dictionary and the analysis is finished.
+
+        Returns:
+            bool: True if all the markers have been found.
+        """
+        return self.m_dictionary_closed and self.m_shared_memory_found and self.m_result_summary_found
+
+
+def is_log_complete(log_file: str, encoding: str = 'utf-8') -> bool:
+    """
+    Checks if a log file already holds all the markers of a finished analysis (see LogMarkerState).
+    Only the markers are searched, the records are not parsed.
+    """
+    log_markers = LogMarkerState()
+    with open(log_file, 'r', encoding=encoding, errors='replace') as f:
+        for line in f:
+            log_markers.feed(line)
+            if log_markers.is_complete():
+                return True
+    return False
@@ -1,16 +1,39 @@
-import logging
 import os
 import shutil
+import tempfile
+import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from utils.astree_log_utils.variable_access import VariableAcces
+from utils.astree_log_utils.variable_access import VariableAcces, get_csv_row_count
+from utils.astree_log_utils.log_follower import LogFollower, LogMarkerState, is_log_complete
+from utils.astree_log_utils.variable_access_writer import LiveVariableAccessWriter
+from utils.run_report import RunReport
 import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.log import TagLogger
+
+RUN_FOLDER_PREFIX = 'a3c-'
+PERSISTENT_FOLDER_NAME = 'persistent'
+LOG_FILE_NAME = 'log.txt'
+# A run whose log file was modified less than this number of seconds ago is active, unless
+# the log already holds the end markers of the analysis
+ACTIVE_LOG_WINDOW = 30
+# Maximum time to wait for the log file of the active run, in seconds
+FIND_LOG_TIMEOUT = 60
+# Time between two checks of the log file growth when no file event is received, in seconds
+FIND_LOG_RECHECK_TIME = 1
+# Maximum number of runs monitored at the same time by LogMonitor.monitor_all
+MAX_CONCURRENT_RUNS = 32
+
+log = TagLogger("LogMonitor")
+handler_log = TagLogger("LogFileHandler")
+discovery_log = TagLogger("LogDiscoveryHandler")
 
 class LogFileHandler(FileSystemEventHandler):
     """Handler that triggers when log.txt is modified or created."""
     
     def __init__(self, log_file: str, output_directory:str) -> None:
-        logging.info("LogFileHandler", "Init")
+        handler_log.info("Init")
         self.astree_variable_access = VariableAcces()
         self.log_data = None
         self.log_file = log_file
@@ -25,12 +48,12 @@ class LogFileHandler(FileSystemEventHandler):
     def on_modified(self, event):
         if event.src_path == self.log_file:
             # self.__get_variable_access()
-            logging.info("LogFileHandler", f"Log file: {self.log_file} modified")
+            handler_log.info("Log file: %s modified", self.log_file)
             self.__read_log()
             
     def on_deleted(self, event):
         if event.src_path == self.log_file:
-            logging.info("LogFileHandler", f"Log file: {self.log_file} deleted")
+            handler_log.info("Log file: %s deleted", self.log_file)
             self.__get_variable_access()
 
     def __copy_log(self):
@@ -67,167 +90,462 @@ class LogFileHandler(FileSystemEventHandler):
             with open(output_file, 'w', encoding='utf-8') as f:
                 f.write(data_range_str)
         
+class LogDiscoveryHandler(FileSystemEventHandler):
+    """
+    Handler that triggers when an 'a3c-*/persistent/log.txt' file is created or modified in the temp folder.
+
+    The temp folder is shared with every other program, so it is not watched recursively: the
+    temp folder itself is watched for new 'a3c-*' folders, and each run gets a watch of its
+    'persistent' folder only (of the run folder until its 'persistent' folder is created).
+    """
+    
+    def __init__(self, temp_root: str) -> None:
+        self.temp_root = os.path.normcase(os.path.abspath(temp_root))
+        self.log_found = threading.Event()
+        self.observer = None
+        # Watched run or persistent folder -> watch of the observer
+        self.watches = {}
+        self.lock = threading.Lock()
+        pass
+    
+    def start(self, observer) -> None:
+        """
+        Schedules the watch of the temp folder and of the runs already in it, then starts the observer.
+        """
+        self.observer = observer
+        observer.schedule(self, self.temp_root, recursive=False)
+        # Runs created from now on are reported by the watch of the temp folder
+        for folder in os.listdir(self.temp_root):
+            if folder.startswith(RUN_FOLDER_PREFIX):
+                self.watch_run_folder(os.path.join(self.temp_root, folder))
+        observer.start()
+    
+    def watch(self, folder: str) -> bool:
+        """
+        Watches a folder, non-recursively. Returns False if it is already watched or does not exist.
+        """
+        with self.lock:
+            if folder in self.watches:
+                return False
+            try:
+                self.watches[folder] = self.observer.schedule(self, folder, recursive=False)
+            except OSError:
+                # The folder was deleted meanwhile
+                return False
+        return True
+    
+    def unwatch(self, folder: str) -> None:
+        with self.lock:
+            watch = self.watches.pop(folder, None)
+            if watch is not None:
+                try:
+                    self.observer.unschedule(watch)
+                except (KeyError, OSError):
+                    pass
+    
+    def watch_run_folder(self, run_folder: str) -> None:
+        """
+        Watches the 'persistent' folder of a run, or the run folder until it is created.
+        """
+        persistent_folder = os.path.join(run_folder, PERSISTENT_FOLDER_NAME)
+        if not os.path.isdir(persistent_folder):
+            self.watch(run_folder)
+            # The 'persistent' folder may have been created before the run folder was watched
+            if not os.path.isdir(persistent_folder):
+                return
+        self.watch_persistent_folder(persistent_folder)
+    
+    def watch_persistent_folder(self, persistent_folder: str) -> None:
+        if self.watch(persistent_folder):
+            self.unwatch(os.path.dirname(persistent_folder))
+            # The log file may have been written before the folder was watched
+            self.log_found.set()
+    
+    def is_run_folder(self, path: str) -> bool:
+        """
+        Checks if the given path is '<temp_root>/a3c-*'.
+        """
+        parent_folder, run_name = os.path.split(path)
+        return run_name.startswith(RUN_FOLDER_PREFIX) and os.path.normcase(os.path.abspath(parent_folder)) == self.temp_root
+    
+    def is_run_log_file(self, path: str) -> bool:
+        """
+        Checks if the given path is '<temp_root>/a3c-*/persistent/log.txt'.
+        """
+        persistent_folder, file_name = os.path.split(path)
+        if file_name != LOG_FILE_NAME:
+            return False
+        run_folder, persistent_name = os.path.split(persistent_folder)
+        return persistent_name == PERSISTENT_FOLDER_NAME and self.is_run_folder(run_folder)
+    
+    def on_created(self, event):
+        if event.is_directory:
+            if self.is_run_folder(event.src_path):
+                discovery_log.debug("Run folder: %s created", event.src_path)
+                self.watch_run_folder(event.src_path)
+            elif os.path.basename(event.src_path) == PERSISTENT_FOLDER_NAME and self.is_run_folder(os.path.dirname(event.src_path)):
+                self.watch_persistent_folder(event.src_path)
+        elif self.is_run_log_file(event.src_path):
+            discovery_log.info("Log file: %s created", event.src_path)
+            self.log_found.set()
+    
+    def on_modified(self, event):
+        if not event.is_directory and self.is_run_log_file(event.src_path):
+            self.log_found.set()
+    
+    def on_deleted(self, event):
+        if event.src_path in self.watches:
+            self.unwatch(event.src_path)
+        
 class LogMonitor:
     
-    def __init__(self, output_folder) -> None:
-        logging.info("LogMonitor", "Init")
-        self.astree_variable_access = VariableAcces()
+    def __init__(self, output_folder, save_sqlite=False, temp_root=None, result_cache=None, run_report=None, live=True) -> None:
+        log.info("Init")
+        # Phase timers and counters of the monitoring and of the extractions, saved to the output folder
+        self.run_report = run_report if run_report is not None else RunReport("monitor")
+        self.astree_variable_access = VariableAcces(self.run_report)
         self.output_folder = output_folder
-        self.removed_folder = []
+        # Also write the variable access data to variable_access.db
+        self.save_sqlite = save_sqlite
+        # Folder where Astree creates its 'a3c-*' run folders, the user's temp folder by default
+        self.temp_root = temp_root if temp_root else tempfile.gettempdir()
+        # ResultCache of the variable access files of the logs already complete when they are found, not used if None
+        self.result_cache = result_cache
+        # Write the data dictionary records while the analysis is running (see LiveVariableAccessWriter),
+        # instead of extracting them from the log once it is finished
+        self.live = live
+        # Size of each run log file at the previous check, to detect the growing ones
+        self.log_sizes = {}
+        # (size, modification time) and completeness of the recently modified run log files,
+        # a log file is only read again when it changed
+        self.log_completions = {}
+        # Set by stop() to end the monitoring before the analysis is finished
+        self.stop_event = threading.Event()
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
         pass
     
-    def __find_log_file(self):
+    def stop(self) -> None:
         """
-        Searches for the log file in the user's temporary directory.
-        This method attempts to locate a log file within a folder that starts with 'a3c-' 
-        in the current user's temporary directory. It performs the following steps:
-        1. Retrieves the current Windows user.
-        2. Searches for folders starting with 'a3c-' in the user's temp directory.
-        3. Checks if the log file is currently open by another process.
-        4. If the log file is not open, it deletes the folder and adds it to the removed_folder list.
-        5. If exactly one log file is found, it returns the path to the log file.
-        6. Logs appropriate messages based on the outcome of the search.
-        Returns:
-            str: The path to the log file if found and only one log file is present.
-            None: If no log file or more than one log file is found.
-        """
-        logging.info("VariableAcces", "Finding log file ...")
-        # Get windows current user
-        user = os.getlogin()
-        # Try to search log file in the log folder
-        log_folder = f'C:\\Users\\{user}\\AppData\\Local\\Temp'
-        # Search and find folder start with 'a3c-'
-        found_no = 0
-        for folder in os.listdir(log_folder):
-            if 'a3c-' in folder:
-                current_folder = os.path.join(log_folder, folder)
-                if current_folder in self.removed_folder:
-                    continue
-                txt_log_file = os.path.join(current_folder,'persistent', 'log.txt')
-                log_file = os.path.join(current_folder,'persistent', 'astree.log')
-                if not os.path.isfile(log_file):
-                    continue
-                else:
-                    # Check if the log file is currently open by another process
+        Stops the monitoring from another thread: monitor() returns False at the next check of
+        the log file, without writing the final output files.
+        """
+        log.info("Stop requested")
+        self.stop_event.set()
+    
+    def __find_run_log_files(self) -> list:
+        """
+        Lists the 'persistent/log.txt' files of the 'a3c-*' run folders in the temp folder.
+        """
+        log_files = []
+        for folder in os.listdir(self.temp_root):
+            if not folder.startswith(RUN_FOLDER_PREFIX):
+                continue
+            log_file = os.path.join(self.temp_root, folder, 'persistent', LOG_FILE_NAME)
+            if os.path.isfile(log_file):
+                log_files.append(log_file)
+        return log_files
+    
+    def __find_active_log_files(self, prefer_growing=True) -> list:
+        """
+        Returns the log files of the runs that are currently active.
+        A run is active if its log file grew since the previous check, or was modified less
+        than ACTIVE_LOG_WINDOW seconds ago and does not hold the end markers of the analysis
+        yet (see is_log_complete), so a run that just finished is not taken for a running one.
+        A log file is only read for its markers when its size or modification time changed,
+        the run folders are never renamed nor deleted.
+        Args:
+            prefer_growing (bool): If several runs are active, only return the growing ones (if any).
+        """
+        now = time.time()
+        active_log_files = []
+        log_sizes = {}
+        log_completions = {}
+        for log_file in self.__find_run_log_files():
+            try:
+                stat = os.stat(log_file)
+            except OSError:
+                continue
+            log_sizes[log_file] = stat.st_size
+            is_growing = log_file in self.log_sizes and stat.st_size > self.log_sizes[log_file]
+            if is_growing:
+                active_log_files.append((is_growing, log_file))
+            elif now - stat.st_mtime < ACTIVE_LOG_WINDOW:
+                # Modified recently but not growing: only active if the analysis is not finished
+                file_state = (stat.st_size, stat.st_mtime_ns)
+                completion = self.log_completions.get(log_file)
+                if completion is None or completion[0] != file_state:
                     try:
-                        os.listdir(current_folder)
-                        with open(log_file, 'r', encoding='utf-8') as f:
-                            pass
-                        # Try to rename current folder
-                        shutil.move(current_folder, current_folder+'_')
-                        # Rename folder back
-                        shutil.move(current_folder+'_', current_folder)
-                        # If nothing is hold the log file, delete the folder
-                        shutil.rmtree(current_folder)
-                        self.removed_folder.append(current_folder)
-                        continue
-                    except:
-                        log_folder = os.path.join(log_folder, folder)
-                        found_no += 1
+                        completion = (file_state, is_log_complete(log_file))
+                    except OSError:
                         continue
-                    
-                # Try to delete the folder, if could not delete, this is the log folder
-                # try:
-                #     shutil.rmtree(os.path.join(log_folder, folder))
-                # except:
-                #     log_folder = os.path.join(log_folder, folder)
-                #     found_no += 1
-                    # continue
-        if found_no == 1:
-            log_file = os.path.join(log_folder,'persistent', 'log.txt')
-            if not os.path.isfile(log_file):
-                logging.error("VariableAcces", "Log file does not exist")
-                return None
-            logging.info("VariableAcces", f"Log file found: {log_file}")
-            return log_file
-        else:
-            logging.error("VariableAcces", f"ERROR: Different than one log file found: {found_no} file(s)")
-            return None
+                log_completions[log_file] = completion
+                if not completion[1]:
+                    active_log_files.append((is_growing, log_file))
+        self.log_sizes = log_sizes
+        self.log_completions = log_completions
+        # Prefer the growing log files when several runs were modified recently
+        growing_log_files = [log_file for is_growing, log_file in active_log_files if is_growing]
+        if prefer_growing and len(active_log_files) > 1 and growing_log_files:
+            return growing_log_files
+        return [log_file for is_growing, log_file in active_log_files]
     
-    def __monitor(self, log_file):
+    def __find_log_file(self):
+        """
+        Searches for the log file of the active Astree run in the temp folder.
+        This method looks for 'a3c-*/persistent/log.txt' files in the temp folder and keeps
+        the ones that are active (see __find_active_log_files).
+        Returns:
+            str: The path to the log file if exactly one active run is found.
+            None: If no active run or more than one active run is found.
+        """
+        log.debug("Finding log file ...")
+        log_files = self.__find_active_log_files()
+        if len(log_files) == 1:
+            log.info("Log file found: %s", log_files[0])
+            return log_files[0]
+        elif len(log_files) > 1:
+            log.warning("Different than one active log file found: %s file(s), waiting ...", len(log_files))
+        return None
+    
+    def __wait_log_file(self, timeout: float):
+        """
+        Waits for the log file of the active Astree run.
+        A watchdog observer on the temp folder and on the run folders (see LogDiscoveryHandler)
+        wakes up the search as soon as a run log file is created or modified, so a new run is
+        picked up without polling delay.
+        Args:
+            timeout (float): The maximum waiting time in seconds.
+        Returns:
+            str: The path to the log file, None if not found before the timeout or if stopped.
+        """
+        discovery_handler = LogDiscoveryHandler(self.temp_root)
+        observer = Observer()
+        discovery_handler.start(observer)
+        try:
+            tic = time.time()
+            while True:
+                discovery_handler.log_found.clear()
+                log_file = self.__find_log_file()
+                if log_file:
+                    return log_file
+                remaining_time = timeout - (time.time() - tic)
+                if remaining_time <= 0 or self.stop_event.is_set():
+                    return None
+                # Wake up on a log file event, or re-check the growth of the known log files
+                discovery_handler.log_found.wait(min(remaining_time, FIND_LOG_RECHECK_TIME))
+        finally:
+            observer.stop()
+            observer.join()
+    
+    def __monitor(self, log_file, output_folder=None, record_queue=None):
         """
         Monitors the specified log file for specific content and processes it accordingly.
-        This method continuously checks the log file for the presence of specific markers
-        ("#data-dictionary:", "/* Result summary */", and "#shared memory usage:"). If the
-        markers are found, it processes the log data and writes the variable access data to
-        an output file. If the log file is incomplete or the markers are not found, it waits
-        for a specified delay time before checking again.
+        This method follows the log file and only reads the bytes appended since the last
+        check. Every new line is fed to a marker state machine ("#data-dictionary:",
+        "#shared memory usage:" / "#ALARM" and "/* Result summary */"). In live mode, the
+        lines of the data dictionary are parsed as they arrive and written to the .part
+        output files after every check, which are renamed once all the markers are found.
+        Otherwise the log data is processed once all the markers are found. If the log file
+        is incomplete, it waits for a specified delay time before checking again. With a
+        result cache and no record queue, a log that is already complete when it is found is
+        not followed: its outputs are restored from the cache, or extracted and stored.
         Args:
             log_file (str): The path to the log file to be monitored.
+            output_folder (str, optional): The folder of the output files, self.output_folder by default.
+            record_queue (queue.Queue, optional): Queue receiving the batches of parsed records in live mode.
+        Returns:
+            bool: True if the output files were written, False if the monitoring was stopped.
         Raises:
             FileNotFoundError: If the specified log file does not exist.
         """
+        if output_folder is None:
+            output_folder = self.output_folder
+        if self.result_cache and self.live and record_queue is None and is_log_complete(log_file):
+            log.info("Log file %s already complete, using the result cache", log_file)
+            variable_count = self.astree_variable_access.save_variable_access_files(
+                log_file, output_folder, self.save_sqlite, self.result_cache)
+            if variable_count == 0:
+                log.warning("Data dictionary is empty")
+            return True
+        log_follower = LogFollower(log_file)
+        log_markers = LogMarkerState()
+        live_writer = LiveVariableAccessWriter(output_folder, self.astree_variable_access, self.save_sqlite,
+                                               record_queue=record_queue, stop_event=self.stop_event) if self.live else None
         delay_time = 0
-        while True:
-            if delay_time > 0:
-                # logging.info("LogMonitor", f"Log file is incomplete, waiting for {delay_time} seconds ...")
-                time.sleep(delay_time)
-            # Check if the log file exists
-            if not os.path.exists(log_file):
-                raise FileNotFoundError(f"File not found: {log_file}")
-            # Read from the log file
-            with open(log_file, 'r', encoding='utf-8') as f:
-                log_data_list = f.readlines()
-                log_data_str = '\n'.join(log_data_list)
-            
-            # logging.info("LogMonitor", f"len(log_data_list): {len(log_data_list)}")
-            # logging.info("LogMonitor", log_data_str)
-            if "#data-dictionary:" not in log_data_str:
-                delay_time = 1
-                continue
-            elif "#data-dictionary:" in log_data_str and ("/* Result summary */" not in log_data_str or '#shared memory usage:' not in log_data_str):
-                delay_time = 0.1
-                continue
+        try:
+            with self.run_report.phase("wait_markers"):
+                while True:
+                    # Wait for the next check, woken up by stop()
+                    if self.stop_event.wait(delay_time):
+                        log.warning("Monitoring of %s stopped", log_file)
+                        return False
+                    # Read only the new lines of the log file
+                    offset = log_follower.m_offset
+                    new_lines, restarted = log_follower.read_lines()
+                    if live_writer:
+                        # The bytes of this poll, from the start of the file again if it restarted
+                        self.run_report.count("log_bytes_read", log_follower.m_offset - (0 if restarted else offset))
+                    if restarted:
+                        log_markers.reset()
+                        if live_writer:
+                            live_writer.reset()
+                    for line in new_lines:
+                        in_dictionary = log_markers.m_in_dictionary
+                        log_markers.feed(line)
+                        # The lines between the markers, the markers themselves are not written
+                        if in_dictionary and log_markers.m_in_dictionary and live_writer:
+                            live_writer.add_line(line)
+                    if live_writer:
+                        live_writer.flush()
+                    self.run_report.count("log_lines_followed", len(new_lines))
+                    
+                    if not log_markers.m_dictionary_found:
+                        delay_time = 1
+                    elif not log_markers.is_complete():
+                        delay_time = 0.1
+                    else:
+                        break
+                    if log_follower.has_unread_data():
+                        # Only one block was read, read the next one at once
+                        delay_time = 0
+            if live_writer:
+                # The analysis is finished and the records are already written
+                variable_count = live_writer.complete()
+                self.run_report.count("dictionary_lines_parsed", live_writer.m_line_count)
+                self.run_report.count("variables_extracted", variable_count)
+                self.run_report.count("dictionary_lines_skipped", live_writer.m_line_count - variable_count)
             else:
-                variable_access_data = self.astree_variable_access.get_data_from_log(log_data_list)
-                if variable_access_data:
-                    variable_access_txt_file = os.path.join(self.output_folder, 'variable_access.txt')
-                    with open(variable_access_txt_file, 'w', encoding='utf-8') as f:
-                        f.write(variable_access_data)
-                    variable_access_csv_file = os.path.join(self.output_folder, 'variable_access.csv')
-                    self.astree_variable_access.save_variable_access_to_csv(log_data_list, variable_access_csv_file)
-                    return
+                # The analysis is finished, extract the data dictionary in a single streaming pass
+                variable_count = self.astree_variable_access.save_variable_access_files(
+                    log_file, output_folder, self.save_sqlite, self.result_cache)
+        finally:
+            if live_writer:
+                live_writer.close()
+        if variable_count == 0:
+            log.warning("Data dictionary is empty")
+        return True
     
-    def monitor(self):
+    def monitor(self, record_queue=None):
         """
         Monitors the log file for changes and handles the creation of a variable access file.
         This method performs the following steps:
         1. Logs the start of monitoring.
-        2. Finds the log file to monitor.
-        3. Logs an error and exits if the log file is not found.
+        2. Waits for the log file of the active run, woken up by file system events on the temp folder.
+        3. Logs an error and exits if the log file is not found before FIND_LOG_TIMEOUT.
         4. Ensures the output directory exists, creating it if necessary.
-        5. Sets up a file system event handler for the log file.
-        6. Starts an observer to watch for changes in the log file directory.
-        7. Continuously checks for the existence of a 'variable_access.txt' file in the output directory.
-        8. Stops the observer if the 'variable_access.txt' file is created or if a KeyboardInterrupt is received.
+        5. Follows the log file until the data dictionary and the result summary are written.
+        6. Writes the variable access files to the output directory.
+        Args:
+            record_queue (queue.Queue, optional): Queue receiving the batches of parsed records as
+                                                  they are written, see LiveVariableAccessWriter.
+        Returns:
+            bool: True if the variable access files were written, False if no log file was found
+                  or if the monitoring was stopped.
         Raises:
             KeyboardInterrupt: If the monitoring is interrupted by the user.
         """
-        logging.info("LogMonitor", "Monitoring log file ...")
+        log.info("Monitoring log file ...")
         output_directory = self.output_folder
         variable_access_file = os.path.join(output_directory, 'variable_access.txt')
         if os.path.exists(variable_access_file):
             os.remove(variable_access_file)
-        # Find the log file to monitor for 30 seconds
-        # Get current time stamp
-        tic = time.time()
-        while True:
-            log_file = self.__find_log_file()
-            if log_file:
-                break
-            time.sleep(3)
-            toc = time.time()
-            if toc - tic > 60:
-                logging.error("LogMonitor", "Finding log file timeout")
-                return
-        
-        if not os.path.exists(output_directory):
-            os.makedirs(output_directory)
+        try:
+            # Wait for the log file to monitor
+            with self.run_report.phase("find_log_file"):
+                log_file = self.__wait_log_file(FIND_LOG_TIMEOUT)
+            if not log_file:
+                if not self.stop_event.is_set():
+                    log.error("Finding log file timeout")
+                return False
             
-        logging.info("LogMonitor", "Waiting for the variable access data ...")
-        self.__monitor(log_file)
-        logging.info("LogMonitor", "Get variable access data successfully")
+            if not os.path.exists(output_directory):
+                os.makedirs(output_directory)
+                
+            log.info("Waiting for the variable access data ...")
+            self.run_report.count("runs")
+            if not self.__monitor(log_file, record_queue=record_queue):
+                return False
+            log.info("Get variable access data successfully")
+            return True
+        finally:
+            self.run_report.save(output_directory)
     
-    
\ No newline at end of file
+    def __monitor_run(self, log_file: str, output_folder: str) -> int:
+        """
+        Monitors one run of a multi-run monitoring, in its own thread.
+        Args:
+            log_file (str): The path to the log file of the run.
+            output_folder (str): The output folder of the run.
+        Returns:
+            int: The number of variables written, None if the run failed.
+        """
+        if not os.path.exists(output_folder):
+            os.makedirs(output_folder)
+        log.info("Monitoring run: %s", get_run_id(log_file))
+        self.run_report.count("runs")
+        try:
+            if not self.__monitor(log_file, output_folder):
+                return None
+        except Exception as ex:
+            # A failing run must not stop the monitoring of the other runs
+            log.error("Run %s failed: %s", get_run_id(log_file), ex)
+            self.run_report.count("runs_failed")
+            return None
+        log.info("Get variable access data of run %s successfully", get_run_id(log_file))
+        return get_csv_row_count(os.path.join(output_folder, 'variable_access.csv'))
+    
+    def monitor_all(self, idle_timeout=FIND_LOG_TIMEOUT, max_runs=MAX_CONCURRENT_RUNS) -> dict:
+        """
+        Monitors every active Astree run at the same time.
+        Each run found in the temp folder gets its own thread, with its own log follower and
+        parser, and writes its variable access files to '<output_folder>/<run id>', where the
+        run id is the name of its 'a3c-*' folder. New runs are picked up while the others are
+        monitored. The monitoring ends when all the runs are finished and no new run started
+        for idle_timeout seconds.
+        Args:
+            idle_timeout (float): The time to wait for a new run once all the runs are finished, in seconds.
+            max_runs (int): The maximum number of runs monitored at the same time.
+        Returns:
+            dict: The number of variables written for each run id, None for the failed runs.
+        """
+        log.info("Monitoring all runs ...")
+        discovery_handler = LogDiscoveryHandler(self.temp_root)
+        observer = Observer()
+        discovery_handler.start(observer)
+        runs = {}
+        executor = ThreadPoolExecutor(max_workers=max_runs, thread_name_prefix="LogMonitor")
+        try:
+            idle_since = time.time()
+            while True:
+                discovery_handler.log_found.clear()
+                for log_file in self.__find_active_log_files(prefer_growing=False):
+                    if log_file in runs:
+                        continue
+                    if len([run for run in runs.values() if not run.done()]) >= max_runs:
+                        log.warning("More than %s runs active, run %s is waiting", max_runs, get_run_id(log_file))
+                        break
+                    output_folder = os.path.join(self.output_folder, get_run_id(log_file))
+                    runs[log_file] = executor.submit(self.__monitor_run, log_file, output_folder)
+                if not all(run.done() for run in runs.values()):
+                    idle_since = time.time()
+                elif time.time() - idle_since > idle_timeout:
+                    break
+                discovery_handler.log_found.wait(FIND_LOG_RECHECK_TIME)
+        finally:
+            observer.stop()
+            observer.join()
+            executor.shutdown(wait=True)
+            # One report for all the runs, in the parent of the run folders
+            self.run_report.save(self.output_folder)
+        results = {get_run_id(log_file): run.result() for log_file, run in runs.items()}
+        log.info("Monitored %s run(s)", len(results))
+        return results
+
+
+def get_run_id(log_file: str) -> str:
+    """
+    Returns the id of the run of a log file: the name of its 'a3c-*' folder.
+    """
+    return os.path.basename(os.path.dirname(os.path.dirname(log_file)))
+
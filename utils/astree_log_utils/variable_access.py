@@ -1,10 +1,98 @@
-import logging
 import os
+import sqlite3
+from utils.astree_log_utils.variable_range import VariableRange, get_range_text
+from utils.run_report import RunReport
+from utils.log import TagLogger
+
+# Markers of the data dictionary block in the Astree log
+DATA_DICTIONARY_MARKER = '#data-dictionary:'
+SHARED_MEMORY_MARKER = '#shared memory usage:'
+ALARM_MARKER = '#ALARM'
+RESULT_SUMMARY_MARKER = '/* Result summary */'
+
+CSV_HEADER = "Variable Name,Variable Type,Variable Range\n"
+
+# Version of the extraction, part of the result cache key: increase it when the output changes
+PARSER_VERSION = "1"
+
+# Compact on-disk format of the variable access data, the numeric bounds are stored as REAL
+SQLITE_FORMAT_VERSION = 1
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS variable_access (
+    name TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    lower REAL NOT NULL,
+    upper REAL NOT NULL,
+    is_integer INTEGER NOT NULL,
+    range TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+SQLITE_INSERT = "INSERT OR IGNORE INTO variable_access VALUES (?, ?, ?, ?, ?, ?)"
+
+log = TagLogger("VariableAcces")
+
+def format_csv_row(fields) -> str:
+    """
+    Joins the fields to a CSV line. Only the fields containing a comma are quoted, so names
+    such as 'IF_SUSS60_Out1_kb@"USSDB.c"' are written as they are.
+    """
+    csv_fields = []
+    for field in map(str, fields):
+        if ',' in field:
+            field = '"' + field.replace('"', '""') + '"'
+        csv_fields.append(field)
+    return ','.join(csv_fields) + '\n'
+
+def get_csv_row_count(csv_file: str) -> int:
+    """
+    Returns the number of rows of a CSV file, without its header.
+    """
+    if not os.path.exists(csv_file):
+        return 0
+    with open(csv_file, 'r') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+# Keywords of a data dictionary record, e.g.
+# "[23:44:04] #  ADC_AXF_p_EnaPlausBlndLgtF_b of type const boolean in [0, 1]"
+RECORD_TYPE_KEYWORD = ' of type '
+RECORD_RANGE_KEYWORD = ' in '
+
+def parse_variable_record(log_data: str) -> list:
+    """
+    Splits a data dictionary record into its name, type and range, with str.partition: one pass
+    over the line per keyword, no regex.
+
+    The name is the word between the last '#' and ' of type ', the range follows the last ' in ',
+    so the names and types containing 'in' (e.g. 'int') are not cut.
+
+    Args:
+        log_data (str): The log data string.
+
+    Returns:
+        list: [variable name, variable type, variable range], or None if the log data is not a
+              data dictionary record.
+    """
+    head, separator, tail = log_data.partition(RECORD_TYPE_KEYWORD)
+    if not separator:
+        return None
+    separator, variable_name = head.rpartition('#')[1:]
+    variable_name = variable_name.strip()
+    if not separator or not variable_name or ' ' in variable_name or '\t' in variable_name:
+        return None
+    variable_type, separator, variable_range = tail.rpartition(RECORD_RANGE_KEYWORD)
+    variable_type = variable_type.strip()
+    variable_range = variable_range.strip()
+    if not separator or not variable_type or not variable_range:
+        return None
+    return [variable_name, variable_type, variable_range]
 
 class VariableAcces:
     
-    def __init__(self) -> None:
-        logging.info("VariableAcces", "Init")
+    def __init__(self, run_report: RunReport = None) -> None:
+        log.info("Init")
+        # Phase timers and counters of the extractions, saved by the caller
+        self.m_run_report = run_report if run_report is not None else RunReport("variable_access")
         pass
     
     def get_data_from_log(self, log_data: list) -> str:
@@ -25,7 +113,7 @@ class VariableAcces:
         Raises:
             FileNotFoundError: If the log data is empty.
         """
-        logging.info("VariableAcces", "Getting data from log file ...")
+        log.info("Getting data from log file ...")
         # Check if the log data exists
         if len(log_data) == 0:
             raise FileNotFoundError(f"Log data is empty")
@@ -34,13 +122,13 @@ class VariableAcces:
         # Find the line that contains the data range
         is_in_data_range_block = False
         for line in lines:
-            if '#data-dictionary:' in line and not is_in_data_range_block:
+            if DATA_DICTIONARY_MARKER in line and not is_in_data_range_block:
                 is_in_data_range_block = True
                 continue
-            elif is_in_data_range_block and '#shared memory usage:' in line:
+            elif is_in_data_range_block and SHARED_MEMORY_MARKER in line:
                 data_range_str = '\n'.join(data_range)
                 return data_range_str
-            elif is_in_data_range_block and '#ALARM' in line:
+            elif is_in_data_range_block and ALARM_MARKER in line:
                 data_range_str = '\n'.join(data_range)
                 return data_range_str
             elif is_in_data_range_block:
@@ -54,21 +142,13 @@ class VariableAcces:
         The log data string is expected to follow a specific format, for example:
         "[23:44:04] #  ADC_AXF_p_EnaPlausBlndLgtF_b of type const boolean in [0, 1]"
 
-        This method checks if the log data contains the substrings "of type", "in", and "#".
-
         Args:
             log_data (str): The log data string to validate.
 
         Returns:
             bool: True if the log data string is in the expected format, False otherwise.
         """
-        # log_data example:
-        # "[23:44:04] #  ADC_AXF_p_EnaPlausBlndLgtF_b of type const boolean in [0, 1]""
-        # strip the log_data
-        log_data = log_data.strip()
-        if "of type" in log_data and "in" in log_data and "#" in log_data:
-            return True
-        return False
+        return parse_variable_record(log_data) is not None
     
     def get_variable_name(self, log_data: str) -> str:
         """
@@ -80,9 +160,7 @@ class VariableAcces:
         Returns:
             str: The extracted variable name.
         """
-        variable_name = log_data.split("of type")[0].strip()
-        variable_name = variable_name.split("#")[1].strip()
-        return variable_name
+        return parse_variable_record(log_data)[0]
     
     def get_variable_range(self, log_data: str) -> str:
         """
@@ -94,8 +172,7 @@ class VariableAcces:
         Returns:
             str: The extracted variable range.
         """
-        variable_range = log_data.split("in")[1].strip()
-        return variable_range
+        return parse_variable_record(log_data)[2]
     
     def get_variable_type(self, log_data: str) -> str:
         """
@@ -107,8 +184,7 @@ class VariableAcces:
         Returns:
             str: The extracted variable type.
         """
-        variable_type = log_data.split("of type")[1].split("in")[0].strip()
-        return variable_type
+        return parse_variable_record(log_data)[1]
         
     def get_variable_data(self, log_data: str) -> list:
         """
@@ -121,16 +197,8 @@ class VariableAcces:
             list: A list containing the variable name, type, and range if the log data is valid.
                   Returns None if the log data is invalid.
         """
-        # validate the log data
-        if not self.validate_variable_data(log_data):
-            return None
-        # get the variable name
-        variable_name = self.get_variable_name(log_data)
-        # get the variable type
-        variable_type = self.get_variable_type(log_data)
-        # get the variable range
-        variable_range = self.get_variable_range(log_data)
-        return [variable_name, variable_type, variable_range]
+        # Name, type and range are extracted in a single pass
+        return parse_variable_record(log_data)
     
     def is_float(self, value: str) -> bool:
         """_summary_
@@ -153,6 +221,18 @@ class VariableAcces:
         except ValueError:
             return False
     
+    def parse_range(self, variable_range: str) -> VariableRange:
+        """
+        Parses the given variable range into a VariableRange.
+
+        Args:
+            variable_range (str): The variable range string, e.g. "[0, 1]" or "{40} /\\ != 0".
+
+        Returns:
+            VariableRange: The parsed range, or None if the range is invalid.
+        """
+        return VariableRange.parse(variable_range)
+    
     def get_range_values(self, variable_range: str) -> str:
         """
         Extracts the minimum and maximum values from the given variable range.
@@ -161,34 +241,9 @@ class VariableAcces:
             variable_range (str): The variable range string.
 
         Returns:
-            list: A str containing the minimum and maximum values.
+            str: A "min..max" str of the range, None if the range is invalid or unbounded.
         """
-        try:
-            # Validate range
-            if not variable_range:
-                return None
-            # Range in the format [0, 1]
-            if "[" in variable_range and "]" in variable_range:
-                # Get lower and upper ranges
-                upper_range = variable_range.split(",")[1].replace("]", "").strip()
-                lower_range = variable_range.split(",")[0].replace("[", "").strip()
-                # Check if the values are floats
-                if self.is_float(upper_range) and self.is_float(lower_range):
-                    return f'{float(lower_range)}..{float(upper_range)}'
-                else:
-                    return None
-            # Variable range is in "{40} /\ != 0"
-            elif "{" in variable_range and "}" in variable_range:
-                # The value between the curly braces is the range and should be a float
-                range_value = variable_range.split("{")[1].split("}")[0].strip()
-                if self.is_float(range_value):
-                    return f'{float(range_value)}..{float(range_value)}'
-                else:
-                    return None
-            return None
-        except Exception as ex:
-            logging.debug("VariableAcces", f"Error: {ex}")
-            return None
+        return get_range_text(variable_range)
         
     def get_variable_access_obj(self, log_data_list: list) -> dict:
         """
@@ -198,9 +253,10 @@ class VariableAcces:
             log_data (list): A list of strings containing log data.
 
         Returns:
-            dict: A dictionary containing the variable name as the key and the variable data as the value.
+            dict: A dictionary containing the variable name as the key and the variable data
+                  ({"type": str, "range": VariableRange}) as the value.
         """
-        logging.info("VariableAcces", "Getting variable access object ...")
+        log.info("Getting variable access object ...")
         variable_access_obj = {}
         for log_data in log_data_list:
             variable_data = self.get_variable_data(log_data)
@@ -211,9 +267,9 @@ class VariableAcces:
                 # check if the variable name already exists in the variable access object
                 if variable_name in variable_access_obj:
                     continue
-                # Validate the variable range and get the min and max values
-                variable_range = self.get_range_values(variable_range)
-                if not variable_range:
+                # Validate the variable range, it is parsed once and kept as a VariableRange
+                variable_range = self.parse_range(variable_range)
+                if variable_range is None or not variable_range.is_bounded():
                     continue
                 new_data = {}
                 new_data["type"] = variable_type
@@ -229,15 +285,15 @@ class VariableAcces:
             variable_access_obj (dict): A dictionary containing variable data.
             output_file (str): The path to the output CSV file.
         """
-        logging.info("VariableAcces", "Writing variable access to CSV ...")
+        log.info("Writing variable access to CSV ...")
         if os.path.exists(output_file):
             os.remove(output_file)
-        with open(output_file, "w") as csv_file:
-            csv_file.write("Variable Name,Variable Type,Variable Range\n")
+        with self.m_run_report.phase("write_csv"), open(output_file, "w") as csv_file:
+            csv_file.write(CSV_HEADER)
             for variable_name, variable_data in variable_access_obj.items():
                 variable_type = variable_data["type"]
                 variable_range = variable_data["range"]
-                csv_file.write(f"{variable_name},{variable_type},{variable_range}\n")
+                csv_file.write(format_csv_row((variable_name, variable_type, variable_range)))
     
     def save_variable_access_to_csv(self, log_data_list: list, output_file: str) -> None:
         """
@@ -247,6 +303,213 @@ class VariableAcces:
             log_data (list): A list of strings containing log data.
             output_file (str): The path to the output CSV file.
         """
-        logging.info("VariableAcces", "Converting variable data to CSV ...")
+        log.info("Converting variable data to CSV ...")
         variable_access_obj = self.get_variable_access_obj(log_data_list)
-        self.write_variable_access_to_csv(variable_access_obj, output_file)
\ No newline at end of file
+        self.write_variable_access_to_csv(variable_access_obj, output_file)
+    
+    def open_variable_access_db(self, output_file: str) -> sqlite3.Connection:
+        """
+        Creates an empty SQLite variable access file.
+
+        Args:
+            output_file (str): The path to the output SQLite file.
+
+        Returns:
+            sqlite3.Connection: The connection to the new file.
+        """
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        connection = sqlite3.connect(output_file)
+        try:
+            connection.executescript(SQLITE_SCHEMA)
+            connection.execute("INSERT INTO metadata VALUES ('format_version', ?)", (str(SQLITE_FORMAT_VERSION),))
+        except Exception:
+            connection.close()
+            raise
+        return connection
+    
+    def get_sqlite_row(self, variable_name: str, variable_type: str, variable_range: VariableRange) -> tuple:
+        """
+        Converts a variable to a row of the SQLite variable_access table.
+        """
+        return (variable_name, variable_type, float(variable_range.lower), float(variable_range.upper),
+                int(variable_range.is_integer), variable_range.to_astree())
+    
+    def write_variable_access_to_sqlite(self, variable_access_obj: dict, output_file: str) -> None:
+        """
+        Writes the variable access object to a SQLite file.
+
+        The file holds one row per variable with the numeric bounds stored as floats, so it can
+        be loaded without parsing any text (see utils/variable_2_simulink/variable_store.py).
+
+        Args:
+            variable_access_obj (dict): A dictionary containing variable data.
+            output_file (str): The path to the output SQLite file.
+        """
+        log.info("Writing variable access to SQLite ...")
+        connection = self.open_variable_access_db(output_file)
+        try:
+            with connection:
+                connection.executemany(SQLITE_INSERT, (
+                    self.get_sqlite_row(variable_name, variable_data["type"], variable_data["range"])
+                    for variable_name, variable_data in variable_access_obj.items()))
+        finally:
+            connection.close()
+    
+    def iter_log_lines(self, log_file_obj):
+        """
+        Lazily yields the lines of an opened log file, one at a time.
+
+        Args:
+            log_file_obj: A file object opened in text mode.
+
+        Yields:
+            str: The next line of the log file.
+        """
+        for line in log_file_obj:
+            yield line
+    
+    def iter_data_dictionary(self, lines):
+        """
+        Yields the lines of the data dictionary block of the log.
+
+        The block starts after the '#data-dictionary:' marker and ends before the
+        '#shared memory usage:' or '#ALARM' marker. The lines after the block are not consumed.
+
+        Args:
+            lines: An iterable of log lines.
+
+        Yields:
+            str: The next line of the data dictionary block.
+        """
+        is_in_data_range_block = False
+        for line in lines:
+            if not is_in_data_range_block:
+                if DATA_DICTIONARY_MARKER in line:
+                    is_in_data_range_block = True
+                continue
+            if SHARED_MEMORY_MARKER in line or ALARM_MARKER in line:
+                return
+            yield line
+    
+    def iter_variable_access(self, lines):
+        """
+        Parses the given lines and yields one record per variable.
+
+        Only the first occurrence of a variable is kept, and records without a valid range
+        are skipped, like in get_variable_access_obj.
+
+        Args:
+            lines: An iterable of log lines.
+
+        Yields:
+            tuple: (variable name, variable type, VariableRange).
+        """
+        seen_variables = set()
+        for line in lines:
+            variable_data = self.get_variable_data(line)
+            if not variable_data:
+                continue
+            variable_name, variable_type, variable_range = variable_data
+            if variable_name in seen_variables:
+                continue
+            variable_range = self.parse_range(variable_range)
+            if variable_range is None or not variable_range.is_bounded():
+                continue
+            seen_variables.add(variable_name)
+            yield variable_name, variable_type, variable_range
+    
+    def stream_variable_access(self, log_file: str, txt_output_file: str, csv_output_file: str, sqlite_output_file: str = None) -> int:
+        """
+        Extracts the data dictionary of a log file and writes it to the text and CSV outputs in a single pass.
+
+        The log file is read line by line and only up to the end of the data dictionary block,
+        so the memory used does not depend on the size of the log. The bytes that are not valid
+        UTF-8 are replaced, like in the live output (see LogFollower), so both give the same files.
+
+        Args:
+            log_file (str): The path to the Astree log file.
+            txt_output_file (str): The path to the output text file with the raw data dictionary lines.
+            csv_output_file (str): The path to the output CSV file.
+            sqlite_output_file (str, optional): The path to an output SQLite file, not written if None.
+
+        Returns:
+            int: The number of variables written to the CSV file.
+        """
+        log.info("Streaming variable access from log file ...")
+        variable_count = 0
+        dictionary_line_count = 0
+        connection = self.open_variable_access_db(sqlite_output_file) if sqlite_output_file else None
+        try:
+            with self.m_run_report.phase("extract_dictionary"), \
+                    open(log_file, 'r', encoding='utf-8', errors='replace') as log_f, \
+                    open(txt_output_file, 'w', encoding='utf-8') as txt_f, \
+                    open(csv_output_file, 'w') as csv_f:
+                csv_f.write(CSV_HEADER)
+                
+                def tee_to_txt(lines):
+                    nonlocal dictionary_line_count
+                    for line in lines:
+                        txt_f.write(line)
+                        dictionary_line_count += 1
+                        yield line
+                
+                dictionary_lines = tee_to_txt(self.iter_data_dictionary(self.iter_log_lines(log_f)))
+                for variable_name, variable_type, variable_range in self.iter_variable_access(dictionary_lines):
+                    csv_f.write(format_csv_row((variable_name, variable_type, variable_range)))
+                    if connection:
+                        connection.execute(SQLITE_INSERT, self.get_sqlite_row(variable_name, variable_type, variable_range))
+                    variable_count += 1
+                # The log is only read up to the end of the data dictionary
+                log_bytes_read = log_f.buffer.tell()
+            if connection:
+                connection.commit()
+        finally:
+            if connection:
+                connection.close()
+        self.m_run_report.count("log_bytes_read", log_bytes_read)
+        self.m_run_report.count("dictionary_lines_parsed", dictionary_line_count)
+        self.m_run_report.count("variables_extracted", variable_count)
+        # Records without a valid range, duplicates and lines that are not records
+        self.m_run_report.count("dictionary_lines_skipped", dictionary_line_count - variable_count)
+        return variable_count
+    
+    def get_cache_key(self, result_cache, log_file: str, save_sqlite: bool = False) -> str:
+        """
+        Returns the result cache key of the variable access files of a log file.
+        """
+        return result_cache.get_key([log_file], f"variable_access-{PARSER_VERSION}{'-sqlite' if save_sqlite else ''}")
+    
+    def save_variable_access_files(self, log_file: str, output_folder: str, save_sqlite: bool = False, result_cache=None) -> int:
+        """
+        Writes variable_access.txt, variable_access.csv and optionally variable_access.db of a log file
+        to the output folder.
+
+        If a result cache is given and the same log was already processed by the same parser
+        version, the files are copied from the cache instead of parsing the log again.
+
+        Args:
+            log_file (str): The path to the Astree log file.
+            output_folder (str): The output folder.
+            save_sqlite (bool): Also write variable_access.db.
+            result_cache (ResultCache, optional): The result cache, not used if None.
+
+        Returns:
+            int: The number of variables written to the CSV file.
+        """
+        output_files = [os.path.join(output_folder, 'variable_access.txt'), os.path.join(output_folder, 'variable_access.csv')]
+        if save_sqlite:
+            output_files.append(os.path.join(output_folder, 'variable_access.db'))
+        if result_cache:
+            with self.m_run_report.phase("result_cache"):
+                cache_key = self.get_cache_key(result_cache, log_file, save_sqlite)
+                restored = result_cache.restore(cache_key, output_folder)
+            if restored:
+                self.m_run_report.count("result_cache_hits")
+                return get_csv_row_count(output_files[1])
+            self.m_run_report.count("result_cache_misses")
+        variable_count = self.stream_variable_access(log_file, *output_files)
+        if result_cache:
+            with self.m_run_report.phase("result_cache"):
+                result_cache.store(cache_key, output_files)
+        return variable_count
@@ -0,0 +1,150 @@
+import os
+import queue
+from utils.astree_log_utils.variable_access import VariableAcces, CSV_HEADER, SQLITE_INSERT, format_csv_row
+from utils.log import TagLogger
+
+# Suffix of the output files while the analysis is running
+PART_FILE_SUFFIX = '.part'
+# Maximum number of records kept in memory before they are written
+DEFAULT_BATCH_SIZE = 1000
+# Put in the record queue when the log restarts: the records received so far are obsolete
+RECORDS_RESET = "reset"
+# Time between two checks of the stop event while the record queue is full, in seconds
+QUEUE_PUT_TIMEOUT = 0.5
+
+log = TagLogger("LiveVariableAccessWriter")
+
+class LiveVariableAccessWriter:
+    """
+    Writes the data dictionary records of a running analysis as soon as they are appended to the log.
+
+    The records go to 'variable_access.csv.part' (and the .txt and .db outputs) in batches:
+    every batch_size records and at every flush() call, i.e. once per poll of the log. A
+    downstream step can follow the .part file while the analysis is running. On completion
+    the files are renamed to their final names with os.replace, so 'variable_access.csv' only
+    ever exists complete. The output is the same as VariableAcces.stream_variable_access.
+
+    If a record queue is given, every written batch is also put in it as a list of
+    (variable name, variable type, VariableRange), so a consumer thread gets the parsed
+    records without reading the CSV. The queue may be bounded: put() then waits for the
+    consumer, until the stop event is set, so a consumer that gave up never blocks the
+    monitor thread.
+    """
+
+    def __init__(self, output_folder: str, variable_access: VariableAcces, save_sqlite: bool = False,
+                 batch_size: int = DEFAULT_BATCH_SIZE, record_queue=None, stop_event=None) -> None:
+        log.debug("Init: %s", output_folder)
+        self.m_variable_access = variable_access
+        self.m_batch_size = batch_size
+        self.m_record_queue = record_queue
+        # threading.Event set when the monitoring is stopped, the records are then no longer queued
+        self.m_stop_event = stop_event
+        self.m_output_files = [os.path.join(output_folder, 'variable_access.txt'), os.path.join(output_folder, 'variable_access.csv')]
+        if save_sqlite:
+            self.m_output_files.append(os.path.join(output_folder, 'variable_access.db'))
+        self.m_txt_f = None
+        self.m_csv_f = None
+        self.m_connection = None
+        self.open()
+        pass
+
+    def get_part_file(self, output_file: str) -> str:
+        return output_file + PART_FILE_SUFFIX
+
+    def open(self) -> None:
+        """
+        Creates empty .part output files.
+        """
+        self.m_txt_f = open(self.get_part_file(self.m_output_files[0]), 'w', encoding='utf-8')
+        self.m_csv_f = open(self.get_part_file(self.m_output_files[1]), 'w')
+        self.m_csv_f.write(CSV_HEADER)
+        if len(self.m_output_files) > 2:
+            self.m_connection = self.m_variable_access.open_variable_access_db(self.get_part_file(self.m_output_files[2]))
+        self.m_seen_variables = set()
+        # Dictionary lines and CSV rows not written yet
+        self.m_pending_lines = []
+        self.m_pending_rows = []
+        self.m_line_count = 0
+        self.m_variable_count = 0
+
+    def close(self) -> None:
+        """
+        Closes the .part output files, without renaming them.
+        """
+        for f in (self.m_txt_f, self.m_csv_f, self.m_connection):
+            if f is not None:
+                f.close()
+        self.m_txt_f = self.m_csv_f = self.m_connection = None
+
+    def reset(self) -> None:
+        """
+        Starts the outputs again, when the log file was truncated or rotated.
+        """
+        self.close()
+        self.open()
+        if self.m_record_queue is not None:
+            self.put_records(RECORDS_RESET)
+
+    def add_line(self, line: str) -> None:
+        """
+        Adds a line of the data dictionary block.
+
+        Like VariableAcces.iter_variable_access, only the first occurrence of a variable is
+        kept, and the records without a valid range are skipped.
+        """
+        self.m_pending_lines.append(line)
+        self.m_line_count += 1
+        variable_data = self.m_variable_access.get_variable_data(line)
+        if variable_data and variable_data[0] not in self.m_seen_variables:
+            variable_name, variable_type, variable_range = variable_data
+            variable_range = self.m_variable_access.parse_range(variable_range)
+            if variable_range is not None and variable_range.is_bounded():
+                self.m_seen_variables.add(variable_name)
+                self.m_pending_rows.append((variable_name, variable_type, variable_range))
+        if len(self.m_pending_lines) >= self.m_batch_size:
+            self.flush()
+
+    def put_records(self, records) -> None:
+        """
+        Puts records in the record queue, waiting for room until the stop event is set.
+        """
+        while True:
+            try:
+                self.m_record_queue.put(records, timeout=QUEUE_PUT_TIMEOUT)
+                return
+            except queue.Full:
+                if self.m_stop_event is not None and self.m_stop_event.is_set():
+                    log.warning("Monitoring stopped, records not queued")
+                    return
+
+    def flush(self) -> None:
+        """
+        Writes the pending records to the .part files and flushes them.
+        """
+        if not self.m_pending_lines:
+            return
+        self.m_txt_f.writelines(self.m_pending_lines)
+        self.m_csv_f.writelines(format_csv_row(row) for row in self.m_pending_rows)
+        if self.m_connection:
+            with self.m_connection:
+                self.m_connection.executemany(SQLITE_INSERT, (self.m_variable_access.get_sqlite_row(*row) for row in self.m_pending_rows))
+        self.m_txt_f.flush()
+        self.m_csv_f.flush()
+        if self.m_record_queue is not None and self.m_pending_rows:
+            self.put_records(self.m_pending_rows)
+        self.m_variable_count += len(self.m_pending_rows)
+        self.m_pending_lines = []
+        self.m_pending_rows = []
+
+    def complete(self) -> int:
+        """
+        Writes the last records and renames the .part files to their final names.
+
+        Returns:
+            int: The number of variables written to the CSV file.
+        """
+        self.flush()
+        self.close()
+        for output_file in self.m_output_files:
+            os.replace(self.get_part_file(output_file), output_file)
+        return self.m_variable_count
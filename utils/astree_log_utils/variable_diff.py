@@ -0,0 +1,197 @@
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from utils.astree_log_utils.variable_access import VariableAcces, SQLITE_INSERT, format_csv_row
+from utils.astree_log_utils.variable_range import TEXT_SEPARATOR
+from utils.variable_2_simulink.variable_store import is_sqlite_file, iter_variable_access_csv
+from utils.run_report import RunReport
+from utils.log import TagLogger
+
+# Changes of a variable between two runs
+CHANGE_ADDED = "added"
+CHANGE_REMOVED = "removed"
+CHANGE_TYPE_CHANGED = "type_changed"
+CHANGE_WIDENED = "widened"
+CHANGE_NARROWED = "narrowed"
+# The bounds moved, but neither range includes the other
+CHANGE_SHIFTED = "shifted"
+CHANGE_UNCHANGED = "unchanged"
+CHANGES = (CHANGE_ADDED, CHANGE_REMOVED, CHANGE_TYPE_CHANGED, CHANGE_WIDENED, CHANGE_NARROWED, CHANGE_SHIFTED, CHANGE_UNCHANGED)
+
+RANGE_DIFF_FILE_NAME = "range_diff.csv"
+RANGE_DIFF_CSV_HEADER = "Change,Variable Name,Old Type,New Type,Old Range,New Range,Lower Delta,Upper Delta\n"
+# Variables of a table in the order of the join, the primary key of the WITHOUT ROWID table is its storage order
+SQLITE_SELECT_SORTED = "SELECT name, type, lower, upper FROM variable_access ORDER BY name"
+
+log = TagLogger("VariableDiff")
+
+def get_change(old_variable: tuple, new_variable: tuple) -> str:
+    """
+    Returns the change of a variable between two runs.
+
+    Args:
+        old_variable (tuple): (type, lower, upper) in the old run, None if the variable is new.
+        new_variable (tuple): (type, lower, upper) in the new run, None if the variable was removed.
+
+    Returns:
+        str: One of CHANGES. A type change takes precedence over a range change.
+    """
+    if old_variable is None:
+        return CHANGE_ADDED
+    if new_variable is None:
+        return CHANGE_REMOVED
+    old_type, old_lower, old_upper = old_variable
+    new_type, new_lower, new_upper = new_variable
+    if old_type != new_type:
+        return CHANGE_TYPE_CHANGED
+    if old_lower == new_lower and old_upper == new_upper:
+        return CHANGE_UNCHANGED
+    if new_lower <= old_lower and new_upper >= old_upper:
+        return CHANGE_WIDENED
+    if new_lower >= old_lower and new_upper <= old_upper:
+        return CHANGE_NARROWED
+    return CHANGE_SHIFTED
+
+
+def format_range(variable: tuple) -> str:
+    return f'{float(variable[1])}{TEXT_SEPARATOR}{float(variable[2])}' if variable else ''
+
+
+class VariableDiff:
+    """
+    Diff of the variable ranges of two runs (variable access files, CSV or SQLite).
+
+    The two tables are joined with a sort-merge join: both are read in name order and walked
+    side by side, so the join is a single linear pass whatever their size, and only the current
+    row of each table is in memory.
+
+    A SQLite file written by VariableAcces is already stored in name order (the name is the
+    primary key of a WITHOUT ROWID table), it is read as it is. A CSV file is first loaded into
+    a temporary SQLite file, which sorts it on disk with a bounded page cache, instead of in
+    memory.
+    """
+
+    def __init__(self, temp_folder: str = None, run_report: RunReport = None) -> None:
+        """
+        Args:
+            temp_folder (str): Folder of the temporary SQLite files of the CSV inputs, the system
+                               temporary folder if None.
+            run_report (RunReport): Report of the counters, a new one if None.
+        """
+        log.debug("Init")
+        self.m_temp_folder = temp_folder
+        self.m_run_report = run_report if run_report else RunReport("diff")
+        pass
+
+    def load_csv_to_sqlite(self, csv_file: str, db_file: str) -> None:
+        """
+        Loads a variable access CSV file into a SQLite file, the first row of a variable is kept
+        like in VariableAcces.
+
+        The range column holds the "lo..hi" hull: only the bounds are joined, the Astree text of
+        every range (VariableAcces.get_sqlite_row) is not worth building for a scratch file.
+        """
+        connection = VariableAcces().open_variable_access_db(db_file)
+        try:
+            connection.commit()
+            # Scratch file: no journal, no sync
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+            with connection:
+                connection.executemany(SQLITE_INSERT, ((name, variable_type, float(variable_range.lower), float(variable_range.upper),
+                                                        int(variable_range.is_integer), variable_range.to_text())
+                                                       for name, variable_type, variable_range in iter_variable_access_csv(csv_file)))
+        finally:
+            connection.close()
+
+    def iter_sorted_variables(self, db_file: str):
+        """
+        Yields the variables of a SQLite variable access file in name order.
+
+        Yields:
+            tuple: (variable name, (type, lower, upper)). The integer bounds are read as floats.
+        """
+        connection = sqlite3.connect(f"{Path(db_file).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            for name, variable_type, lower, upper in connection.execute(SQLITE_SELECT_SORTED):
+                yield name, (variable_type, lower, upper)
+        finally:
+            connection.close()
+
+    def iter_changes(self, old_db_file: str, new_db_file: str):
+        """
+        Joins two SQLite variable access files by variable name.
+
+        Yields:
+            tuple: (change, variable name, old (type, lower, upper) or None, new (type, lower, upper) or None),
+                   in name order, for every variable of either file.
+        """
+        old_variables = self.iter_sorted_variables(old_db_file)
+        new_variables = self.iter_sorted_variables(new_db_file)
+        old_name, old_variable = next(old_variables, (None, None))
+        new_name, new_variable = next(new_variables, (None, None))
+        while old_name is not None or new_name is not None:
+            if new_name is None or (old_name is not None and old_name < new_name):
+                yield CHANGE_REMOVED, old_name, old_variable, None
+                old_name, old_variable = next(old_variables, (None, None))
+            elif old_name is None or new_name < old_name:
+                yield CHANGE_ADDED, new_name, None, new_variable
+                new_name, new_variable = next(new_variables, (None, None))
+            else:
+                yield get_change(old_variable, new_variable), old_name, old_variable, new_variable
+                old_name, old_variable = next(old_variables, (None, None))
+                new_name, new_variable = next(new_variables, (None, None))
+
+    def get_sorted_file(self, variable_access_path: str, temp_folder: str, name: str) -> str:
+        """
+        Returns the SQLite file to join, the file itself or the temporary SQLite file of a CSV file.
+        """
+        if is_sqlite_file(variable_access_path):
+            return variable_access_path
+        db_file = os.path.join(temp_folder, f'{name}.db')
+        with self.m_run_report.phase(f"load_{name}"):
+            self.load_csv_to_sqlite(variable_access_path, db_file)
+        return db_file
+
+    def diff(self, old_path: str, new_path: str, output_folder: str, changes: tuple = None) -> dict:
+        """
+        Writes the range changes between two runs to '<output_folder>/range_diff.csv', one row per
+        changed variable in name order, and the number of variables per change to run_report.json.
+
+        Args:
+            old_path (str): Variable access file (CSV or SQLite) of the old run.
+            new_path (str): Variable access file (CSV or SQLite) of the new run.
+            output_folder (str): The output folder.
+            changes (tuple): Changes written to the report, all but CHANGE_UNCHANGED if None.
+
+        Returns:
+            dict: change -> number of variables, for all the changes.
+        """
+        log.info("Diff: %s -> %s", old_path, new_path)
+        if changes is None:
+            changes = tuple(change for change in CHANGES if change != CHANGE_UNCHANGED)
+        os.makedirs(output_folder, exist_ok=True)
+        counts = dict.fromkeys(CHANGES, 0)
+        run_report = self.m_run_report
+        with tempfile.TemporaryDirectory(prefix='variable_diff_', dir=self.m_temp_folder) as temp_folder:
+            old_db_file = self.get_sorted_file(old_path, temp_folder, "old")
+            new_db_file = self.get_sorted_file(new_path, temp_folder, "new")
+            with run_report.phase("join"), open(os.path.join(output_folder, RANGE_DIFF_FILE_NAME), 'w') as f:
+                f.write(RANGE_DIFF_CSV_HEADER)
+                for change, variable_name, old_variable, new_variable in self.iter_changes(old_db_file, new_db_file):
+                    counts[change] += 1
+                    if change not in changes:
+                        continue
+                    lower_delta = upper_delta = ''
+                    if old_variable and new_variable:
+                        lower_delta = new_variable[1] - old_variable[1]
+                        upper_delta = new_variable[2] - old_variable[2]
+                    f.write(format_csv_row((change, variable_name, old_variable[0] if old_variable else '',
+                                            new_variable[0] if new_variable else '', format_range(old_variable),
+                                            format_range(new_variable), lower_delta, upper_delta)))
+        for change, count in counts.items():
+            run_report.count(change, count)
+        run_report.save(output_folder)
+        log.info("%s", ", ".join(f"{change}: {count}" for change, count in counts.items()))
+        return counts
@@ -0,0 +1,245 @@
+import os
+from utils.astree_log_utils.variable_access import VariableAcces, CSV_HEADER, SQLITE_INSERT, format_csv_row
+from utils.astree_log_utils.variable_range import VariableRange, Interval
+from utils.variable_2_simulink.variable_store import iter_variable_access
+from utils.run_report import RunReport
+from utils.log import TagLogger
+
+# Merge modes of the ranges of a variable across the tables
+MERGE_UNION = "union"
+MERGE_INTERSECTION = "intersection"
+MERGE_MODES = (MERGE_UNION, MERGE_INTERSECTION)
+# Separator of the '@"<file>"' context of a variable name
+CONTEXT_SEPARATOR = "@"
+
+# Fields of the merge state of a variable
+TYPE, LOWER, UPPER, TABLE_LOWER, TABLE_UPPER, TABLE_COUNT, LAST_TABLE = range(7)
+
+log = TagLogger("VariableMerger")
+
+def get_base_name(variable_name: str) -> str:
+    """
+    Returns the name of a variable without its '@"<file>"' context.
+    """
+    return variable_name.split(CONTEXT_SEPARATOR, 1)[0]
+
+
+def get_range_hull(variable_range: VariableRange, other_range: VariableRange) -> VariableRange:
+    """
+    Returns the smallest "lo..hi" range containing both ranges.
+    """
+    return VariableRange((Interval(min(variable_range.lower, other_range.lower),
+                                   max(variable_range.upper, other_range.upper)),))
+
+
+def add_variable(variables: dict, variable_name: str, variable_type: str, variable_range: VariableRange) -> str:
+    """
+    Adds a variable to a name -> (type, VariableRange) dict of the linkers, under its name without
+    '@"<file>"' context. A name already in the dict (another context, or the plain name) gets the
+    hull of both ranges, whatever the order of the rows, and the type of the last row.
+
+    Returns:
+        str: The name of the variable without context.
+    """
+    variable_name = get_base_name(variable_name)
+    previous = variables.get(variable_name)
+    if previous is not None:
+        variable_range = get_range_hull(previous[1], variable_range)
+    variables[variable_name] = (variable_type, variable_range)
+    return variable_name
+
+
+class VariableMerger:
+    """
+    Merges the variable access tables of several runs (calibration variants, nightly runs) into one.
+
+    The tables are read one after the other, in a single streaming pass, and every row is folded
+    into the state of its variable, found by name in a dict: a row costs O(1) whatever the number
+    of tables, only the merged variables are kept in memory.
+
+    The range of a variable is the hull of its ranges (the "lo..hi" of the CSV file):
+        - within one table, the rows of a variable (e.g. its '@"<file>"' contexts when they are
+          collapsed) are always united, the variable takes the values of all of them,
+        - across the tables, the ranges are united (MERGE_UNION), or intersected
+          (MERGE_INTERSECTION): only the variables of every table are kept (the others are
+          counted as "variables_dropped"), and the variables whose ranges do not overlap are
+          dropped and counted as "variables_empty".
+    The type of the first row of a variable is kept, the other types are counted as "type_conflicts".
+    """
+
+    def __init__(self, mode: str = MERGE_UNION, collapse_contexts: bool = False, run_report: RunReport = None) -> None:
+        """
+        Args:
+            mode (str): MERGE_UNION or MERGE_INTERSECTION.
+            collapse_contexts (bool): Merge the 'name@"<file>"' rows into 'name', otherwise every
+                                      context is a variable of its own.
+            run_report (RunReport): Report of the counters, a new one if None.
+        """
+        log.debug("Init: %s", mode)
+        if mode not in MERGE_MODES:
+            raise ValueError(f"Invalid merge mode: {mode}, expected one of {', '.join(MERGE_MODES)}")
+        self.m_mode = mode
+        self.m_collapse_contexts = collapse_contexts
+        self.m_run_report = run_report if run_report else RunReport("merge")
+        # variable name -> [type, lower, upper, table lower, table upper, table count, last table]
+        self.m_variables = {}
+        self.m_table_count = 0
+        pass
+
+    def add_table(self, variable_records) -> int:
+        """
+        Folds a variable access table into the merged variables.
+
+        Args:
+            variable_records: An iterable of (variable name, variable type, VariableRange), as
+                              yielded by iter_variable_access.
+
+        Returns:
+            int: The number of rows of the table.
+        """
+        table = self.m_table_count
+        self.m_table_count += 1
+        variables = self.m_variables
+        intersect = self.m_mode == MERGE_INTERSECTION
+        collapse_contexts = self.m_collapse_contexts
+        row_count = contexts = type_conflicts = 0
+        for variable_name, variable_type, variable_range in variable_records:
+            row_count += 1
+            if collapse_contexts and CONTEXT_SEPARATOR in variable_name:
+                variable_name = get_base_name(variable_name)
+                contexts += 1
+            lower = variable_range.lower
+            upper = variable_range.upper
+            state = variables.get(variable_name)
+            if state is None:
+                variables[variable_name] = [variable_type, lower, upper, lower, upper, 1, table]
+                continue
+            if state[TYPE] != variable_type:
+                type_conflicts += 1
+                log.debug("Type of %s changed: %s -> %s", variable_name, state[TYPE], variable_type)
+            if state[LAST_TABLE] == table:
+                # Another row of the same table, e.g. another context: always united
+                if lower < state[TABLE_LOWER]:
+                    state[TABLE_LOWER] = lower
+                if upper > state[TABLE_UPPER]:
+                    state[TABLE_UPPER] = upper
+                continue
+            # First row of a new table: the range of the previous table is final, fold it
+            self.fold_table_range(state, intersect)
+            state[TABLE_LOWER] = lower
+            state[TABLE_UPPER] = upper
+            state[TABLE_COUNT] += 1
+            state[LAST_TABLE] = table
+        run_report = self.m_run_report
+        run_report.count("tables")
+        run_report.count("rows_read", row_count)
+        run_report.count("contexts_collapsed", contexts)
+        run_report.count("type_conflicts", type_conflicts)
+        log.info("Table %s: %s row(s), %s variable(s) merged so far", table + 1, row_count, len(variables))
+        return row_count
+
+    def add_file(self, variable_access_path: str) -> int:
+        """
+        Folds a variable access file (CSV or SQLite) into the merged variables.
+
+        Returns:
+            int: The number of rows of the file.
+        """
+        with self.m_run_report.phase("read_tables"):
+            return self.add_table(iter_variable_access(variable_access_path))
+
+    @staticmethod
+    def get_folded_range(state: list, intersect: bool) -> tuple:
+        """
+        Returns the (lower, upper) merged range of a variable with the range of its last table folded in.
+        """
+        if state[TABLE_COUNT] == 1:
+            # The merged range is the range of the first table
+            return state[TABLE_LOWER], state[TABLE_UPPER]
+        if intersect:
+            return max(state[LOWER], state[TABLE_LOWER]), min(state[UPPER], state[TABLE_UPPER])
+        return min(state[LOWER], state[TABLE_LOWER]), max(state[UPPER], state[TABLE_UPPER])
+
+    @classmethod
+    def fold_table_range(cls, state: list, intersect: bool) -> None:
+        """
+        Folds the range of the last table of a variable into its merged range.
+        """
+        state[LOWER], state[UPPER] = cls.get_folded_range(state, intersect)
+
+    def iter_merged(self, counts: dict = None):
+        """
+        Yields the merged variables, in the order of their first row. The merge state is not
+        changed, so it can be iterated again, or more tables added.
+
+        Args:
+            counts (dict, optional): Receives the "variables_dropped" and "variables_empty"
+                                     counts, in intersection mode.
+
+        Yields:
+            tuple: (variable name, variable type, VariableRange).
+        """
+        intersect = self.m_mode == MERGE_INTERSECTION
+        table_count = self.m_table_count
+        dropped = empty = 0
+        for variable_name, state in self.m_variables.items():
+            lower, upper = self.get_folded_range(state, intersect)
+            if intersect:
+                if state[TABLE_COUNT] < table_count:
+                    dropped += 1
+                    continue
+                if lower > upper:
+                    empty += 1
+                    log.debug("Empty intersection of the ranges of %s", variable_name)
+                    continue
+            yield variable_name, state[TYPE], VariableRange((Interval(lower, upper),))
+        if counts is not None and intersect:
+            counts["variables_dropped"] = dropped
+            counts["variables_empty"] = empty
+
+    def write(self, output_folder: str, save_sqlite: bool = False) -> int:
+        """
+        Writes the merged variables to '<output_folder>/variable_access.csv' (and .db), in the
+        format of VariableAcces, and the counters to run_report.json.
+
+        Returns:
+            int: The number of merged variables written.
+        """
+        os.makedirs(output_folder, exist_ok=True)
+        variable_access = VariableAcces()
+        connection = None
+        if save_sqlite:
+            connection = variable_access.open_variable_access_db(os.path.join(output_folder, 'variable_access.db'))
+        variable_count = 0
+        counts = {}
+        with self.m_run_report.phase("write_outputs"):
+            try:
+                with open(os.path.join(output_folder, 'variable_access.csv'), 'w') as csv_f:
+                    csv_f.write(CSV_HEADER)
+                    for row in self.iter_merged(counts):
+                        csv_f.write(format_csv_row(row))
+                        if connection:
+                            connection.execute(SQLITE_INSERT, variable_access.get_sqlite_row(*row))
+                        variable_count += 1
+                if connection:
+                    connection.commit()
+            finally:
+                if connection:
+                    connection.close()
+        for counter_name, count in counts.items():
+            self.m_run_report.count(counter_name, count)
+        self.m_run_report.count("variables_merged", variable_count)
+        self.m_run_report.save(output_folder)
+        log.info("Merged %s table(s) (%s): %s variable(s)", self.m_table_count, self.m_mode, variable_count)
+        return variable_count
+
+    def merge_files(self, variable_access_paths: list, output_folder: str, save_sqlite: bool = False) -> int:
+        """
+        Merges variable access files (CSV or SQLite) and writes the result to the output folder.
+
+        Returns:
+            int: The number of merged variables written.
+        """
+        for variable_access_path in variable_access_paths:
+            self.add_file(variable_access_path)
+        return self.write(output_folder, save_sqlite)
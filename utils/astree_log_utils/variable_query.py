@@ -0,0 +1,182 @@
+import re
+import math
+from bisect import bisect_left, bisect_right
+from fnmatch import fnmatchcase
+from utils.variable_2_simulink.variable_store import iter_variable_access
+from utils.log import TagLogger
+
+# Characters starting a wildcard in a glob pattern, the literal prefix stops before them
+GLOB_SPECIAL_CHARS = '*?['
+# Leading plain characters of a regex, the literal prefix of its matches
+REGEX_LITERAL_PATTERN = re.compile(r'[A-Za-z0-9_@"]*')
+REGEX_QUANTIFIERS = '*?{'
+# Larger than any character, so names starting with a prefix sort before prefix + PREFIX_END
+PREFIX_END = '\U0010ffff'
+
+log = TagLogger("VariableQuery")
+
+def get_glob_prefix(pattern: str) -> str:
+    """
+    Returns the literal prefix of a glob pattern, e.g. "Rte_USSDB_" for "Rte_USSDB_*_Out?".
+    """
+    for position, char in enumerate(pattern):
+        if char in GLOB_SPECIAL_CHARS:
+            return pattern[:position]
+    return pattern
+
+
+def get_regex_prefix(pattern: str) -> str:
+    """
+    Returns a literal prefix every match of a regex (used with re.match) starts with.
+
+    Only the leading plain characters are kept, and the last one is dropped if a quantifier
+    makes it optional. The prefix is empty if the regex has an alternation.
+    """
+    if '|' in pattern:
+        return ''
+    body = pattern[1:] if pattern.startswith('^') else pattern
+    prefix = REGEX_LITERAL_PATTERN.match(body).group(0)
+    next_char = body[len(prefix):len(prefix) + 1]
+    if next_char and next_char in REGEX_QUANTIFIERS:
+        prefix = prefix[:-1]
+    return prefix
+
+
+class VariableQuery:
+    """
+    Query index over the variables extracted from the Astree data dictionary.
+
+    The names are kept sorted, so a prefix query is two binary searches; glob and anchored
+    regex queries only scan the names sharing their literal prefix. The lower and upper
+    bounds are kept sorted too, so the range predicates are binary searches as well, and
+    only the variables selected by the indexed filters are checked against the others.
+    """
+
+    def __init__(self, variables: dict) -> None:
+        """
+        Args:
+            variables (dict): variable name -> {"type": str, "range": VariableRange}, as returned
+                              by VariableAcces.get_variable_access_obj.
+        """
+        log.debug("Init")
+        self.m_variables = variables
+        self.m_names = sorted(variables)
+        by_lower = sorted((data["range"].lower, name) for name, data in variables.items())
+        by_upper = sorted((data["range"].upper, name) for name, data in variables.items())
+        self.m_lower_values = [lower for lower, _ in by_lower]
+        self.m_lower_names = [name for _, name in by_lower]
+        self.m_upper_values = [upper for upper, _ in by_upper]
+        self.m_upper_names = [name for _, name in by_upper]
+        # name -> (lower, upper), the bounds of the hull of the range
+        self.m_bounds = {name: (data["range"].lower, data["range"].upper) for name, data in variables.items()}
+        # Names of the ranges that are not exactly their hull: the bounds alone do not tell if they contain a value
+        self.m_partial_ranges = {name for name, data in variables.items() if not self.is_hull(data["range"])}
+        pass
+
+    @staticmethod
+    def is_hull(variable_range) -> bool:
+        """
+        Checks if a range is a single closed interval without excluded values.
+        """
+        if len(variable_range.intervals) != 1 or variable_range.excluded:
+            return False
+        interval = variable_range.intervals[0]
+        return interval.lower_closed and interval.upper_closed
+
+    @classmethod
+    def from_file(cls, variable_access_path: str) -> 'VariableQuery':
+        """
+        Builds the index of a variable access file (CSV or SQLite).
+        """
+        return cls({name: {"type": variable_type, "range": variable_range}
+                    for name, variable_type, variable_range in iter_variable_access(variable_access_path)})
+
+    def __len__(self) -> int:
+        return len(self.m_names)
+
+    def get(self, variable_name: str) -> dict:
+        return self.m_variables.get(variable_name)
+
+    def get_prefix_span(self, prefix: str) -> tuple:
+        """
+        Returns the (start, end) span of the sorted names starting with the given prefix.
+        """
+        start = bisect_left(self.m_names, prefix)
+        return start, bisect_left(self.m_names, prefix + PREFIX_END, start)
+
+    @staticmethod
+    def get_bound_span(values: list, minimum: float = None, maximum: float = None) -> tuple:
+        """
+        Returns the (start, end) span of the sorted bound values between minimum and maximum.
+        """
+        start = 0 if minimum is None else bisect_left(values, minimum)
+        end = len(values) if maximum is None else bisect_right(values, maximum)
+        return start, max(start, end)
+
+    def find_prefix(self, prefix: str) -> list:
+        """
+        Returns the sorted names starting with the given prefix.
+        """
+        start, end = self.get_prefix_span(prefix)
+        return self.m_names[start:end]
+
+    def query(self, prefix: str = None, glob: str = None, regex: str = None, contains: float = None,
+              min_lower: float = None, max_lower: float = None, min_upper: float = None, max_upper: float = None) -> list:
+        """
+        Returns the names of the variables matching all the given filters.
+
+        The candidates are the names selected by the most selective index (name prefix, lower
+        bounds or upper bounds), only they are checked against the other filters.
+
+        Args:
+            prefix (str, optional): The names start with this prefix.
+            glob (str, optional): The names match this glob pattern (case sensitive), e.g. "Rte_USSDB_*".
+            regex (str, optional): The names match this regex from their start (re.match).
+            contains (float, optional): The range contains this value.
+            min_lower / max_lower (float, optional): Bounds of the lower bound of the range.
+            min_upper / max_upper (float, optional): Bounds of the upper bound of the range.
+
+        Returns:
+            list: The sorted names of the matching variables.
+        """
+        compiled_regex = re.compile(regex) if regex is not None else None
+        # Longest name prefix implied by the name filters
+        name_prefix = prefix or ''
+        for filter_prefix in (get_glob_prefix(glob) if glob is not None else '',
+                              get_regex_prefix(regex) if regex is not None else ''):
+            if filter_prefix.startswith(name_prefix):
+                name_prefix = filter_prefix
+            elif not name_prefix.startswith(filter_prefix):
+                # Two incompatible prefixes, nothing can match
+                return []
+        if contains is not None:
+            max_lower = contains if max_lower is None else min(max_lower, contains)
+            min_upper = contains if min_upper is None else max(min_upper, contains)
+        # (names, start, end) of every usable index, the narrowest one gives the candidates
+        spans = [(self.m_names, *self.get_prefix_span(name_prefix))]
+        if min_lower is not None or max_lower is not None:
+            spans.append((self.m_lower_names, *self.get_bound_span(self.m_lower_values, min_lower, max_lower)))
+        if min_upper is not None or max_upper is not None:
+            spans.append((self.m_upper_names, *self.get_bound_span(self.m_upper_values, min_upper, max_upper)))
+        names, start, end = min(spans, key=lambda span: span[2] - span[1])
+        candidates = names[start:end]
+        if names is not self.m_names and name_prefix:
+            candidates = [name for name in candidates if name.startswith(name_prefix)]
+        if min_lower is not None or max_lower is not None or min_upper is not None or max_upper is not None:
+            bounds = self.m_bounds
+            min_lower = -math.inf if min_lower is None else min_lower
+            max_lower = math.inf if max_lower is None else max_lower
+            min_upper = -math.inf if min_upper is None else min_upper
+            max_upper = math.inf if max_upper is None else max_upper
+            candidates = [name for name in candidates
+                          if min_lower <= bounds[name][0] <= max_lower and min_upper <= bounds[name][1] <= max_upper]
+        if glob is not None:
+            candidates = [name for name in candidates if fnmatchcase(name, glob)]
+        if compiled_regex is not None:
+            candidates = [name for name in candidates if compiled_regex.match(name)]
+        if contains is not None:
+            # The bounds only select the hull, the range may exclude the value
+            variables, partial_ranges = self.m_variables, self.m_partial_ranges
+            candidates = [name for name in candidates
+                          if name not in partial_ranges or variables[name]["range"].contains(contains)]
+        return sorted(candidates) if names is not self.m_names else candidates
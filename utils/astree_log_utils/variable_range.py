@@ -0,0 +1,371 @@
+import re
+import math
+from math import isfinite
+from typing import NamedTuple
+
+# "[a, b]", "]a, b]", "[a, b[" or "(a, b)" interval of an Astree range
+INTERVAL_PATTERN = re.compile(r'([\[\]\(])\s*([^,\[\]\(\)]+?)\s*,\s*([^,\[\]\(\)]+?)\s*([\[\]\)])')
+# "{a}" or "{a, b, c}" set of values of an Astree range
+VALUE_SET_PATTERN = re.compile(r'\{([^{}]*)\}')
+# "!= a" constraint of an Astree range
+NOT_EQUAL_PATTERN = re.compile(r'!=\s*(\S+)')
+
+UNION_SEPARATOR = '\\/'
+CONSTRAINT_SEPARATOR = '/\\'
+TEXT_SEPARATOR = '..'
+
+class Interval(NamedTuple):
+    """
+    Interval of values, bounds are int for integer ranges and float otherwise.
+    """
+    lower: float
+    upper: float
+    lower_closed: bool = True
+    upper_closed: bool = True
+
+    def contains(self, value: float) -> bool:
+        if value < self.lower or (value == self.lower and not self.lower_closed):
+            return False
+        if value > self.upper or (value == self.upper and not self.upper_closed):
+            return False
+        return True
+
+
+def parse_number(value: str):
+    """
+    Converts a bound of an Astree range to a number.
+
+    Args:
+        value (str): The bound, e.g. "12", "-0.5", "1e+38", "-inf" or "+oo".
+
+    Returns:
+        int or float: An int for integer literals, a float otherwise.
+
+    Raises:
+        ValueError: If the bound is not a number or is NaN.
+    """
+    # int() and float() strip the value and float() reads "inf" and "-inf" itself, the other
+    # spellings are only checked when both fail, so the common bounds are converted at once.
+    # The bounds of the CSV file are written as floats ("0.0"): int() would fail on every one of them
+    if '.' not in value:
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    try:
+        number = float(value)
+    except ValueError:
+        lowered = value.strip().lower()
+        if lowered in ('oo', '+oo'):
+            return math.inf
+        if lowered == '-oo':
+            return -math.inf
+        number = float.fromhex(value)
+    if number != number:
+        raise ValueError(f"Invalid bound: {value}")
+    return number
+
+
+def parse_float_bound(value: str) -> float:
+    """
+    Converts a bound of an Astree range to a float, float() first: faster than parse_number when
+    the int of an integer bound is not needed.
+    """
+    try:
+        return float(value)
+    except ValueError:
+        return float(parse_number(value))
+
+
+def parse_plain_bounds(part: str, parse_bound=parse_number) -> tuple:
+    """
+    Fast path of the range parsers for the plain "[a, b]" and "{v}" forms, the most common ones
+    in the data dictionary: no regex and no Interval.
+
+    Args:
+        part (str): The range without its "/\\" constraints.
+        parse_bound: The conversion of the bounds, parse_number or parse_float_bound.
+
+    Returns:
+        tuple: (lower, upper), or None if the part is not in one of the plain forms.
+
+    Raises:
+        ValueError: If a bound is not a number, the general parser would reject it as well.
+    """
+    part = part.strip()
+    if not part or UNION_SEPARATOR in part:
+        return None
+    first = part[0]
+    if first == '[':
+        if part[-1] != ']':
+            return None
+        lower, separator, upper = part[1:-1].partition(',')
+        if not separator or ',' in upper:
+            return None
+        return parse_bound(lower), parse_bound(upper)
+    if first == '{':
+        if part[-1] != '}' or ',' in part:
+            return None
+        value = parse_bound(part[1:-1])
+        return value, value
+    return None
+
+
+def parse_not_equal(constraint: str):
+    """
+    Parses a "!= v" constraint of a range, already stripped.
+
+    Returns:
+        int or float: The excluded value, or None if the constraint is not a "!= v" constraint.
+
+    Raises:
+        ValueError: If the excluded value is not a number.
+    """
+    if not constraint.startswith('!='):
+        return None
+    value = constraint[2:]
+    try:
+        return parse_number(value)
+    except ValueError:
+        # Like NOT_EQUAL_PATTERN, only a single word after "!=" is an excluded value
+        if len(value.split()) == 1:
+            raise
+        return None
+
+
+def format_bounded_text(lower, upper) -> str:
+    """
+    Returns the "lo..hi" text of the variable access CSV file, or None if a bound is infinite.
+    """
+    if not (math.isfinite(lower) and math.isfinite(upper)):
+        return None
+    return f'{float(lower)}{TEXT_SEPARATOR}{float(upper)}'
+
+
+def get_range_text(variable_range: str) -> str:
+    """
+    Returns the "lo..hi" hull text of a range as written in the Astree data dictionary.
+
+    Same as VariableRange.parse(variable_range).get_bounded_text(), but the plain forms are
+    converted straight to the text, without building the range.
+
+    Returns:
+        str: The text, or None if the range could not be parsed or is not bounded.
+    """
+    if not variable_range:
+        return None
+    part, separator, constraints = variable_range.partition(CONSTRAINT_SEPARATOR)
+    try:
+        # A NaN bound is not finite, the text is None like the range of VariableRange.parse
+        bounds = parse_plain_bounds(part, parse_float_bound)
+        if bounds is None:
+            range_obj = VariableRange.parse(variable_range)
+            return range_obj.get_bounded_text() if range_obj is not None else None
+        # The excluded values do not change the hull, they are only validated
+        if separator:
+            for constraint in constraints.split(CONSTRAINT_SEPARATOR):
+                parse_not_equal(constraint.strip())
+    except ValueError:
+        return None
+    lower, upper = bounds
+    if not (isfinite(lower) and isfinite(upper)):
+        return None
+    return f'{lower}{TEXT_SEPARATOR}{upper}'
+
+
+def parse_intervals(part: str) -> list:
+    """
+    Parses the union of intervals and value sets of a range, e.g. "]0., 1.5] \\/ {2, 3}".
+
+    Args:
+        part (str): The range without its "/\\" constraints.
+
+    Returns:
+        list: The Interval list, or None if a member of the union is not an interval nor a value set.
+
+    Raises:
+        ValueError: If a bound is not a number.
+    """
+    intervals = []
+    for member in part.split(UNION_SEPARATOR):
+        member = member.strip()
+        match = INTERVAL_PATTERN.fullmatch(member)
+        if match:
+            intervals.append(Interval(parse_number(match.group(2)), parse_number(match.group(3)),
+                                      match.group(1) == '[', match.group(4) == ']'))
+            continue
+        match = VALUE_SET_PATTERN.fullmatch(member)
+        if match and match.group(1).strip():
+            for value in match.group(1).split(','):
+                value = parse_number(value)
+                intervals.append(Interval(value, value))
+            continue
+        return None
+    return intervals
+
+
+class VariableRange:
+    """
+    Range of a variable in the Astree data dictionary.
+
+    A range is a union of intervals, with optional "!= v" constraints. Examples:
+    "[0, 1]", "{40} /\\ != 0", "]0., 1.5]", "[0, 3] \\/ [8, 12]", "{0, 1, 5}".
+    The bounds are kept as int for integer ranges so no value is lost.
+    """
+    __slots__ = ('intervals', 'excluded', 'constraints')
+
+    def __init__(self, intervals: tuple, excluded: tuple = (), constraints: tuple = ()) -> None:
+        self.intervals = tuple(sorted(intervals))
+        self.excluded = tuple(excluded)
+        # Constraints other than "!= v", kept as written in the log
+        self.constraints = tuple(constraints)
+        pass
+
+    @classmethod
+    def parse(cls, variable_range: str):
+        """
+        Parses a range as written in the Astree data dictionary.
+
+        Args:
+            variable_range (str): The range, e.g. "[0, 1]" or "{40} /\\ != 0".
+
+        Returns:
+            VariableRange: The parsed range, or None if the range could not be parsed.
+        """
+        if not variable_range:
+            return None
+        parts = variable_range.strip().split(CONSTRAINT_SEPARATOR)
+        try:
+            bounds = parse_plain_bounds(parts[0])
+            if bounds is None:
+                intervals = parse_intervals(parts[0])
+                if intervals is None:
+                    return None
+            excluded = []
+            constraints = []
+            for constraint in parts[1:]:
+                constraint = constraint.strip()
+                excluded_value = parse_not_equal(constraint)
+                if excluded_value is not None:
+                    excluded.append(excluded_value)
+                else:
+                    constraints.append(constraint)
+        except ValueError:
+            return None
+        if bounds is not None:
+            # Built as a plain tuple: the NamedTuple constructor with its defaults is slower
+            return cls.from_interval(tuple.__new__(Interval, (bounds[0], bounds[1], True, True)), excluded, constraints)
+        return cls(intervals, excluded, constraints)
+
+    @classmethod
+    def from_interval(cls, interval: Interval, excluded: list = (), constraints: list = ()):
+        """
+        Returns the range of a single interval, without the sort of __init__.
+        """
+        variable_range = cls.__new__(cls)
+        variable_range.intervals = (interval,)
+        variable_range.excluded = tuple(excluded)
+        variable_range.constraints = tuple(constraints)
+        return variable_range
+
+    @classmethod
+    def from_text(cls, text: str):
+        """
+        Parses the "lo..hi" text written in the variable access CSV file.
+
+        Args:
+            text (str): The range text.
+
+        Returns:
+            VariableRange: The range, or None if the text is not a "lo..hi" range.
+        """
+        bounds = text.strip().split(TEXT_SEPARATOR)
+        if len(bounds) != 2:
+            return None
+        try:
+            return cls((Interval(parse_number(bounds[0]), parse_number(bounds[1])),))
+        except ValueError:
+            return None
+
+    @property
+    def lower(self):
+        return self.intervals[0].lower
+
+    @property
+    def upper(self):
+        intervals = self.intervals
+        if len(intervals) == 1:
+            return intervals[0].upper
+        return max(interval.upper for interval in intervals)
+
+    @property
+    def is_integer(self) -> bool:
+        return all(isinstance(interval.lower, int) and isinstance(interval.upper, int) for interval in self.intervals)
+
+    @property
+    def is_singleton(self) -> bool:
+        return self.lower == self.upper
+
+    def is_bounded(self) -> bool:
+        """
+        Checks if both bounds of the range are finite.
+        """
+        return math.isfinite(self.intervals[0].lower) and math.isfinite(self.upper)
+
+    def contains(self, value: float) -> bool:
+        """
+        Checks if the given value is in the range.
+
+        Args:
+            value (float): The value.
+
+        Returns:
+            bool: True if one of the intervals contains the value and it is not excluded.
+        """
+        if value in self.excluded:
+            return False
+        return any(interval.contains(value) for interval in self.intervals)
+
+    def get_bounded_text(self) -> str:
+        """
+        Returns the "lo..hi" text of to_text(), or None if the range is not bounded.
+        """
+        return format_bounded_text(self.intervals[0].lower, self.upper)
+
+    def to_text(self) -> str:
+        """
+        Serializes the hull of the range to the "lo..hi" text of the variable access CSV file.
+        """
+        return f'{float(self.lower)}{TEXT_SEPARATOR}{float(self.upper)}'
+
+    def to_astree(self) -> str:
+        """
+        Serializes the range back to the Astree syntax, without loss.
+        """
+        parts = []
+        for interval in self.intervals:
+            if interval.lower == interval.upper and interval.lower_closed and interval.upper_closed:
+                parts.append(f'{{{interval.lower}}}')
+            else:
+                parts.append(f"{'[' if interval.lower_closed else ']'}{interval.lower}, "
+                             f"{interval.upper}{']' if interval.upper_closed else '['}")
+        text = f' {UNION_SEPARATOR} '.join(parts)
+        for value in self.excluded:
+            text += f' {CONSTRAINT_SEPARATOR} != {value}'
+        for constraint in self.constraints:
+            text += f' {CONSTRAINT_SEPARATOR} {constraint}'
+        return text
+
+    def __str__(self) -> str:
+        return self.to_text()
+
+    def __repr__(self) -> str:
+        return f'VariableRange({self.to_astree()!r})'
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, VariableRange):
+            return NotImplemented
+        return (self.intervals, self.excluded, self.constraints) == (other.intervals, other.excluded, other.constraints)
+
+    def __hash__(self) -> int:
+        return hash((self.intervals, self.excluded, self.constraints))
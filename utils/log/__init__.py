@@ -1 +1 @@
-from .logger import Logger
\ No newline at end of file
+from .logger import Logger, TagLogger
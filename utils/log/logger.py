@@ -1,5 +1,9 @@
 import os
+import time
+import queue
+import atexit
 import logging
+import logging.handlers
 from datetime import datetime
 from functools import wraps
 
@@ -8,21 +12,36 @@ RESET = "\033[0m"
 YELLOW = "\033[33m"
 RED = "\033[31m"
 
+LEVEL_COLORS = {logging.WARNING: YELLOW, logging.ERROR: RED}
+LEVELS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR}
+
+# (second, text) of the last formatted time, the text only changes once a second
+_time_text = (None, "")
+
+def get_time_text() -> str:
+    global _time_text
+    now = time.time()
+    second = int(now)
+    if _time_text[0] != second:
+        _time_text = (second, datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"))
+    return _time_text[1]
+
+
+def format_message(tag: str, message: str, level: int) -> str:
+    """
+    Returns the message with the layout of the log file: time, tag and message.
+    """
+    return f"{get_time_text()}: {LEVEL_COLORS.get(level, '')}{tag:^30} : {message}{RESET}"
+
+
 def format_log(func):
+    level = LEVELS[func.__name__.upper()]
     @wraps(func)
     def wrapper(*args, **kwargs):
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_level = func.__name__.upper()
-        
-        # Determine color based on log level
-        if log_level == 'WARNING':
-            color = YELLOW
-        elif log_level == 'ERROR':
-            color = RED
-        else:
-            color = ""
-        
-        args = (f"{current_time}: {color}{args[0]:^30} : {args[1]}{RESET}",) + args[2:]
+        # Nothing is formatted for a disabled level
+        if not logging.root.isEnabledFor(level):
+            return None
+        args = (format_message(args[0], args[1], level),) + args[2:]
         return func(*args, **kwargs)
     return wrapper
 
@@ -30,21 +49,92 @@ logging.info = format_log(logging.info)
 logging.warning = format_log(logging.warning)
 logging.error = format_log(logging.error)
 logging.debug = format_log(logging.debug)
- 
- 
+
+
+class TagLogger:
+    """
+    Logger of one component, with the same layout as the patched logging functions.
+
+    The level is checked before anything is formatted and the message is a %-format string
+    whose arguments are only applied when the record is emitted, so a disabled call in a
+    loop costs a level check:
+
+        log = TagLogger("LinkVar2Sim")
+        log.debug("Comment block: %s", comment_block)
+    """
+
+    def __init__(self, tag: str, logger: logging.Logger = None) -> None:
+        self.m_tag = tag
+        self.m_logger = logger if logger is not None else logging.getLogger()
+        pass
+
+    def is_enabled(self, level: int) -> bool:
+        return self.m_logger.isEnabledFor(level)
+
+    def log(self, level: int, message: str, *args) -> None:
+        if self.m_logger.isEnabledFor(level):
+            self.m_logger.log(level, format_message(self.m_tag, message, level), *args)
+
+    def debug(self, message: str, *args) -> None:
+        if self.m_logger.isEnabledFor(logging.DEBUG):
+            self.m_logger.debug(format_message(self.m_tag, message, logging.DEBUG), *args)
+
+    def info(self, message: str, *args) -> None:
+        if self.m_logger.isEnabledFor(logging.INFO):
+            self.m_logger.info(format_message(self.m_tag, message, logging.INFO), *args)
+
+    def warning(self, message: str, *args) -> None:
+        if self.m_logger.isEnabledFor(logging.WARNING):
+            self.m_logger.warning(format_message(self.m_tag, message, logging.WARNING), *args)
+
+    def error(self, message: str, *args) -> None:
+        if self.m_logger.isEnabledFor(logging.ERROR):
+            self.m_logger.error(format_message(self.m_tag, message, logging.ERROR), *args)
+
+
 class Logger:
    
-    def __init__(self, log_folder="./log"):
+    def __init__(self, log_folder="./log", level=logging.INFO, use_queue=False):
+        """
+        Args:
+            log_folder (str): The folder of the daily log files.
+            level (int): The minimum level of the logged messages.
+            use_queue (bool): Write the log file and the console from a background thread, the
+                              logging calls only put the records in a queue.
+        """
         self.m_log_folder = log_folder
+        self.m_queue_listener = None
         today = datetime.today().strftime('%Y_%m_%d')
         FORMAT = '%(message)s'
         # Check and create log folder
         if not os.path.isdir(self.m_log_folder):
             os.makedirs(self.m_log_folder)
  
-        logging.basicConfig(filename=f'{self.m_log_folder}/{today}.log', encoding='utf-8', level=logging.INFO, force=True, format=FORMAT)
+        logging.basicConfig(filename=f'{self.m_log_folder}/{today}.log', encoding='utf-8', level=level, force=True, format=FORMAT)
         logging.getLogger().addHandler(logging.StreamHandler())
+        if use_queue:
+            self.start_queue()
         logging.info("Logger", 'Init')
+
+    def start_queue(self) -> None:
+        """
+        Moves the handlers of the root logger behind a queue, emptied by a background thread.
+        """
+        root_logger = logging.getLogger()
+        record_queue = queue.SimpleQueue()
+        self.m_queue_listener = logging.handlers.QueueListener(record_queue, *root_logger.handlers, respect_handler_level=True)
+        root_logger.handlers = [logging.handlers.QueueHandler(record_queue)]
+        self.m_queue_listener.start()
+        # Write the queued records before the interpreter exits
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """
+        Writes the queued records and stops the background thread, if any.
+        """
+        if self.m_queue_listener is not None:
+            self.m_queue_listener.stop()
+            self.m_queue_listener = None
  
     def info(self, data):
         logging.info("Logger", data)
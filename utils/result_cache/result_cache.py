@@ -0,0 +1,139 @@
+import os
+import shutil
+import hashlib
+import tempfile
+from utils.log import TagLogger
+
+# Size of the blocks read when hashing the input files
+HASH_BLOCK_SIZE = 1024 * 1024
+# Default maximum size of the cache folder
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+log = TagLogger("ResultCache")
+
+class ResultCache:
+    """
+    Persistent on-disk cache of output files, keyed by the content hash of the input files.
+
+    Every entry is a folder named after the key, holding copies of the output files of one run.
+    The key covers the content of the input files and a version string, so changing the parser
+    invalidates the previous results. The cache is bounded in size: when it grows above
+    max_bytes, the least recently used entries are removed.
+    """
+
+    def __init__(self, cache_folder: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        log.debug("Init: %s", cache_folder)
+        self.m_cache_folder = cache_folder
+        self.m_max_bytes = max_bytes
+        self.m_hits = 0
+        self.m_misses = 0
+        # Several worker processes may create the cache folder at the same time
+        os.makedirs(cache_folder, exist_ok=True)
+        pass
+
+    def get_key(self, file_paths: list, version: str) -> str:
+        """
+        Computes the cache key of the given input files.
+
+        Args:
+            file_paths (list): The paths to the input files, in a fixed order.
+            version (str): The version of the code producing the outputs.
+
+        Returns:
+            str: The hexadecimal content hash.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(version.encode('utf-8'))
+        for file_path in file_paths:
+            digest.update(b'\0')
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                    digest.update(block)
+        return digest.hexdigest()
+
+    def get_entry_folder(self, key: str) -> str:
+        return os.path.join(self.m_cache_folder, key)
+
+    def restore(self, key: str, output_folder: str) -> bool:
+        """
+        Copies the cached output files of the given key to the output folder.
+
+        Args:
+            key (str): The cache key.
+            output_folder (str): The folder to copy the output files to.
+
+        Returns:
+            bool: True if the key was found in the cache.
+        """
+        entry_folder = self.get_entry_folder(key)
+        if not os.path.isdir(entry_folder):
+            self.m_misses += 1
+            return False
+        if not os.path.exists(output_folder):
+            os.makedirs(output_folder)
+        try:
+            for file_name in os.listdir(entry_folder):
+                shutil.copyfile(os.path.join(entry_folder, file_name), os.path.join(output_folder, file_name))
+            # Mark the entry as recently used
+            os.utime(entry_folder)
+        except FileNotFoundError:
+            # The entry was evicted meanwhile by another process
+            self.m_misses += 1
+            return False
+        self.m_hits += 1
+        log.info("Cache hit: %s", key)
+        return True
+
+    def store(self, key: str, output_files: list) -> None:
+        """
+        Stores copies of the given output files under the given key, then evicts the least
+        recently used entries if the cache is too big.
+
+        Args:
+            key (str): The cache key.
+            output_files (list): The paths to the output files.
+        """
+        entry_folder = self.get_entry_folder(key)
+        if os.path.isdir(entry_folder):
+            return
+        # Build the entry in a temporary folder and rename it, so a partial entry is never visible
+        temp_folder = tempfile.mkdtemp(prefix='.tmp-', dir=self.m_cache_folder)
+        try:
+            for output_file in output_files:
+                shutil.copyfile(output_file, os.path.join(temp_folder, os.path.basename(output_file)))
+            os.rename(temp_folder, entry_folder)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(temp_folder, ignore_errors=True)
+            return
+        log.info("Cache stored: %s", key)
+        self.evict()
+
+    def get_entries(self) -> list:
+        """
+        Returns the (last use time, size, folder) of every cache entry.
+        """
+        entries = []
+        for key in os.listdir(self.m_cache_folder):
+            entry_folder = self.get_entry_folder(key)
+            if key.startswith('.tmp-') or not os.path.isdir(entry_folder):
+                continue
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(entry_folder))
+                entries.append((os.stat(entry_folder).st_mtime, size, entry_folder))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used entries until the cache is smaller than max_bytes.
+        """
+        entries = sorted(self.get_entries())
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_folder in entries:
+            if total_size <= self.m_max_bytes:
+                break
+            log.info("Cache evicted: %s", os.path.basename(entry_folder))
+            shutil.rmtree(entry_folder, ignore_errors=True)
+            total_size -= size
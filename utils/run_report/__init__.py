@@ -0,0 +1 @@
+from .run_report import RunReport, RUN_REPORT_FILE_NAME
@@ -0,0 +1,89 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+
+RUN_REPORT_FILE_NAME = "run_report.json"
+# Version of the report layout, increase it when a field changes meaning
+RUN_REPORT_VERSION = 1
+
+class RunReport:
+    """
+    Phase timers and counters of a run, saved as a JSON run report next to the outputs.
+
+    A phase is timed with its wall time and the CPU time of the thread running it, and can run
+    several times (e.g. once per link() call or per monitored run): the times add up and the
+    calls are counted. Counters are plain named integers (lines parsed, variables matched,
+    cache hits ...). Several threads may report to the same instance.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.m_name = name
+        self.m_started = datetime.now().isoformat(timespec='seconds')
+        self.m_start_time = time.perf_counter()
+        # phase -> {"calls": int, "wall_time": float, "cpu_time": float}, in seconds
+        self.m_phases = {}
+        self.m_counters = {}
+        self.m_lock = threading.Lock()
+        pass
+
+    @contextmanager
+    def phase(self, phase_name: str):
+        """
+        Times the enclosed block as one call of the given phase:
+
+            with run_report.phase("index_source"):
+                ...
+        """
+        wall_tic = time.perf_counter()
+        cpu_tic = time.thread_time()
+        try:
+            yield
+        finally:
+            self.add_phase(phase_name, time.perf_counter() - wall_tic, time.thread_time() - cpu_tic)
+
+    def add_phase(self, phase_name: str, wall_time: float, cpu_time: float) -> None:
+        with self.m_lock:
+            phase = self.m_phases.setdefault(phase_name, {"calls": 0, "wall_time": 0.0, "cpu_time": 0.0})
+            phase["calls"] += 1
+            phase["wall_time"] += wall_time
+            phase["cpu_time"] += cpu_time
+
+    def count(self, counter_name: str, value: int = 1) -> None:
+        with self.m_lock:
+            self.m_counters[counter_name] = self.m_counters.get(counter_name, 0) + value
+
+    def get_counter(self, counter_name: str) -> int:
+        return self.m_counters.get(counter_name, 0)
+
+    def to_dict(self) -> dict:
+        with self.m_lock:
+            return {
+                "version": RUN_REPORT_VERSION,
+                "name": self.m_name,
+                "started": self.m_started,
+                "wall_time": round(time.perf_counter() - self.m_start_time, 6),
+                "phases": {phase_name: {"calls": phase["calls"], "wall_time": round(phase["wall_time"], 6),
+                                        "cpu_time": round(phase["cpu_time"], 6)}
+                           for phase_name, phase in self.m_phases.items()},
+                "counters": dict(self.m_counters),
+            }
+
+    def save(self, output_folder: str, file_name: str = RUN_REPORT_FILE_NAME) -> str:
+        """
+        Writes the report to '<output_folder>/run_report.json'.
+
+        The file is written to a temporary name first, so a reader never sees a partial report.
+
+        Returns:
+            str: The path to the report file.
+        """
+        os.makedirs(output_folder, exist_ok=True)
+        report_file = os.path.join(output_folder, file_name)
+        temp_file = f"{report_file}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(temp_file, report_file)
+        return report_file
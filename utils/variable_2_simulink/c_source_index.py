@@ -0,0 +1,340 @@
+import os
+import re
+import mmap
+from array import array
+from bisect import bisect_right
+from utils.log import TagLogger
+
+# Matches a line that starts with "<identifier> = ", e.g. "    USS_INIT_s_FlgCalRomVld_measure = ..."
+ASSIGNMENT_PATTERN = re.compile(r'^\s*([A-Za-z_][\w.]*) = ')
+# Same as ASSIGNMENT_PATTERN, over the bytes of a whole file instead of one line. The leading
+# newline (instead of '^' in MULTILINE mode) lets the regex engine skip to the next line quickly
+ASSIGNMENT_BYTES_PATTERN = re.compile(rb'\n[^\S\n]*([A-Za-z_][\w.]*) = ')
+FIRST_ASSIGNMENT_BYTES_PATTERN = re.compile(rb'[^\S\n]*([A-Za-z_][\w.]*) = ')
+COMMENT_OPEN_BYTES_PATTERN = re.compile(rb'/\*')
+COMMENT_CLOSE_BYTES_PATTERN = re.compile(rb'\*/')
+NEWLINE_BYTES_PATTERN = re.compile(rb'\n')
+# Source files from this size are indexed over a memory map (CSourceIndex.from_file) instead of being loaded
+MMAP_MIN_FILE_SIZE = 64 * 1024 * 1024
+# Encoding of the generated C sources (Windows code page of the code generator). Every reader of a
+# source uses it, with the undecodable bytes replaced, so the comments do not depend on the locale
+# nor on the backend (loaded or memory-mapped) chosen from the file size
+SOURCE_ENCODING = 'cp1252'
+SOURCE_DECODE_ERRORS = 'replace'
+
+log = TagLogger("CSourceIndex")
+
+
+def read_source_file(source_c_path: str, encoding: str = SOURCE_ENCODING) -> str:
+    """
+    Reads a C source file with the source encoding, the same decoding as CSourceIndex.from_file.
+    """
+    with open(source_c_path, 'r', encoding=encoding, errors=SOURCE_DECODE_ERRORS) as f:
+        return f.read()
+
+
+class MappedSourceLines:
+    """
+    Read-only list of the lines of a memory-mapped source file.
+
+    Only the line-start offset table is kept in memory, a line is decoded when it is accessed.
+    """
+
+    def __init__(self, source: mmap.mmap, line_starts: array, encoding: str = SOURCE_ENCODING) -> None:
+        self.m_source = source
+        self.m_line_starts = line_starts
+        self.m_encoding = encoding
+        pass
+
+    def __len__(self) -> int:
+        return len(self.m_line_starts)
+
+    def get_line_bytes(self, line_no: int) -> bytes:
+        start = self.m_line_starts[line_no]
+        if line_no + 1 < len(self.m_line_starts):
+            return self.m_source[start:self.m_line_starts[line_no + 1] - 1]
+        return self.m_source[start:]
+
+    def __getitem__(self, line_no):
+        if isinstance(line_no, slice):
+            return self.get_lines(*line_no.indices(len(self))[:2])
+        return self.get_line_bytes(line_no).decode(self.m_encoding, errors=SOURCE_DECODE_ERRORS)
+
+    def get_lines(self, start: int, stop: int) -> list:
+        """
+        Returns the lines from start up to stop (excluded), decoded at once.
+        """
+        if start >= stop:
+            return []
+        start_offset = self.m_line_starts[start]
+        if stop < len(self.m_line_starts):
+            return self.m_source[start_offset:self.m_line_starts[stop] - 1].decode(self.m_encoding, errors=SOURCE_DECODE_ERRORS).split('\n')
+        return self.m_source[start_offset:].decode(self.m_encoding, errors=SOURCE_DECODE_ERRORS).split('\n')
+
+    def get_line_no(self, offset: int) -> int:
+        """
+        Returns the (0-based) number of the line containing the given byte offset.
+        """
+        return bisect_right(self.m_line_starts, offset) - 1
+
+class CSourceIndex:
+    """
+    Index of a generated C source file built in a single pass over its lines.
+
+    The index holds:
+    - the assignments: every identifier that starts a line with "<identifier> = ",
+      mapped to the (0-based) line numbers of those assignments.
+    - the comment blocks: the line span (start, end) of every "/* ... */" block.
+    - for every assignment line, the nearest comment block above it, which in
+      Embedded Coder generated code carries the Simulink path of the block.
+    """
+
+    def __init__(self, source_c: str = '') -> None:
+        log.debug("Init")
+        self.m_lines = source_c.split('\n')
+        self.m_assignments = {}
+        self.m_comment_blocks = []
+        self.m_comment_texts = []
+        self.m_preceding_comment = {}
+        self.index_lines()
+        pass
+
+    def index_lines(self) -> None:
+        """
+        Scans the source lines once and records the assignments, the comment blocks and
+        the comment block preceding each assignment.
+        """
+        lines = self.m_lines
+        assignments = self.m_assignments
+        comment_blocks = self.m_comment_blocks
+        preceding_comment = self.m_preceding_comment
+        # Comment blocks whose end "*/" has not been seen yet
+        open_blocks = []
+        last_block = None
+        for line_no, line in enumerate(lines):
+            if ' = ' in line:
+                match = ASSIGNMENT_PATTERN.match(line)
+                if match:
+                    assignments.setdefault(match.group(1), []).append(line_no)
+                    if last_block is not None:
+                        preceding_comment[line_no] = last_block
+            if '/*' in line:
+                last_block = len(comment_blocks)
+                comment_blocks.append([line_no, line_no])
+                open_blocks.append(last_block)
+            if open_blocks and '*/' in line:
+                for block_no in open_blocks:
+                    comment_blocks[block_no][1] = line_no
+                open_blocks = []
+        for block_no in open_blocks:
+            comment_blocks[block_no][1] = len(lines) - 1
+        self.m_comment_blocks = [tuple(block) for block in comment_blocks]
+        self.m_comment_texts = [self.get_comment_text(start, end) for start, end in self.m_comment_blocks]
+
+    def get_comment_text(self, start: int, end: int) -> str:
+        """
+        Builds the text of a comment block from its line span.
+
+        The text is the concatenation of the stripped lines from the start of the block up to
+        the first line containing '#' or '*/', which keeps the first Simulink path of the block.
+        If the first line already contains one of them, the first line is returned.
+
+        Args:
+            start (int): The line number of the line containing '/*'.
+            end (int): The line number of the line containing '*/'.
+
+        Returns:
+            str: The comment text.
+        """
+        return self.join_comment_lines(self.m_lines[start:end + 1])
+
+    @staticmethod
+    def join_comment_lines(block_lines: list) -> str:
+        """
+        Builds the text of a comment block from its lines, see get_comment_text.
+        """
+        comment_block = ''
+        for line in block_lines:
+            if '#' in line or '*/' in line:
+                break
+            comment_block += line.strip()
+        if comment_block == '':
+            return block_lines[0].strip()
+        return comment_block
+
+    @classmethod
+    def from_file(cls, source_c_path: str, encoding: str = SOURCE_ENCODING) -> 'CSourceIndex':
+        """
+        Builds the index of a source file over a memory map of the file, without loading it.
+
+        The assignments and the comment marks are found by regular expressions over the mapped
+        bytes and located with a line-start offset table; only the lines of the comment blocks
+        are decoded. The peak memory is the offset table and the index, not the file size.
+        The index is identical to CSourceIndex(read_source_file(source_c_path, encoding)) for a
+        file with '\n' or '\r\n' newlines.
+
+        Args:
+            source_c_path (str): The path to the source file.
+            encoding (str): The encoding of the comment blocks, undecodable bytes are replaced.
+
+        Returns:
+            CSourceIndex: The index of the file.
+        """
+        index = cls()
+        with open(source_c_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return index
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+                line_starts = array('q', [0])
+                line_starts.extend(match.end() for match in NEWLINE_BYTES_PATTERN.finditer(source))
+                lines = MappedSourceLines(source, line_starts, encoding)
+                # (line number, 0, variable) for the assignments, (line number, 1, None) for the comment
+                # marks: sorted, the assignment of a line is handled before its comment marks, as in index_lines
+                events = [(lines.get_line_no(match.start(1)), 0, match.group(1).decode('ascii'))
+                          for match in ASSIGNMENT_BYTES_PATTERN.finditer(source)]
+                first_match = FIRST_ASSIGNMENT_BYTES_PATTERN.match(source)
+                if first_match:
+                    events.append((0, 0, first_match.group(1).decode('ascii')))
+                comment_lines = {lines.get_line_no(match.start()) for match in COMMENT_OPEN_BYTES_PATTERN.finditer(source)}
+                comment_lines.update(lines.get_line_no(match.start()) for match in COMMENT_CLOSE_BYTES_PATTERN.finditer(source))
+                events.extend((line_no, 1, None) for line_no in comment_lines)
+                events.sort()
+                index.m_lines = lines
+                index.index_events(events)
+                index.m_lines = []
+        return index
+
+    def index_events(self, events: list) -> None:
+        """
+        Records the assignments and the comment blocks from the sorted line events of from_file,
+        with the same rules as index_lines.
+
+        Args:
+            events (list): (line number, 0, variable) and (line number, 1, None) tuples, sorted.
+        """
+        lines = self.m_lines
+        comment_blocks = []
+        open_blocks = []
+        last_block = None
+        for line_no, is_comment, variable in events:
+            if not is_comment:
+                self.m_assignments.setdefault(variable, []).append(line_no)
+                if last_block is not None:
+                    self.m_preceding_comment[line_no] = last_block
+                continue
+            line = lines.get_line_bytes(line_no)
+            if b'/*' in line:
+                last_block = len(comment_blocks)
+                comment_blocks.append([line_no, line_no])
+                open_blocks.append(last_block)
+            if open_blocks and b'*/' in line:
+                for block_no in open_blocks:
+                    comment_blocks[block_no][1] = line_no
+                open_blocks = []
+        for block_no in open_blocks:
+            comment_blocks[block_no][1] = len(lines) - 1
+        self.m_comment_blocks = [tuple(block) for block in comment_blocks]
+        self.m_comment_texts = [self.get_comment_text(start, end) for start, end in self.m_comment_blocks]
+
+    def to_dict(self) -> dict:
+        """
+        Returns the index as a JSON serializable dictionary, without the source lines.
+        """
+        return {
+            "assignments": self.m_assignments,
+            "comment_blocks": self.m_comment_blocks,
+            "comment_texts": self.m_comment_texts,
+            "preceding_comment": list(self.m_preceding_comment.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CSourceIndex':
+        """
+        Rebuilds an index saved by to_dict, without scanning any source.
+
+        Args:
+            data (dict): The dictionary returned by to_dict.
+
+        Returns:
+            CSourceIndex: The index.
+        """
+        index = cls()
+        index.m_assignments = data["assignments"]
+        index.m_comment_blocks = [tuple(block) for block in data["comment_blocks"]]
+        index.m_comment_texts = data["comment_texts"]
+        index.m_preceding_comment = dict(data["preceding_comment"])
+        return index
+
+    @classmethod
+    def merge(cls, chunk_indexes: list) -> 'CSourceIndex':
+        """
+        Merges the indexes of consecutive chunks of a source file into the index of the whole file.
+
+        The chunks must not split a comment block. An assignment without a comment block above
+        it in its own chunk gets the last comment block of the previous chunks, as in a single pass.
+
+        Args:
+            chunk_indexes (list): (line offset of the chunk, CSourceIndex of the chunk) tuples, in file order.
+
+        Returns:
+            CSourceIndex: The index of the whole file.
+        """
+        index = cls()
+        assignments = index.m_assignments
+        comment_blocks = index.m_comment_blocks
+        comment_texts = index.m_comment_texts
+        preceding_comment = index.m_preceding_comment
+        for line_offset, chunk_index in chunk_indexes:
+            block_offset = len(comment_blocks)
+            for variable, line_nos in chunk_index.m_assignments.items():
+                variable_lines = assignments.setdefault(variable, [])
+                for line_no in line_nos:
+                    variable_lines.append(line_offset + line_no)
+                    block_no = chunk_index.m_preceding_comment.get(line_no)
+                    if block_no is not None:
+                        preceding_comment[line_offset + line_no] = block_offset + block_no
+                    elif block_offset > 0:
+                        preceding_comment[line_offset + line_no] = block_offset - 1
+            comment_blocks.extend((line_offset + start, line_offset + end) for start, end in chunk_index.m_comment_blocks)
+            comment_texts.extend(chunk_index.m_comment_texts)
+        return index
+
+    def get_assignment_lines(self, variable: str) -> list:
+        """
+        Returns the line numbers where the given variable is assigned.
+
+        Args:
+            variable (str): The variable name.
+
+        Returns:
+            list: The 0-based line numbers, empty if the variable is never assigned.
+        """
+        return self.m_assignments.get(variable, [])
+
+    def is_assigned(self, variable: str) -> bool:
+        """
+        Checks if the given variable is assigned anywhere in the source.
+
+        Args:
+            variable (str): The variable name.
+
+        Returns:
+            bool: True if at least one line starts with "<variable> = ".
+        """
+        return variable in self.m_assignments
+
+    def get_comment_block(self, variable: str) -> str:
+        """
+        Returns the comment block above the first assignment of the given variable.
+
+        Args:
+            variable (str): The variable name.
+
+        Returns:
+            str: The comment text, empty if the variable has no commented assignment.
+        """
+        for line_no in self.m_assignments.get(variable, []):
+            block_no = self.m_preceding_comment.get(line_no)
+            if block_no is not None:
+                return self.m_comment_texts[block_no]
+        return ''
@@ -0,0 +1,132 @@
+import os
+import re
+import json
+import hashlib
+from utils.variable_2_simulink.c_source_index import CSourceIndex
+from utils.log import TagLogger
+
+# Version of the saved index state: increase it when CSourceIndex changes
+INDEX_STATE_VERSION = "1"
+INDEX_STATE_FILE_NAME = "link_index.json"
+# Matches an empty (or whitespace only) line followed by a non empty line, the chunks end on such lines
+BLANK_LINE_PATTERN = re.compile(r'\n[ \t]*\n(?=[ \t]*\S)')
+
+log = TagLogger("IncrementalSourceIndex")
+
+def split_chunks(source_c: str) -> list:
+    """
+    Splits a C source into chunks ending on blank lines outside of comment blocks.
+
+    In generated code every Simulink block is a "/* <path> */" comment followed by its code and
+    a blank line, so a change in the model only changes the chunks of the regenerated blocks.
+    The boundaries only depend on the nearby content, so inserting or removing lines does not
+    shift the chunks after the change.
+
+    Args:
+        source_c (str): The content of the source file.
+
+    Returns:
+        list: The chunks, their concatenation is the source.
+    """
+    chunks = []
+    chunk_start = 0
+    for match in BLANK_LINE_PATTERN.finditer(source_c):
+        # The chunk ends after the newline of the blank line
+        chunk_end = match.end()
+        # Never split a comment block, CSourceIndex.merge relies on it
+        if source_c.rfind('/*', chunk_start, chunk_end) > source_c.rfind('*/', chunk_start, chunk_end):
+            continue
+        chunks.append(source_c[chunk_start:chunk_end])
+        chunk_start = chunk_end
+    if chunk_start < len(source_c):
+        chunks.append(source_c[chunk_start:])
+    return chunks
+
+
+def get_chunk_hash(chunk: str) -> str:
+    return hashlib.blake2b(chunk.encode('utf-8', errors='surrogateescape'), digest_size=16).hexdigest()
+
+
+class IncrementalSourceIndex:
+    """
+    CSourceIndex kept between two runs, re-indexing only the chunks of the source that changed.
+
+    The index of every chunk is saved in a state file keyed by the content hash of the chunk.
+    On the next run the source is split again, the unchanged chunks reuse their saved index,
+    only the new chunks are scanned, and the chunk indexes are merged into the file index.
+    """
+
+    def __init__(self, state_file: str) -> None:
+        log.debug("Init")
+        self.m_state_file = state_file
+        # Content hash of a chunk -> CSourceIndex of the chunk
+        self.m_chunk_indexes = {}
+        self.m_reused_chunks = 0
+        self.m_indexed_chunks = 0
+        self.load_state()
+        pass
+
+    def load_state(self) -> None:
+        """
+        Loads the chunk indexes saved by the previous run, if any.
+        """
+        if not os.path.exists(self.m_state_file):
+            return
+        try:
+            with open(self.m_state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as ex:
+            log.warning("Cannot read the index state, full index: %s", ex)
+            return
+        if state.get("version") != INDEX_STATE_VERSION:
+            log.info("Index state of another version, full index")
+            return
+        self.m_chunk_indexes = {chunk_hash: CSourceIndex.from_dict(data) for chunk_hash, data in state["chunks"].items()}
+
+    def save_state(self) -> None:
+        """
+        Saves the chunk indexes of the last update for the next run.
+        """
+        state_folder = os.path.dirname(self.m_state_file)
+        if state_folder and not os.path.exists(state_folder):
+            os.makedirs(state_folder)
+        state = {
+            "version": INDEX_STATE_VERSION,
+            "chunks": {chunk_hash: index.to_dict() for chunk_hash, index in self.m_chunk_indexes.items()},
+        }
+        # Write then rename, so an interrupted run never leaves a partial state
+        temp_file = f"{self.m_state_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_file, self.m_state_file)
+
+    def update(self, source_c: str) -> CSourceIndex:
+        """
+        Indexes the source, scanning only the chunks not seen in the previous run.
+
+        Args:
+            source_c (str): The content of the source file.
+
+        Returns:
+            CSourceIndex: The index of the whole source, identical to CSourceIndex(source_c).
+        """
+        chunk_indexes = []
+        new_chunk_indexes = {}
+        self.m_reused_chunks = 0
+        self.m_indexed_chunks = 0
+        line_offset = 0
+        for chunk in split_chunks(source_c):
+            chunk_hash = get_chunk_hash(chunk)
+            chunk_index = new_chunk_indexes.get(chunk_hash) or self.m_chunk_indexes.get(chunk_hash)
+            if chunk_index is None:
+                chunk_index = CSourceIndex(chunk)
+                self.m_indexed_chunks += 1
+            else:
+                self.m_reused_chunks += 1
+            new_chunk_indexes[chunk_hash] = chunk_index
+            chunk_indexes.append((line_offset, chunk_index))
+            line_offset += chunk.count('\n')
+        # Only keep the chunks of the current source, the state does not grow across runs
+        self.m_chunk_indexes = new_chunk_indexes
+        log.info("Re-indexed %d chunk(s), reused %d chunk(s)", self.m_indexed_chunks, self.m_reused_chunks)
+        return CSourceIndex.merge(chunk_indexes)
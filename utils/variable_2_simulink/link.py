@@ -1,18 +1,63 @@
 import os
+import sys
 import logging
+from collections import OrderedDict
+# include repository root in sys.path so the module also works when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.variable_2_simulink.c_source_index import CSourceIndex, MMAP_MIN_FILE_SIZE, SOURCE_ENCODING, read_source_file
+from utils.variable_2_simulink.incremental_index import IncrementalSourceIndex, INDEX_STATE_FILE_NAME
+from utils.variable_2_simulink.variable_store import iter_variable_access
+from utils.astree_log_utils.variable_merge import add_variable
+from utils.result_cache import ResultCache
+from utils.run_report import RunReport
+from utils.log import TagLogger
+
+# Version of the linking, part of the result cache key: increase it when the output changes
+LINK_VERSION = "3"
+# Number of source indexes kept by a LinkVar2Sim instance between two link() calls
+SOURCE_INDEX_CACHE_SIZE = 8
+
+log = TagLogger("LinkVar2Sim")
 
 class LinkVar2Sim:
-    m_var_data = {}
-    m_source_c = ""
-    m_used_variables = []
-    m_linked_data = {}
+    """
+    Links the Astree variables to the Simulink blocks of a generated C source.
+
+    An instance can serve many link() calls: the data of a call is reset by the next one, and
+    the source indexes are kept in a small LRU cache keyed by the path, size and modification
+    time of the source, so linking again against an unchanged source does not scan it again.
+    """
     
-    def __init__(self) -> None:
-        logging.info("LinkVar2Sim", "Init")
+    def __init__(self, result_cache: ResultCache = None, source_index_cache_size: int = SOURCE_INDEX_CACHE_SIZE,
+                 run_report: RunReport = None, source_encoding: str = SOURCE_ENCODING) -> None:
+        log.info("Init")
+        # Encoding of the C sources, used by both index backends
+        self.m_source_encoding = source_encoding
+        # ResultCache of linked_variables.csv, not used if None
+        self.m_result_cache = result_cache
+        # RunReport shared by all the calls if given, for the callers aggregating them,
+        # otherwise every link() call has its own (see reset)
+        self.m_shared_run_report = run_report
+        # (source path, size, modification time) -> CSourceIndex, least recently used first
+        self.m_source_index_cache = OrderedDict()
+        self.m_source_index_cache_size = source_index_cache_size
+        self.reset()
         pass
     
+    def reset(self) -> None:
+        """
+        Clears the data of the previous link() call, the cached source indexes are kept.
+        """
+        # Phase timers and counters of the call, saved to the output folder by link()
+        self.m_run_report = self.m_shared_run_report if self.m_shared_run_report is not None else RunReport("link")
+        self.m_var_data = {}
+        self.m_source_c = ""
+        self.m_source_index = None
+        self.m_used_variables = []
+        self.m_linked_data = {}
+    
     def validate_file_path(self, file_path: str) -> bool:
-        logging.debug("LinkVar2Sim", "Validating file path")
+        log.debug("Validating file path")
         if not file_path:
             return False
         if os.path.exists(file_path):
@@ -21,47 +66,73 @@ class LinkVar2Sim:
             return False
     
     def get_simulink_path(self):
-        logging.debug("LinkVar2Sim", "Getting Simulink path")
+        log.debug("Getting Simulink path")
         for var in self.m_used_variables:
             if f'"{var} = "' in self.m_source_c:
                 pass
             
     def get_comment_block_in_c_code(self, variable: str) -> str:
         '''
-        Get comment block in C code above the given line
+        Get comment block in C code above the assignment of the given variable
         '''
-        logging.debug("LinkVar2Sim", "Getting comment block in C code")
-        comment_block = ''
-        source_c_lines = self.m_source_c.split('\n')
-        for i, line in enumerate(source_c_lines):
-            if f' {variable} = ' in line and line.strip().startswith(variable):
-                for j in range(i-1, -1, -1):
-                    if '/*' in source_c_lines[j]:
-                        first_comment_block = source_c_lines[j].strip()
-                        # Get comment block end with space
-                        for k in range(j, len(source_c_lines), 1):
-                            # print(source_c_lines[k])
-                            # print(repr(source_c_lines[k]))
-                            if '#' in source_c_lines[k] or "*/" in source_c_lines[k]:
-                                if comment_block == '':
-                                    return first_comment_block
-                                return comment_block
-                            else :
-                                comment_block += source_c_lines[k].strip()
-                    else:
-                        continue
-        return comment_block
+        log.debug("Getting comment block in C code")
+        if self.m_source_index is None:
+            self.m_source_index = CSourceIndex(self.m_source_c)
+        # The comment blocks are pre-parsed by the source index, so this is a lookup
+        return self.m_source_index.get_comment_block(variable)
     
     def get_used_variables(self) -> list:
         '''Return list of used variables in source C file'''
-        logging.debug("LinkVar2Sim", "Used variables")
+        log.debug("Used variables")
+        if self.m_source_index is None:
+            self.m_source_index = CSourceIndex(self.m_source_c)
         for var in self.m_var_data:
-            if f'{var} = ' in self.m_source_c:
-                # Check if the line.strip is start with variable name
-                for line in self.m_source_c.split('\n'):
-                    if f'{var} = ' in line:
-                        if line.strip().startswith(var):
-                            self.m_used_variables.append(var)
+            # A variable is used if a line starts with "<variable> = "
+            if self.m_source_index.is_assigned(var):
+                self.m_used_variables.append(var)
+    
+    def get_source_index(self, source_c_path: str, output_folder: str = None, incremental: bool = False) -> CSourceIndex:
+        """
+        Returns the index of the source file, from the cache if the file did not change since
+        it was indexed by a previous call.
+
+        Args:
+            source_c_path (str): The path to the generated C source file.
+            output_folder (str, optional): The output folder, holding the state of the incremental index.
+            incremental (bool): Build the index with IncrementalSourceIndex.
+
+        Returns:
+            CSourceIndex: The index of the source file.
+        """
+        source_stat = os.stat(source_c_path)
+        cache_key = (os.path.abspath(source_c_path), source_stat.st_size, source_stat.st_mtime_ns, self.m_source_encoding)
+        source_index = self.m_source_index_cache.get(cache_key)
+        if source_index is not None:
+            log.info("Reusing the index of the unchanged source C file")
+            self.m_run_report.count("source_index_cache_hits")
+            self.m_source_index_cache.move_to_end(cache_key)
+            return source_index
+        self.m_run_report.count("source_index_cache_misses")
+        self.m_run_report.count("source_bytes_read", source_stat.st_size)
+        if not incremental and source_stat.st_size >= MMAP_MIN_FILE_SIZE:
+            # Very large source: scan a memory map of the file instead of loading it
+            log.info("Indexing memory-mapped source C file")
+            source_index = CSourceIndex.from_file(source_c_path, self.m_source_encoding)
+        else:
+            # Read source C file, only the index is kept once it is built
+            source_c = read_source_file(source_c_path, self.m_source_encoding)
+            if incremental:
+                incremental_index = IncrementalSourceIndex(os.path.join(output_folder, INDEX_STATE_FILE_NAME))
+                source_index = incremental_index.update(source_c)
+                incremental_index.save_state()
+            else:
+                source_index = CSourceIndex(source_c)
+            # The lookups do not need the source lines, do not keep them in the cache
+            source_index.m_lines = []
+        self.m_source_index_cache[cache_key] = source_index
+        while len(self.m_source_index_cache) > self.m_source_index_cache_size:
+            self.m_source_index_cache.popitem(last=False)
+        return source_index
     
     def save_linked_variables(self, output_folder: str) -> None:
         # Save to CSV file
@@ -71,74 +142,127 @@ class LinkVar2Sim:
             os.remove(f"{output_folder}/linked_variables.csv")
         with open(f"{output_folder}/linked_variables.csv", 'w') as f:
             for var in self.m_linked_data:
-                f.write(f"{var.strip()},{self.m_linked_data[var][0][0].strip()},{self.m_linked_data[var][0][1].strip()},{self.m_linked_data[var][1].strip()}\n")
-        logging.info("LinkVar2Sim", "Saved linked variables to CSV file")
+                f.write(f"{var.strip()},{self.m_linked_data[var][0][0].strip()},{self.m_linked_data[var][0][1]},{self.m_linked_data[var][1].strip()}\n")
+        log.info("Saved linked variables to CSV file")
         
-    def link(self, source_c_path: str, variable_csv_path: str, output_folder: str) -> None:
-        logging.info("LinkVar2Sim", "Linking")
+    def link(self, source_c_path: str, variable_csv_path: str, output_folder: str, incremental: bool = False) -> None:
+        """
+        Links the variables of the variable access file to the Simulink paths found in the C source,
+        and saves them to '<output_folder>/linked_variables.csv'. The run report of the call (phase
+        times and counters, of all the calls if the instance was given a RunReport) is saved next
+        to it, see RunReport.
+
+        Args:
+            source_c_path (str): The path to the generated C source file.
+            variable_csv_path (str): The path to the variable access file (CSV or SQLite).
+            output_folder (str): The output folder.
+            incremental (bool): Reuse the source index of the previous run saved in the output
+                                folder, only the changed parts of the source are scanned again.
+        """
+        log.info("Linking")
+        self.reset()
         # Check input file paths
         if not self.validate_file_path(source_c_path):
-            logging.error("LinkVar2Sim", "Invalid source C file path")
+            log.error("Invalid source C file path")
             return
         if not self.validate_file_path(variable_csv_path):
-            logging.error("LinkVar2Sim", "Invalid variable CSV file path")
+            log.error("Invalid variable access file path")
             return
-        # Read variable CSV file
-        with open(variable_csv_path, 'r') as f:
-            lines = f.readlines()
-        # Extract variable 
-        for line in lines:
-            variable_name = line.split(',')[0]
-            if "@" in variable_name:
-                variable_name = variable_name.split("@")[0]
-            variable_type = line.split(',')[1]
-            variable_value = line.split(',')[2]
-            logging.debug("LinkVar2Sim", f"Extracted variable: {variable_name}")
-            new_var_data = {variable_name: (variable_type, variable_value)}
-            # Add to dictionary
-            self.m_var_data.update(new_var_data)
-        # Read source C file
-        with open(source_c_path, 'r') as f:
-            self.m_source_c = f.read()
+        # Reuse the result of a previous run on the same inputs
+        run_report = self.m_run_report
+        if self.m_result_cache:
+            with run_report.phase("result_cache"):
+                cache_key = self.m_result_cache.get_key([source_c_path, variable_csv_path], f"linked_variables-{LINK_VERSION}-{self.m_source_encoding}")
+                restored = self.m_result_cache.restore(cache_key, output_folder)
+            if restored:
+                log.info("Linked variables restored from cache")
+                run_report.count("result_cache_hits")
+                run_report.save(output_folder)
+                return
+            run_report.count("result_cache_misses")
+        # Read variable access file (CSV or SQLite), the ranges are parsed once by the loader
+        with run_report.phase("load_variables"):
+            self.add_variables(iter_variable_access(variable_csv_path))
+        # Build the assignment index once for the whole source file, or reuse it
+        with run_report.phase("index_source"):
+            self.m_source_index = self.get_source_index(source_c_path, output_folder, incremental)
+        self.link_variables(output_folder)
+        if self.m_result_cache:
+            with run_report.phase("result_cache"):
+                self.m_result_cache.store(cache_key, [os.path.join(output_folder, "linked_variables.csv")])
+        run_report.save(output_folder)
+    
+    def add_variables(self, variable_records) -> None:
+        """
+        Adds parsed variables to the variables to link.
+
+        Args:
+            variable_records: An iterable of (variable name, variable type, VariableRange), the
+                              name may have an '@"<file>"' context, which is removed. The
+                              range of a variable found in several rows is the hull of
+                              their ranges (see add_variable).
+        """
+        var_data = self.m_var_data
+        for variable_name, variable_type, variable_range in variable_records:
+            add_variable(var_data, variable_name, variable_type, variable_range)
+    
+    def link_variables(self, output_folder: str) -> None:
+        """
+        Links the added variables to the source index and saves '<output_folder>/linked_variables.csv'.
+
+        The variables are added by add_variables and the index is set by get_source_index.
+        """
+        run_report = self.m_run_report
+        # One record for all the variables, not one per variable of the loop
+        log.debug("Extracted %d variable(s): %s", len(self.m_var_data), self.m_var_data.keys())
+        with run_report.phase("match_variables"):
+            self.get_used_variables()
+        log.info("Used variables: %s", self.m_used_variables)
         
-        self.get_used_variables()
-        logging.info("LinkVar2Sim", f"Used variables: {self.m_used_variables}")
+        with run_report.phase("resolve_comments"):
+            for var in self.m_used_variables:
+                this_comment_block = self.get_comment_block_in_c_code(var)
+                log.debug("Comment block: %s", this_comment_block)
+                self.m_linked_data.update({var: (self.m_var_data[var], this_comment_block)})
+        run_report.count("variables", len(self.m_var_data))
+        run_report.count("variables_matched", len(self.m_used_variables))
+        run_report.count("variables_skipped", len(self.m_var_data) - len(self.m_used_variables))
         
-        for var in self.m_used_variables:
-            this_comment_block = self.get_comment_block_in_c_code(var)
-            logging.debug("LinkVar2Sim", f"Comment block: {this_comment_block}") 
-            self.m_linked_data.update({var: (self.m_var_data[var], this_comment_block)})
-        
-        logging.info("LinkVar2Sim", "Linking completed")
-        self.save_linked_variables(output_folder)
-        logging.info("LinkVar2Sim", "Saved linked variables")
+        log.info("Linking completed")
+        with run_report.phase("write_csv"):
+            self.save_linked_variables(output_folder)
+        log.info("Saved linked variables")
     
 
-# include utils folder in sys.path
-import sys
-sys.path.append(r"C:\Users\trand\Desktop\Bosch\astree_get_variable_access\utils")
-from log import Logger
+from utils.log import Logger
 import click
-import logging
 
 @click.command()
-@click.option('--source_c_path', prompt='Source C path', help='Source C path')
-@click.option('--variable_access_csv_path', prompt='Variable access csv path', help='Variable access csv path')
-@click.option('--output_folder', prompt='Output folder path', help='Output folder path')
-def main(source_c_path, variable_access_csv_path, output_folder):
+@click.option('--source_c_path', default=None, help='Source C path')
+@click.option('--variable_access_csv_path', default=None, help='Variable access csv (or SQLite .db) path')
+@click.option('--output_folder', default=None, help='Output folder path')
+@click.option('--cache_folder', default=None, help='Result cache folder, unchanged inputs are not linked again')
+@click.option('--incremental', is_flag=True, default=False, help='Only re-index the parts of the C source changed since the previous run')
+@click.option('--source_encoding', default=SOURCE_ENCODING, help=f'Encoding of the source C file (default: {SOURCE_ENCODING})')
+@click.option('--non_interactive', is_flag=True, default=False, help='Never prompt for a missing path (implied without a terminal)')
+def main(source_c_path, variable_access_csv_path, output_folder, cache_folder, incremental, source_encoding, non_interactive):
+    # The missing paths are only prompted in a terminal, a CI job fails instead of waiting for input
+    if not non_interactive and sys.stdin.isatty():
+        source_c_path = source_c_path or click.prompt('Source C path')
+        variable_access_csv_path = variable_access_csv_path or click.prompt('Variable access csv path')
+        output_folder = output_folder or click.prompt('Output folder path')
     logger = Logger()
     if not source_c_path:
         logging.error("main", "Source C path is required")
-        return
+        sys.exit(2)
     if not variable_access_csv_path:
         logging.error("main", "Variable access csv path is required")
-        return
+        sys.exit(2)
     if not output_folder:
         logging.error("main", "Output folder path is required")
-        return
-    link_var2sim = LinkVar2Sim()
-    link_var2sim.link(source_c_path, variable_access_csv_path, output_folder)
-
+        sys.exit(2)
+    link_var2sim = LinkVar2Sim(ResultCache(cache_folder) if cache_folder else None, source_encoding=source_encoding)
+    link_var2sim.link(source_c_path, variable_access_csv_path, output_folder, incremental)
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,126 @@
+import os
+import queue
+import threading
+from utils.astree_log_utils.log_monitor import LogMonitor
+from utils.astree_log_utils.variable_access_writer import RECORDS_RESET
+from utils.variable_2_simulink.link import LinkVar2Sim
+from utils.run_report import RunReport
+from utils.log import TagLogger
+
+# Maximum number of record batches waiting between the monitor and the linker
+DEFAULT_QUEUE_SIZE = 16
+# Put in the record queue once the monitoring is over
+RECORDS_END = None
+# Time between two checks of the monitor thread while the record queue is drained, in seconds
+QUEUE_DRAIN_TIME = 0.1
+
+log = TagLogger("MonitorLinkPipeline")
+
+class MonitorLinkPipeline:
+    """
+    Monitors the running Astree analysis and links its variables to the Simulink paths, in one process.
+
+    The stages run at the same time:
+        - the monitor thread follows the log and puts the parsed records of the data dictionary
+          in a bounded queue as soon as they are appended (see LiveVariableAccessWriter),
+        - the index thread indexes the C source meanwhile,
+        - the calling thread takes the records from the queue and adds them to the variables
+          of LinkVar2Sim, without reading variable_access.csv again.
+    Once the analysis is finished and the source indexed, the variables are linked, which is a
+    lookup per variable, so the whole run takes about max(analysis time, index time).
+    """
+
+    def __init__(self, output_folder: str, source_c_path: str, save_sqlite: bool = False, temp_root: str = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE) -> None:
+        log.info("Init")
+        self.m_output_folder = output_folder
+        self.m_source_c_path = source_c_path
+        self.m_queue_size = queue_size
+        # One report for both stages, saved to the output folder at the end
+        self.m_run_report = RunReport("pipeline")
+        self.m_log_monitor = LogMonitor(output_folder, save_sqlite=save_sqlite, temp_root=temp_root, run_report=self.m_run_report)
+        self.m_link_var2sim = LinkVar2Sim(run_report=self.m_run_report)
+        pass
+
+    def run_monitor(self, record_queue: queue.Queue, result: dict) -> None:
+        """
+        Monitor stage, puts RECORDS_END in the queue when it is over, even on error.
+        """
+        try:
+            result["monitored"] = self.m_log_monitor.monitor(record_queue)
+        except Exception as ex:
+            result["error"] = ex
+        finally:
+            record_queue.put(RECORDS_END)
+
+    def run_index(self, result: dict) -> None:
+        """
+        Index stage.
+        """
+        try:
+            with self.m_run_report.phase("index_source"):
+                result["source_index"] = self.m_link_var2sim.get_source_index(self.m_source_c_path)
+            log.info("Source C file indexed")
+        except Exception as ex:
+            log.error("Indexing failed: %s", ex)
+            result["error"] = ex
+
+    def run(self) -> bool:
+        """
+        Runs the pipeline until the analysis is finished and its variables are linked.
+
+        The outputs are the ones of LogMonitor.monitor (variable_access.*) and LinkVar2Sim.link
+        (linked_variables.csv), in the output folder, with a single run_report.json.
+
+        Returns:
+            bool: True if the variables were linked, False if no analysis log was found.
+        """
+        log.info("Running")
+        if not os.path.isfile(self.m_source_c_path):
+            log.error("Invalid source C file path")
+            return False
+        link_var2sim = self.m_link_var2sim
+        link_var2sim.reset()
+        self.m_log_monitor.stop_event.clear()
+        record_queue = queue.Queue(maxsize=self.m_queue_size)
+        monitor_result = {}
+        index_result = {}
+        monitor_thread = threading.Thread(target=self.run_monitor, args=(record_queue, monitor_result), name="PipelineMonitor")
+        index_thread = threading.Thread(target=self.run_index, args=(index_result,), name="PipelineIndex")
+        monitor_thread.start()
+        index_thread.start()
+        monitor_ended = False
+        try:
+            while True:
+                records = record_queue.get()
+                if records is RECORDS_END:
+                    monitor_ended = True
+                    break
+                if records == RECORDS_RESET:
+                    # The log restarted, its records are sent again
+                    link_var2sim.m_var_data = {}
+                    continue
+                link_var2sim.add_variables(records)
+                self.m_run_report.count("record_batches")
+        finally:
+            if not monitor_ended:
+                # The consumer failed or was interrupted: stop the monitor, and drain the queue
+                # so that none of its put() calls waits for room forever
+                self.m_log_monitor.stop()
+                while monitor_thread.is_alive():
+                    try:
+                        record_queue.get(timeout=QUEUE_DRAIN_TIME)
+                    except queue.Empty:
+                        pass
+            monitor_thread.join()
+            index_thread.join()
+        for result in (monitor_result, index_result):
+            if "error" in result:
+                raise result["error"]
+        if not monitor_result["monitored"]:
+            return False
+        link_var2sim.m_source_index = index_result["source_index"]
+        link_var2sim.link_variables(self.m_output_folder)
+        self.m_run_report.save(self.m_output_folder)
+        log.info("Linked variables of the analysis saved")
+        return True
@@ -0,0 +1,299 @@
+import os
+import re
+import sys
+import json
+import logging
+import threading
+import http.client
+from urllib.parse import urlsplit, parse_qs, quote, urlencode
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+# include repository root in sys.path so the module also works when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.variable_2_simulink.link import LinkVar2Sim
+from utils.variable_2_simulink.variable_store import iter_variable_access
+from utils.astree_log_utils.variable_query import VariableQuery
+from utils.astree_log_utils.variable_merge import add_variable
+from utils.log import TagLogger
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Parameters of GET /query, see VariableQuery.query
+QUERY_NAME_FILTERS = ('prefix', 'glob', 'regex')
+QUERY_RANGE_FILTERS = ('contains', 'min_lower', 'max_lower', 'min_upper', 'max_upper')
+
+log = TagLogger("LinkService")
+
+class LinkService:
+    """
+    In-memory link data of one generated C source and one variable access file.
+
+    The variables are loaded and linked to their Simulink path once, then every query is a
+    dictionary lookup. The files are checked (size, modification time) on every query and
+    reloaded when they change, the source index being reused by LinkVar2Sim if the source
+    did not change.
+    """
+
+    def __init__(self, source_c_path: str, variable_csv_path: str) -> None:
+        log.info("Init")
+        self.m_source_c_path = source_c_path
+        self.m_variable_csv_path = variable_csv_path
+        self.m_link_var2sim = LinkVar2Sim()
+        # variable -> JSON record, see get_record
+        self.m_records = {}
+        self.m_variable_query = VariableQuery({})
+        self.m_file_stats = None
+        self.m_lock = threading.Lock()
+        self.refresh()
+        pass
+
+    def get_file_stats(self) -> tuple:
+        source_stat = os.stat(self.m_source_c_path)
+        variable_stat = os.stat(self.m_variable_csv_path)
+        return (source_stat.st_size, source_stat.st_mtime_ns, variable_stat.st_size, variable_stat.st_mtime_ns)
+
+    def refresh(self) -> None:
+        """
+        Reloads the link data if the source or the variable access file changed.
+        """
+        file_stats = self.get_file_stats()
+        if file_stats == self.m_file_stats:
+            return
+        with self.m_lock:
+            if file_stats == self.m_file_stats:
+                return
+            self.load()
+            self.m_file_stats = file_stats
+
+    def load(self) -> None:
+        """
+        Loads the variables and links them to the Simulink paths of the source.
+        """
+        log.info("Loading %s and %s", self.m_source_c_path, self.m_variable_csv_path)
+        source_index = self.m_link_var2sim.get_source_index(self.m_source_c_path)
+        # The contexts of a variable are merged like in LinkVar2Sim.add_variables
+        var_data = {}
+        for variable_name, variable_type, variable_range in iter_variable_access(self.m_variable_csv_path):
+            add_variable(var_data, variable_name, variable_type, variable_range)
+        records = {}
+        for variable_name, (variable_type, variable_range) in var_data.items():
+            records[variable_name] = self.get_record(variable_name, variable_type, variable_range, source_index)
+        variable_query = VariableQuery({variable_name: {"type": records[variable_name]["type"], "range": variable_range}
+                                        for variable_name, (_, variable_range) in var_data.items()})
+        # Swap the tables at once, the queries running meanwhile see the old or the new data
+        self.m_records, self.m_variable_query = records, variable_query
+        log.info("Loaded %d variable(s)", len(records))
+
+    @staticmethod
+    def get_record(variable_name: str, variable_type: str, variable_range, source_index) -> dict:
+        assigned = source_index.is_assigned(variable_name)
+        return {
+            "name": variable_name,
+            "type": variable_type.strip(),
+            "range": str(variable_range),
+            "lower": variable_range.lower,
+            "upper": variable_range.upper,
+            "assigned": assigned,
+            "simulink_path": source_index.get_comment_block(variable_name).strip() if assigned else "",
+        }
+
+    def get_variable(self, variable_name: str) -> dict:
+        """
+        Returns the record of a variable (type, range, Simulink path), None if it is unknown.
+        """
+        self.refresh()
+        return self.m_records.get(variable_name)
+
+    def get_variables(self, variable_names: list) -> dict:
+        """
+        Returns the records of several variables, None for the unknown ones.
+        """
+        self.refresh()
+        records = self.m_records
+        return {variable_name: records.get(variable_name) for variable_name in variable_names}
+
+    def find_variables(self, value: float = None) -> list:
+        """
+        Returns the records of the variables whose range contains the given value, sorted by
+        name (see VariableQuery.query), or of all the variables if the value is None.
+        """
+        if value is None:
+            self.refresh()
+            return list(self.m_records.values())
+        return self.query_variables(contains=value)
+
+    def query_variables(self, **filters) -> list:
+        """
+        Returns the records of the variables matching the filters of VariableQuery.query.
+        """
+        self.refresh()
+        records = self.m_records
+        return [records[variable_name] for variable_name in self.m_variable_query.query(**filters)]
+
+    def get_status(self) -> dict:
+        self.refresh()
+        return {
+            "source_c_path": self.m_source_c_path,
+            "variable_csv_path": self.m_variable_csv_path,
+            "variables": len(self.m_records),
+            "assigned": sum(record["assigned"] for record in self.m_records.values()),
+        }
+
+
+class LinkServiceHandler(BaseHTTPRequestHandler):
+    """
+    JSON API of the link service:
+        GET  /status
+        GET  /variable?name=<variable>
+        GET  /variables[?contains=<value>]
+        GET  /query?[prefix=..][&glob=..][&regex=..][&contains=..][&min_lower=..][&max_lower=..][&min_upper=..][&max_upper=..]
+        POST /variables  {"names": [<variable>, ...]}
+    """
+    # Keep the connections open, a client makes many queries
+    protocol_version = "HTTP/1.1"
+    # The headers and the body are separate writes: without TCP_NODELAY, Nagle's algorithm and
+    # the delayed ACK of the client add ~40 ms to every response
+    disable_nagle_algorithm = True
+
+    def send_json(self, status: int, data) -> None:
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        link_service = self.server.link_service
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        try:
+            if url.path == "/variable":
+                if "name" not in params:
+                    self.send_json(400, {"error": "Missing parameter: name"})
+                    return
+                record = link_service.get_variable(params["name"][0])
+                if record is None:
+                    self.send_json(404, {"error": f"Unknown variable: {params['name'][0]}"})
+                else:
+                    self.send_json(200, record)
+            elif url.path == "/variables":
+                value = float(params["contains"][0]) if "contains" in params else None
+                self.send_json(200, {"variables": link_service.find_variables(value)})
+            elif url.path == "/query":
+                filters = {name: params[name][0] for name in QUERY_NAME_FILTERS if name in params}
+                filters.update({name: float(params[name][0]) for name in QUERY_RANGE_FILTERS if name in params})
+                self.send_json(200, {"variables": link_service.query_variables(**filters)})
+            elif url.path == "/status":
+                self.send_json(200, link_service.get_status())
+            else:
+                self.send_json(404, {"error": f"Unknown path: {url.path}"})
+        except (ValueError, re.error) as ex:
+            self.send_json(400, {"error": str(ex)})
+        except OSError as ex:
+            self.send_json(500, {"error": str(ex)})
+
+    def do_POST(self) -> None:
+        link_service = self.server.link_service
+        url = urlsplit(self.path)
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b'{}')
+            if url.path == "/variables" and isinstance(request.get("names"), list):
+                self.send_json(200, {"variables": link_service.get_variables(request["names"])})
+            else:
+                self.send_json(404, {"error": f"Unknown request: POST {url.path}"})
+        except ValueError as ex:
+            self.send_json(400, {"error": str(ex)})
+        except OSError as ex:
+            self.send_json(500, {"error": str(ex)})
+
+    def log_message(self, format: str, *args) -> None:
+        # One line per query would cost more than the query itself
+        pass
+
+
+class LinkServer(ThreadingHTTPServer):
+    """
+    Local HTTP server of a LinkService.
+    """
+    daemon_threads = True
+
+    def __init__(self, link_service: LinkService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        self.link_service = link_service
+        super().__init__((host, port), LinkServiceHandler)
+
+
+class LinkServiceClient:
+    """
+    Client of a running link service, over one persistent connection.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        self.m_connection = http.client.HTTPConnection(host, port)
+        pass
+
+    def request(self, method: str, path: str, data=None, allow_missing: bool = False):
+        """
+        Sends a query to the service and returns the decoded JSON response.
+
+        Args:
+            method (str): "GET" or "POST".
+            path (str): The path and the query string.
+            data (optional): The JSON body of a POST query.
+            allow_missing (bool): Return None instead of raising if the service answers 404.
+
+        Returns:
+            The decoded JSON response.
+        """
+        body = json.dumps(data) if data is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        self.m_connection.request(method, path, body=body, headers=headers)
+        response = self.m_connection.getresponse()
+        result = json.loads(response.read())
+        if response.status == 404 and allow_missing:
+            return None
+        if response.status != 200:
+            raise RuntimeError(result.get("error", f"HTTP {response.status}"))
+        return result
+
+    def get_variable(self, variable_name: str) -> dict:
+        return self.request("GET", f"/variable?name={quote(variable_name)}", allow_missing=True)
+
+    def get_variables(self, variable_names: list) -> dict:
+        return self.request("POST", "/variables", {"names": variable_names})["variables"]
+
+    def find_variables(self, value: float = None) -> list:
+        return self.request("GET", "/variables" if value is None else f"/variables?contains={value}")["variables"]
+
+    def query_variables(self, **filters) -> list:
+        return self.request("GET", f"/query?{urlencode(filters)}")["variables"]
+
+    def close(self) -> None:
+        self.m_connection.close()
+
+
+from utils.log import Logger
+import click
+
+@click.command()
+@click.option('--source_c_path', required=True, help='Source C path')
+@click.option('--variable_access_csv_path', required=True, help='Variable access csv (or SQLite .db) path')
+@click.option('--host', default=DEFAULT_HOST, help='Listening address, local only by default')
+@click.option('--port', type=int, default=DEFAULT_PORT, help='Listening port')
+def main(source_c_path, variable_access_csv_path, host, port):
+    """Serve the Simulink path and range of the variables over a local HTTP JSON API."""
+    logger = Logger()
+    link_server = LinkServer(LinkService(source_c_path, variable_access_csv_path), host, port)
+    logging.info("main", "Link service listening on http://%s:%d", host, link_server.server_port)
+    try:
+        link_server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("main", "Link service stopped")
+    finally:
+        link_server.server_close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        logging.error("main", str(e))
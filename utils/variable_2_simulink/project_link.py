@@ -0,0 +1,210 @@
+import os
+import sys
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+# include repository root in sys.path so the module also works when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.variable_2_simulink.c_source_index import CSourceIndex, MMAP_MIN_FILE_SIZE, SOURCE_ENCODING, read_source_file
+from utils.variable_2_simulink.variable_store import iter_variable_access
+from utils.astree_log_utils.variable_access import format_csv_row
+from utils.astree_log_utils.variable_merge import add_variable
+from utils.log import TagLogger
+
+SOURCE_FILE_EXTENSIONS = ('.c',)
+PROJECT_LINK_FILE_NAME = "linked_variables.csv"
+
+# Names of the variables to link, set once per worker process by init_worker
+_worker_variables = frozenset()
+
+log = TagLogger("ProjectLinker")
+
+def find_source_files(inputs: list) -> list:
+    """
+    Finds the generated C source files of a project.
+
+    Args:
+        inputs (list): C files or folders (searched recursively for .c files).
+
+    Returns:
+        list: The sorted absolute paths of the source files, without duplicates.
+    """
+    source_files = set()
+    for input_path in inputs:
+        if os.path.isdir(input_path):
+            for folder, _, file_names in os.walk(input_path):
+                for file_name in file_names:
+                    if os.path.splitext(file_name)[1].lower() in SOURCE_FILE_EXTENSIONS:
+                        source_files.add(os.path.abspath(os.path.join(folder, file_name)))
+        elif os.path.isfile(input_path):
+            source_files.add(os.path.abspath(input_path))
+    return sorted(source_files)
+
+
+def init_worker(variables: frozenset) -> None:
+    """
+    Initializer of the worker processes: the variables are sent once per worker, not once per file.
+    """
+    global _worker_variables
+    _worker_variables = variables
+
+
+def index_source_file(source_c_path: str, encoding: str = SOURCE_ENCODING) -> dict:
+    """
+    Indexes one C source file and looks up the variables set by init_worker. Runs in a worker process.
+
+    The variables assigned in the file are the intersection of its assignments with the variables
+    to link, so the cost per file depends on the size of the file, not on the number of variables.
+    Only the assigned variables are returned, so the index itself never leaves the worker.
+
+    Args:
+        source_c_path (str): The path to the C source file.
+        encoding (str): The encoding of the source file, the same for both index backends.
+
+    Returns:
+        dict: {"source_c_path", "status", "variables": {variable: (1-based line, comment block)}}.
+    """
+    result = {"source_c_path": source_c_path, "status": "OK", "variables": {}}
+    try:
+        if os.path.getsize(source_c_path) >= MMAP_MIN_FILE_SIZE:
+            source_index = CSourceIndex.from_file(source_c_path, encoding)
+        else:
+            source_index = CSourceIndex(read_source_file(source_c_path, encoding))
+        for variable in source_index.m_assignments.keys() & _worker_variables:
+            result["variables"][variable] = (source_index.get_assignment_lines(variable)[0] + 1,
+                                             source_index.get_comment_block(variable))
+    except Exception as ex:
+        result["status"] = f"ERROR: {ex}"
+    return result
+
+
+class ProjectLinker:
+    """
+    Links the variables of a variable access file to the Simulink paths of a whole project.
+
+    Every C file of the source tree is indexed in its own worker process, the results are
+    merged into one variable -> [(file, line, Simulink path)] map and saved to a single
+    '<output_folder>/linked_variables.csv'.
+    """
+
+    def __init__(self, output_folder: str, workers: int = None, source_encoding: str = SOURCE_ENCODING) -> None:
+        log.info("Init")
+        self.m_output_folder = output_folder
+        self.m_workers = workers if workers else os.cpu_count()
+        self.m_source_encoding = source_encoding
+        # variable -> (type, VariableRange)
+        self.m_var_data = {}
+        # variable -> [(source file, line, comment block)], in source file order
+        self.m_linked_data = {}
+        pass
+
+    def load_variables(self, variable_csv_path: str) -> None:
+        """
+        Loads the variables of a variable access file (CSV or SQLite), the contexts of a variable
+        are merged like in LinkVar2Sim.add_variables.
+        """
+        self.m_var_data = {}
+        for variable_name, variable_type, variable_range in iter_variable_access(variable_csv_path):
+            add_variable(self.m_var_data, variable_name, variable_type, variable_range)
+
+    def index_sources(self, source_files: list) -> None:
+        """
+        Indexes the source files across the process pool and merges the assigned variables.
+
+        Args:
+            source_files (list): The paths to the C source files.
+        """
+        variables = frozenset(self.m_var_data)
+        results = {}
+        with ProcessPoolExecutor(max_workers=self.m_workers, initializer=init_worker, initargs=(variables,)) as executor:
+            futures = [executor.submit(index_source_file, source_file, self.m_source_encoding) for source_file in source_files]
+            for future in as_completed(futures):
+                result = future.result()
+                if result["status"] != "OK":
+                    log.warning("%s: %s", result["source_c_path"], result["status"])
+                results[result["source_c_path"]] = result["variables"]
+        # Merge in file order, so the output does not depend on the completion order
+        self.m_linked_data = {}
+        for source_file in source_files:
+            for variable, (line_no, comment_block) in results.get(source_file, {}).items():
+                self.m_linked_data.setdefault(variable, []).append((source_file, line_no, comment_block))
+
+    def save_linked_variables(self, source_root: str) -> str:
+        """
+        Saves the linked variables to '<output_folder>/linked_variables.csv'.
+
+        The columns are those of LinkVar2Sim (name, type, range, comment block) followed by the
+        source file, relative to the source root, and the line of the assignment. A variable
+        assigned in several files has one row per file.
+
+        Args:
+            source_root (str): The folder the source file paths are relative to.
+
+        Returns:
+            str: The path to the output file.
+        """
+        if not os.path.exists(self.m_output_folder):
+            os.makedirs(self.m_output_folder)
+        output_file = os.path.join(self.m_output_folder, PROJECT_LINK_FILE_NAME)
+        with open(output_file, 'w') as f:
+            for variable, (variable_type, variable_range) in self.m_var_data.items():
+                for source_file, line_no, comment_block in self.m_linked_data.get(variable, []):
+                    f.write(format_csv_row((variable.strip(), variable_type.strip(), variable_range, comment_block.strip(),
+                                            os.path.relpath(source_file, source_root), line_no)))
+        return output_file
+
+    def link(self, source_inputs: list, variable_csv_path: str) -> dict:
+        """
+        Links the variables of the variable access file to the C files of the source tree.
+
+        Args:
+            source_inputs (list): C files or folders of the project.
+            variable_csv_path (str): The path to the variable access file (CSV or SQLite).
+
+        Returns:
+            dict: The linked variables, variable -> [(source file, line, comment block)].
+        """
+        log.info("Linking")
+        if not os.path.exists(variable_csv_path):
+            log.error("Invalid variable access file path")
+            return {}
+        source_files = find_source_files(source_inputs)
+        if not source_files:
+            log.error("No source C file found")
+            return {}
+        self.load_variables(variable_csv_path)
+        log.info("Indexing %d source file(s) with %d worker(s) ...", len(source_files), self.m_workers)
+        tic = time.perf_counter()
+        self.index_sources(source_files)
+        wall_time = time.perf_counter() - tic
+        source_root = os.path.commonpath([os.path.dirname(source_file) for source_file in source_files])
+        output_file = self.save_linked_variables(source_root)
+        log.info("Linked %d of %d variable(s) in %.2f s (%.1f files/s)",
+                 len(self.m_linked_data), len(self.m_var_data), wall_time, len(source_files) / wall_time)
+        log.info("Saved linked variables to %s", output_file)
+        return self.m_linked_data
+
+
+from utils.log import Logger
+import click
+import multiprocessing
+
+@click.command()
+@click.argument('source_inputs', nargs=-1, required=True)
+@click.option('--variable_access_csv_path', required=True, help='Variable access csv (or SQLite .db) path')
+@click.option('--output_folder', required=True, help='Output folder path')
+@click.option('--workers', type=int, default=None, help='Number of worker processes (default: number of CPUs)')
+@click.option('--source_encoding', default=SOURCE_ENCODING, help=f'Encoding of the source C files (default: {SOURCE_ENCODING})')
+def main(source_inputs, variable_access_csv_path, output_folder, workers, source_encoding):
+    """Link the variables to the Simulink paths of every C file of the source tree."""
+    logger = Logger()
+    project_linker = ProjectLinker(output_folder, workers=workers, source_encoding=source_encoding)
+    project_linker.link(list(source_inputs), variable_access_csv_path)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    try:
+        main()
+    except Exception as e:
+        logging.error("main", str(e))
@@ -0,0 +1,77 @@
+import os
+import csv
+import sqlite3
+from pathlib import Path
+from utils.astree_log_utils.variable_range import VariableRange, Interval
+from utils.log import TagLogger
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+log = TagLogger("VariableStore")
+
+def is_sqlite_file(file_path: str) -> bool:
+    """
+    Checks if the given variable access file is a SQLite file, based on its extension.
+    """
+    return os.path.splitext(file_path)[1].lower() in SQLITE_EXTENSIONS
+
+
+def iter_variable_access_csv(file_path: str):
+    """
+    Yields the variables of a variable access CSV file written by VariableAcces.
+
+    Args:
+        file_path (str): The path to the CSV file.
+
+    Yields:
+        tuple: (variable name, variable type, VariableRange). The header and the rows
+               without a valid "lo..hi" range are skipped.
+    """
+    with open(file_path, 'r', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 3:
+                continue
+            variable_range = VariableRange.from_text(row[2])
+            if variable_range is None:
+                continue
+            yield row[0], row[1], variable_range
+
+
+def iter_variable_access_sqlite(file_path: str):
+    """
+    Yields the variables of a variable access SQLite file written by VariableAcces.
+
+    The bounds are read as floats from the file, no text is parsed.
+
+    Args:
+        file_path (str): The path to the SQLite file.
+
+    Yields:
+        tuple: (variable name, variable type, VariableRange).
+    """
+    # Open read-only, the file may be shared by several link jobs
+    connection = sqlite3.connect(f"{Path(file_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        for name, variable_type, lower, upper, is_integer in connection.execute(
+                "SELECT name, type, lower, upper, is_integer FROM variable_access"):
+            if is_integer:
+                lower, upper = int(lower), int(upper)
+            yield name, variable_type, VariableRange((Interval(lower, upper),))
+    finally:
+        connection.close()
+
+
+def iter_variable_access(file_path: str):
+    """
+    Yields the variables of a variable access file, CSV or SQLite.
+
+    Args:
+        file_path (str): The path to the variable access file.
+
+    Yields:
+        tuple: (variable name, variable type, VariableRange).
+    """
+    log.debug("Loading variable access file: %s", file_path)
+    if is_sqlite_file(file_path):
+        return iter_variable_access_sqlite(file_path)
+    return iter_variable_access_csv(file_path)